@@ -5,6 +5,7 @@ from . import security
 from app.crud import user as users_crud
 from app.schemas import user as users_schemas
 from app.database import get_db
+from app.core.audit import audit
 
 router = APIRouter(tags=["authentication"])
 
@@ -13,17 +14,25 @@ def register_user(user: users_schemas.UserCreate, db: Session = Depends(get_db))
     db_user = users_crud.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    return users_crud.create_user(db=db, user=user)
+    db_user = users_crud.create_user(db=db, user=user)
+    audit("USER_REGISTER", db_user.id, f"role={db_user.role}")
+    return db_user
 
 @router.post("/login")
 def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     user = users_crud.get_user_by_email(db, email=form_data.username)
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    valid, new_hash = security.verify_and_update_password(form_data.password, user.hashed_password) if user else (False, None)
+    if not valid:
+        audit("USER_LOGIN_FAILED", user.id if user else None, f"email={form_data.username}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # Hash dengan cost lama diganti secara transparan
+        users_crud.update_password_hash(db, db_user=user, hashed_password=new_hash)
+    audit("USER_LOGIN", user.id)
     access_token = security.create_access_token(
         data={"sub": user.email, "role": user.role}
     )
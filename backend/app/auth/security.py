@@ -1,15 +1,44 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException, status
 from jose import JWTError, jwt
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hash dengan cost yang berbeda dari BCRYPT_ROUNDS ditandai needs_update dan di-rehash saat login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+# bcrypt dijalankan di pool thread terpisah yang ukurannya dibatasi (bcrypt melepas GIL, jadi
+# thread cukup). Jumlah pekerjaan yang boleh berjalan + antre juga dibatasi; sisanya langsung
+# ditolak 429 supaya lonjakan login/registrasi tidak menghabiskan threadpool request lain.
+_hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_hash_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE)
+
+def _run_hashing(function, *args):
+    if not _hash_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Server sedang sibuk memproses autentikasi, silakan coba lagi",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        future = _hash_executor.submit(function, *args)
+    except BaseException:
+        _hash_slots.release()
+        raise
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return future.result()
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return _run_hashing(pwd_context.verify, plain_password, hashed_password)
+
+def verify_and_update_password(plain_password, hashed_password):
+    """(valid, hash_baru); hash_baru tidak None jika hash lama perlu diganti (mis. BCRYPT_ROUNDS berubah)."""
+    return _run_hashing(pwd_context.verify_and_update, plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return _run_hashing(pwd_context.hash, password)
 
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -0,0 +1,142 @@
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class AuditWriter:
+    """
+    Penulis AuditLog di latar belakang. Router hanya memasukkan event ke antrean in-memory
+    (tanpa I/O database); thread writer menulisnya per batch dengan satu INSERT multi-baris
+    saat batch penuh atau interval flush tercapai. Jika antrean penuh, event dibuang dan
+    dihitung sebagai dropped, sehingga audit tidak pernah memperlambat request.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, max_queue: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.last_flush_at: Optional[datetime] = None
+        self.last_batch_size = 0
+
+    def record(self, action: str, user_id: Optional[int] = None, details: Optional[str] = None) -> None:
+        # Waktu dicatat saat event terjadi, bukan saat batch ditulis
+        event = {"action": action, "user_id": user_id, "details": details, "timestamp": datetime.now(timezone.utc)}
+        self.start()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            return
+        with self._stats_lock:
+            self.enqueued += 1
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Hentikan writer setelah semua event yang sudah diantre ditulis."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._flush(batch)
+            elif self._stop.is_set():
+                return
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            if self._stop.is_set():
+                # Saat shutdown antrean dikuras tanpa menunggu interval
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except queue.Empty:
+                    break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=min(remaining, 0.5)))
+            except queue.Empty:
+                continue
+        return batch
+
+    def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        from app.database import engine
+        from app.models import AuditLog
+        try:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert(AuditLog), batch)
+            except IntegrityError:
+                # Biasanya user sudah dihapus sebelum batch ditulis: simpan satu per satu,
+                # event yang user-nya sudah tidak ada tetap disimpan tanpa user_id
+                for event in batch:
+                    try:
+                        with engine.begin() as conn:
+                            conn.execute(insert(AuditLog), [event])
+                    except IntegrityError:
+                        with engine.begin() as conn:
+                            conn.execute(insert(AuditLog), [{**event, "user_id": None}])
+        except Exception:
+            logger.exception("Gagal menulis %d audit log", len(batch))
+            with self._stats_lock:
+                self.failed += len(batch)
+            return
+        with self._stats_lock:
+            self.written += len(batch)
+            self.last_batch_size = len(batch)
+            self.last_flush_at = datetime.now(timezone.utc)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "last_batch_size": self.last_batch_size,
+                "last_flush_at": self.last_flush_at,
+                "running": self._thread is not None and self._thread.is_alive(),
+            }
+
+audit_writer = AuditWriter(
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL,
+    max_queue=settings.AUDIT_QUEUE_SIZE,
+)
+
+def audit(action: str, user_id: Optional[int] = None, details: Optional[str] = None) -> None:
+    """Catat event audit (non-blocking). Contoh: audit("SUBMISSION_CREATE", user.id, "experiment_id=3")"""
+    audit_writer.record(action, user_id, details)
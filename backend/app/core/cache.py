@@ -0,0 +1,128 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+_MISSING = object()
+
+class TTLCache:
+    """
+    Cache in-process dengan batas umur (TTL) dan ukuran (LRU), aman dipakai lintas thread.
+    get_or_set memastikan hanya satu thread yang menghitung nilai untuk key yang sama
+    (request lain menunggu hasilnya, bukan ikut menghantam database).
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: dict[Hashable, threading.Lock] = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            # Thread lain mungkin sudah mengisi selama kita menunggu lock
+            value = self.get(key, _MISSING)
+            if value is _MISSING:
+                value = factory()
+                self.set(key, value, ttl)
+        with self._lock:
+            if not key_lock.locked():
+                self._key_locks.pop(key, None)
+        return value
+
+    def incr(self, key: Hashable) -> int:
+        """Naikkan counter integer (tanpa kedaluwarsa) dan kembalikan nilai barunya."""
+        with self._lock:
+            entry = self._data.get(key)
+            value = (entry[1] if entry is not None else 0) + 1
+            self._data[key] = (float("inf"), value)
+            self._data.move_to_end(key)
+            return value
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+class RedisCache:
+    """
+    Backend cache bersama (Redis atau server yang kompatibel) untuk deployment multi-worker.
+    Nilai disimpan sebagai JSON, jadi hanya untuk data sederhana (dict/list/str/angka).
+    Membutuhkan paket opsional `redis`.
+    """
+
+    def __init__(self, url: str, namespace: str, ttl: float = 60.0):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("CACHE_REDIS_URL diisi tetapi paket 'redis' belum terpasang") from exc
+        self._client = redis.Redis.from_url(url)
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def _key(self, key: Hashable) -> str:
+        return f"flashfield:{self.namespace}:{key}"
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        raw = self._client.get(self._key(key))
+        return default if raw is None else json.loads(raw)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self._client.set(self._key(key), json.dumps(value, default=str), ex=max(int(self.ttl if ttl is None else ttl), 1))
+
+    def delete(self, key: Hashable) -> None:
+        self._client.delete(self._key(key))
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value, ttl)
+        return value
+
+    def incr(self, key: Hashable) -> int:
+        return self._client.incr(self._key(key))
+
+def build_cache(namespace: str, maxsize: int, ttl: float, shared: bool = False):
+    """
+    Buat cache untuk satu kegunaan. Jika shared=True dan CACHE_REDIS_URL diisi, cache
+    disimpan di Redis sehingga semua worker melihat isi (dan invalidasi) yang sama.
+    """
+    from app.core.config import settings
+    if shared and settings.CACHE_REDIS_URL:
+        return RedisCache(settings.CACHE_REDIS_URL, namespace=namespace, ttl=ttl)
+    return TTLCache(maxsize=maxsize, ttl=ttl)
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -5,6 +6,52 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
+    BCRYPT_ROUNDS: int = 12  # cost factor bcrypt; hash lama di-rehash otomatis saat login
+    PASSWORD_HASH_WORKERS: int = 2  # bcrypt yang boleh berjalan bersamaan
+    PASSWORD_HASH_QUEUE: int = 8  # antrean tambahan sebelum request autentikasi ditolak 429
+    STATS_OVERVIEW_CACHE_TTL: int = 30  # detik
+    PRINCIPAL_CACHE_TTL: int = 60  # detik
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    # Connection pool (lihat app.core.pool)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # detik menunggu koneksi sebelum TimeoutError
+    DB_POOL_RECYCLE: int = 1800  # detik; tutup koneksi lama sebelum diputus server (Neon), -1 = nonaktif
+    DB_POOL_PRE_PING: bool = True
+    DB_USE_NULLPOOL: bool = False  # true jika di belakang PgBouncer
+    # "postgis" jika ekstensi PostGIS dan index GiST tersedia (migrate_db.py --with-postgis)
+    SPATIAL_BACKEND: str = "geohash"
+    RESPONSE_CACHE_TTL: int = 15  # detik; respons publik experiment (lihat app.core.response_cache)
+    RESPONSE_CACHE_SIZE: int = 1024
+    FAST_JSON_RESPONSES: bool = False  # orjson tanpa validasi ulang Pydantic untuk list submission
+    # Audit log ditulis per batch di latar belakang (lihat app.core.audit)
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL: float = 2.0  # detik
+    AUDIT_QUEUE_SIZE: int = 50000
+    # Penghapusan experiment/user dengan submission sebanyak ini dijalankan bertahap di latar belakang
+    BULK_DELETE_BACKGROUND_THRESHOLD: int = 50000
+    BULK_DELETE_CHUNK_SIZE: int = 5000
+    # Write-behind submission: POST dibalas 202 + receipt, ditulis per batch (lihat app.core.ingest)
+    SUBMISSION_WRITE_BEHIND: bool = False
+    INGEST_QUEUE_SIZE: int = 10000  # di atas ini POST submission ditolak 429
+    INGEST_BATCH_SIZE: int = 500
+    INGEST_FLUSH_INTERVAL: float = 0.2  # detik
+    INGEST_SPOOL_PATH: Optional[str] = None  # file spool per proses agar antrean bertahan dari crash
+    INGEST_RECEIPT_TTL: int = 3600  # detik status receipt disimpan di memori
+    # Live feed submission per experiment (lihat app.core.live_feed)
+    LIVE_FEED_CLIENT_BUFFER: int = 200  # submission yang ditahan per client lambat sebelum yang lama dibuang
+    LIVE_FEED_MAX_SUBSCRIBERS: int = 1000  # per proses worker
+    LIVE_FEED_HEARTBEAT: float = 15.0  # detik
+    # Instrumentasi request (lihat app.core.instrumentation)
+    SERVER_TIMING_HEADER: bool = True
+    REQUEST_QUERY_WARNING: int = 50  # log peringatan jika satu request menjalankan lebih banyak query (0 = nonaktif)
+    METRICS_TOKEN: Optional[str] = None  # jika diisi, GET /metrics membutuhkan header Authorization: Bearer <token>
+    # Konfigurasi text search PostgreSQL untuk pencarian experiment; harus sama dengan index migrasi 0010
+    SEARCH_TEXT_CONFIG: str = "simple"
+    CACHE_REDIS_URL: Optional[str] = None  # isi untuk berbagi cache antar worker (butuh paket redis)
+    # Mode async: endpoint utama memakai AsyncSession (butuh paket asyncpg, atau aiosqlite untuk SQLite)
+    DB_ASYNC_MODE: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None  # default: diturunkan dari DATABASE_URL
 
     class Config:
         env_file = ".env"
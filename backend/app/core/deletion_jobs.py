@@ -0,0 +1,72 @@
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+JobKey = Tuple[str, int]
+
+class DeletionJobs:
+    """
+    Registry penghapusan besar yang berjalan di thread latar belakang. Setiap target (misalnya
+    ("experiment", 12)) punya paling banyak satu job; progress dibaca lewat snapshot().
+    Status disimpan per proses, jadi polling harus mengenai worker yang sama.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[JobKey, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def snapshot(self, kind: str, target_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get((kind, target_id))
+            return dict(job) if job else None
+
+    def is_running(self, kind: str, target_id: int) -> bool:
+        job = self.snapshot(kind, target_id)
+        return job is not None and job["status"] == "running"
+
+    def start(self, kind: str, target_id: int, total: int, work: Callable[[Callable[[int], None]], Any], **details: Any) -> Dict[str, Any]:
+        """
+        Jalankan work(progress) di thread baru. work memanggil progress(jumlah_terhapus) setiap
+        selesai satu chunk; details (misalnya owner_id) ikut disimpan di job. Jika target yang sama
+        sedang dihapus, job yang ada dikembalikan.
+        """
+        key = (kind, target_id)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job["status"] == "running":
+                return dict(job)
+            job = {
+                "kind": kind,
+                "target_id": target_id,
+                "status": "running",
+                "deleted": 0,
+                "total": total,
+                "started_at": datetime.now(timezone.utc),
+                "finished_at": None,
+                "error": None,
+                **details,
+            }
+            self._jobs[key] = job
+            snapshot = dict(job)
+
+        def progress(deleted: int) -> None:
+            with self._lock:
+                job["deleted"] = deleted
+
+        def run() -> None:
+            try:
+                work(progress)
+                status, error = "completed", None
+            except Exception as exc:
+                logger.exception("Penghapusan %s %s gagal", kind, target_id)
+                status, error = "failed", str(exc)
+            with self._lock:
+                job.update(status=status, error=error, finished_at=datetime.now(timezone.utc))
+
+        threading.Thread(target=run, name=f"delete-{kind}-{target_id}", daemon=True).start()
+        return snapshot
+
+deletion_jobs = DeletionJobs()
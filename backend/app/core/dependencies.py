@@ -2,9 +2,13 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.core.principal import cache_principal, get_cached_principal
 from app.database import get_db
+from app.database_async import get_async_db
 from app.models import User as user_models
 from app.crud import user as users_crud
 
@@ -13,24 +17,39 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 class TokenData(BaseModel):
     email: str | None = None
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _token_data(token: str) -> TokenData:
+    credentials_exception = _credentials_exception()
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
-        token_data = TokenData(email=email)
+        return TokenData(email=email)
     except JWTError:
         raise credentials_exception
-    user = users_crud.get_user_by_email(db, email=token_data.email)
-    if user is None:
-        raise credentials_exception
-    return user
+
+def get_user_from_token(token: str, db: Session):
+    """Principal untuk JWT; dipakai juga oleh endpoint yang menerima token di query string (live feed)."""
+    credentials_exception = _credentials_exception()
+    token_data = _token_data(token)
+    # Principal dari cache jika ada; query database hanya saat cache miss
+    principal = get_cached_principal(token_data.email)
+    if principal is None:
+        user = users_crud.get_user_by_email(db, email=token_data.email)
+        if user is None:
+            raise credentials_exception
+        principal = cache_principal(token_data.email, user)
+    return principal
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    return get_user_from_token(token, db)
 
 def get_current_active_user(current_user: user_models = Depends(get_current_user)):
     if not current_user.is_active:
@@ -46,4 +65,33 @@ def role_checker(required_roles: list[str]):
             )
         return current_user
 
-    return checker 
\ No newline at end of file
+    return checker 
+
+# --- Varian async (dipakai router async saat DB_ASYNC_MODE aktif) ---
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    token_data = _token_data(token)
+    principal = get_cached_principal(token_data.email)
+    if principal is None:
+        result = await db.execute(select(user_models).where(user_models.email == token_data.email))
+        user = result.scalar_one_or_none()
+        if user is None:
+            raise _credentials_exception()
+        principal = cache_principal(token_data.email, user)
+    return principal
+
+async def get_current_active_user_async(current_user: user_models = Depends(get_current_user_async)):
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
+def role_checker_async(required_roles: list[str]):
+    async def checker(current_user: user_models = Depends(get_current_active_user_async)):
+        if current_user.role not in required_roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You don't have enough permissions"
+            )
+        return current_user
+
+    return checker
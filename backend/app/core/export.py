@@ -0,0 +1,95 @@
+import csv
+import io
+import re
+import unicodedata
+from urllib.parse import quote
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+import orjson
+
+# Kolom dasar setiap submission, diikuti kolom dari Experiment.input_fields
+BASE_COLUMNS = ["submission_id", "user_id", "timestamp", "latitude", "longitude"]
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    # Baris JSON berisi skema lalu blok kolom per batch, bukan satu submission per baris
+    "columnar": "application/jsonl",
+}
+
+EXPORT_EXTENSIONS = {
+    "csv": "csv",
+    "ndjson": "ndjson",
+    "columnar": "columnar.jsonl",
+}
+
+def content_disposition(filename: str) -> str:
+    """
+    Header Content-Disposition untuk nama file bebas (judul experiment): fallback ASCII tanpa
+    tanda kutip/karakter kontrol untuk filename=, dan nama aslinya sebagai filename*= (RFC 5987).
+    """
+    fallback = unicodedata.normalize("NFKD", filename).encode("ascii", "ignore").decode("ascii")
+    fallback = re.sub(r'[\x00-\x1f\x7f"\\;]', "", fallback).strip() or "export"
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+def export_columns(input_fields: List[Dict[str, Any]]) -> List[str]:
+    return BASE_COLUMNS + [field["name"] for field in input_fields]
+
+def _flatten(row: Sequence[Any], field_names: List[str]) -> list:
+    submission_id, user_id, timestamp, geo_lat, geo_lng, data_json = row
+    data_json = data_json or {}
+    return [submission_id, user_id, timestamp, geo_lat, geo_lng] + [data_json.get(name) for name in field_names]
+
+def _csv_value(value: Any):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return "; ".join(str(item) for item in value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+def iter_csv(batches: Iterable[Sequence[Sequence[Any]]], input_fields: List[Dict[str, Any]]) -> Iterator[str]:
+    field_names = [field["name"] for field in input_fields]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(export_columns(input_fields))
+    for batch in batches:
+        for row in batch:
+            writer.writerow([_csv_value(value) for value in _flatten(row, field_names)])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+def iter_ndjson(batches: Iterable[Sequence[Sequence[Any]]], input_fields: List[Dict[str, Any]]) -> Iterator[bytes]:
+    columns = export_columns(input_fields)
+    field_names = columns[len(BASE_COLUMNS):]
+    for batch in batches:
+        yield b"".join(
+            orjson.dumps(dict(zip(columns, _flatten(row, field_names))), option=orjson.OPT_APPEND_NEWLINE)
+            for row in batch
+        )
+
+def iter_columnar(batches: Iterable[Sequence[Sequence[Any]]], input_fields: List[Dict[str, Any]]) -> Iterator[bytes]:
+    """
+    Format kolumnar ringkas: baris pertama berisi skema, lalu satu baris per batch
+    dengan nilai dikelompokkan per kolom (nama kolom tidak diulang per baris).
+    """
+    columns = export_columns(input_fields)
+    field_names = columns[len(BASE_COLUMNS):]
+    types = ["integer", "integer", "datetime", "number", "number"] + [field["type"] for field in input_fields]
+    yield orjson.dumps({"columns": columns, "types": types}, option=orjson.OPT_APPEND_NEWLINE)
+    for batch in batches:
+        flattened = [_flatten(row, field_names) for row in batch]
+        if not flattened:
+            continue
+        yield orjson.dumps(
+            {"rows": len(flattened), "data": [list(values) for values in zip(*flattened)]},
+            option=orjson.OPT_APPEND_NEWLINE,
+        )
+
+EXPORT_WRITERS = {
+    "csv": iter_csv,
+    "ndjson": iter_ndjson,
+    "columnar": iter_columnar,
+}
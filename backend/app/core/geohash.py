@@ -0,0 +1,127 @@
+import math
+from typing import Iterable, List, Optional, Set, Tuple
+
+# Geohash: sel grid bertingkat yang dikodekan sebagai string base32. Titik yang berdekatan
+# berbagi prefix yang sama, sehingga "semua titik dalam sel X" menjadi range query biasa
+# pada index B-tree (tanpa PostGIS) baik di PostgreSQL maupun SQLite.
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {char: index for index, char in enumerate(BASE32)}
+STORED_PRECISION = 9  # ~4.8 m x 4.8 m
+MAX_COVER_CELLS = 32
+EARTH_RADIUS_M = 6371008.8
+
+def encode(lat: float, lng: float, precision: int = STORED_PRECISION) -> str:
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (interval[0] + interval[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            interval[0] = mid
+        else:
+            interval[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+def encode_or_none(lat: Optional[float], lng: Optional[float]) -> Optional[str]:
+    if lat is None or lng is None:
+        return None
+    return encode(lat, lng)
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """Tinggi (derajat lat) dan lebar (derajat lng) satu sel pada precision tertentu."""
+    lng_bits = math.ceil(precision * 5 / 2)
+    lat_bits = math.floor(precision * 5 / 2)
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+def prefix_upper_bound(prefix: str) -> Optional[str]:
+    """
+    String terkecil setelah semua geohash berprefix `prefix`, dengan menaikkan karakter terakhir.
+    Hanya memakai karakter base32 sehingga urutannya sama di semua collation. None = tanpa batas atas.
+    """
+    chars = list(prefix)
+    while chars:
+        index = _DECODE[chars[-1]]
+        if index + 1 < len(BASE32):
+            chars[-1] = BASE32[index + 1]
+            return "".join(chars)
+        chars.pop()
+    return None
+
+def _frange(start: float, stop: float, step: float) -> Iterable[float]:
+    value = start
+    while value < stop:
+        yield value
+        value += step
+    yield stop
+
+def split_bbox(min_lat: float, min_lng: float, max_lat: float, max_lng: float) -> List[Tuple[float, float, float, float]]:
+    """Bounding box yang melintasi antimeridian (min_lng > max_lng) dipecah menjadi dua."""
+    if min_lng <= max_lng:
+        return [(min_lat, min_lng, max_lat, max_lng)]
+    return [(min_lat, min_lng, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lng)]
+
+def cover(boxes: List[Tuple[float, float, float, float]], max_cells: int = MAX_COVER_CELLS) -> Set[str]:
+    """
+    Prefix geohash paling presisi yang menutupi semua bounding box dengan paling banyak max_cells sel.
+    Set kosong berarti area terlalu luas untuk dipersempit (cukup filter lat/lng biasa).
+    """
+    for precision in range(STORED_PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        estimate = sum(
+            (math.floor((max_lat - min_lat) / height) + 2) * (math.floor((max_lng - min_lng) / width) + 2)
+            for min_lat, min_lng, max_lat, max_lng in boxes
+        )
+        if estimate > max_cells * 4:
+            continue
+        cells = set()
+        for min_lat, min_lng, max_lat, max_lng in boxes:
+            # Jarak sampel sedikit lebih kecil dari ukuran sel agar tidak ada sel yang terlewat
+            for lat in _frange(min_lat, max_lat, height * 0.99):
+                for lng in _frange(min_lng, max_lng, width * 0.99):
+                    cells.add(encode(lat, lng, precision))
+        if len(cells) <= max_cells:
+            return cells
+    return set()
+
+def cover_ranges(boxes: List[Tuple[float, float, float, float]], max_cells: int = MAX_COVER_CELLS) -> List[Tuple[str, Optional[str]]]:
+    """Hasil cover() sebagai range [lower, upper) terurut; sel yang bersebelahan digabung."""
+    ranges: List[Tuple[str, Optional[str]]] = []
+    for cell in sorted(cover(boxes, max_cells)):
+        upper = prefix_upper_bound(cell)
+        if ranges and ranges[-1][1] == cell:
+            ranges[-1] = (ranges[-1][0], upper)
+        else:
+            ranges.append((cell, upper))
+    return ranges
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Jarak lingkaran besar dalam meter."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+def radius_bbox(lat: float, lng: float, radius_m: float) -> Tuple[float, float, float, float]:
+    """Bounding box yang memuat lingkaran radius_m di sekitar titik (lng bisa melintasi antimeridian)."""
+    d_lat = math.degrees(radius_m / EARTH_RADIUS_M)
+    min_lat, max_lat = max(-90.0, lat - d_lat), min(90.0, lat + d_lat)
+    if min_lat <= -90.0 or max_lat >= 90.0 or d_lat >= 90.0:
+        return min_lat, -180.0, max_lat, 180.0
+    d_lng = math.degrees(radius_m / (EARTH_RADIUS_M * math.cos(math.radians(max(abs(min_lat), abs(max_lat))))))
+    if d_lng >= 180.0:
+        return min_lat, -180.0, max_lat, 180.0
+    min_lng, max_lng = lng - d_lng, lng + d_lng
+    if min_lng < -180.0:
+        min_lng += 360.0
+    if max_lng > 180.0:
+        max_lng -= 360.0
+    return min_lat, min_lng, max_lat, max_lng
@@ -0,0 +1,263 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class SubmissionIngestor:
+    """
+    Mode write-behind untuk POST submission (SUBMISSION_WRITE_BEHIND). Request hanya memvalidasi,
+    memberi receipt, dan memasukkan baris ke antrean in-memory; thread writer menulisnya per batch
+    dengan satu INSERT multi-baris. Receipt disimpan sebagai idempotency_key submission, sehingga
+    statusnya tetap bisa dicek dari database setelah restart.
+
+    Jika INGEST_SPOOL_PATH diisi, setiap baris yang diterima juga ditambahkan ke file spool (JSON
+    per baris) dan diputar ulang saat start; file dikosongkan setiap kali antrean habis ditulis.
+    Spool bertahan dari crash proses (bukan dari mati listrik, karena tidak di-fsync per baris)
+    dan dipakai per proses worker, jadi setiap worker membutuhkan path sendiri.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, max_queue: int, spool_path: Optional[str], receipt_ttl: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spool_path = spool_path
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self._receipts = TTLCache(maxsize=max_queue * 4, ttl=receipt_ttl)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        # Menjaga urutan antrean + spool, dan pengosongan spool oleh writer
+        self._spool_lock = threading.Lock()
+        self._spool = None
+        # Baris yang gagal ditulis saat shutdown; dipertahankan di spool untuk diputar ulang saat start
+        self._unwritten: List[Dict[str, Any]] = []
+        self._stats_lock = threading.Lock()
+        self.accepted = 0
+        self.rejected = 0
+        self.written = 0
+        self.failed = 0
+        self.replayed = 0
+        self.batches = 0
+        self.last_batch_size = 0
+        self.last_flush_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    def submit(self, experiment_id: int, user_id: int, geo_lat: Optional[float], geo_lng: Optional[float], data_json: Dict[str, Any]) -> Dict[str, Any]:
+        """Antrekan satu submission yang sudah divalidasi. HTTP 429 jika antrean penuh."""
+        self.start()
+        receipt = uuid.uuid4().hex
+        row = {
+            "experiment_id": experiment_id,
+            "user_id": user_id,
+            "geo_lat": geo_lat,
+            "geo_lng": geo_lng,
+            "data_json": data_json,
+            "idempotency_key": receipt,
+            # Waktu submission = saat diterima, bukan saat ditulis writer
+            "timestamp": datetime.now(timezone.utc),
+        }
+        with self._spool_lock:
+            try:
+                self._queue.put_nowait(row)
+            except queue.Full:
+                with self._stats_lock:
+                    self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Antrean submission sedang penuh, silakan coba lagi",
+                    headers={"Retry-After": "1"},
+                )
+            self._append_spool(row)
+        entry = {"receipt": receipt, "status": "queued", "experiment_id": experiment_id, "user_id": user_id, "submission_id": None, "error": None}
+        self._receipts.set(receipt, entry)
+        with self._stats_lock:
+            self.accepted += 1
+        return entry
+
+    def receipt(self, receipt: str) -> Optional[Dict[str, Any]]:
+        return self._receipts.get(receipt)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                pending = self._open_spool()
+                self._thread = threading.Thread(target=self._run, name="submission-writer", daemon=True)
+                self._thread.start()
+                # Baris dari spool sebelumnya (proses berhenti sebelum sempat ditulis) diantrekan ulang
+                for row in pending:
+                    self._queue.put(row)
+                if pending:
+                    logger.info("Memutar ulang %d submission dari spool %s", len(pending), self.spool_path)
+                    with self._stats_lock:
+                        self.replayed += len(pending)
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Hentikan writer setelah antrean ditulis; sisa yang gagal tetap ada di spool."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        with self._spool_lock:
+            if self._spool is not None:
+                self._spool.close()
+                self._spool = None
+
+    def _open_spool(self) -> List[Dict[str, Any]]:
+        if not self.spool_path:
+            return []
+        pending = []
+        if os.path.exists(self.spool_path):
+            with open(self.spool_path, encoding="utf-8") as spool:
+                for line in spool:
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        continue  # baris terakhir yang terpotong saat crash
+                    row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+                    pending.append(row)
+        with self._spool_lock:
+            # Baris yang dulu gagal ditulis sudah ikut terbaca dari spool di atas
+            self._unwritten = []
+            if self._spool is None:
+                self._spool = open(self.spool_path, "a", encoding="utf-8")
+        return pending
+
+    def _append_spool(self, row: Dict[str, Any]) -> None:
+        if self._spool is None:
+            return
+        try:
+            self._spool.write(json.dumps({**row, "timestamp": row["timestamp"].isoformat()}) + "\n")
+            self._spool.flush()
+        except OSError:
+            logger.exception("Gagal menulis spool submission %s", self.spool_path)
+
+    def _truncate_spool_if_drained(self) -> None:
+        """Kosongkan spool jika antrean habis, kecuali baris yang belum berhasil ditulis."""
+        with self._spool_lock:
+            if self._spool is not None and self._queue.empty():
+                self._spool.truncate(0)
+                self._spool.seek(0)
+                for row in self._unwritten:
+                    self._append_spool(row)
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch:
+                if not self._write(batch):
+                    if self._spool is None:
+                        with self._stats_lock:
+                            self.failed += len(batch)
+                    else:
+                        with self._spool_lock:
+                            self._unwritten.extend(batch)
+                self._truncate_spool_if_drained()
+            elif self._stop.is_set():
+                return
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            if self._stop.is_set():
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except queue.Empty:
+                    break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=min(remaining, 0.5)))
+            except queue.Empty:
+                continue
+        return batch
+
+    def _write(self, batch: List[Dict[str, Any]]) -> bool:
+        """Tulis satu batch; False jika batch menyerah ditulis saat shutdown (baris tetap di spool)."""
+        from app.database import SessionLocal
+        from app.crud.submission import persist_queued_submissions
+
+        attempt = 0
+        while True:
+            try:
+                with SessionLocal() as db:
+                    try:
+                        results = persist_queued_submissions(db, batch)
+                    except IntegrityError:
+                        # Biasanya user sudah dihapus: tulis satu per satu agar baris lain tetap masuk
+                        db.rollback()
+                        results = {}
+                        for row in batch:
+                            try:
+                                results.update(persist_queued_submissions(db, [row]))
+                            except IntegrityError:
+                                db.rollback()
+                                results[row["idempotency_key"]] = {"status": "failed", "submission_id": None, "error": "User pengirim sudah dihapus"}
+                break
+            except Exception as exc:
+                # Database tidak tersedia: batch yang sama dicoba lagi (tetap tersimpan di spool)
+                attempt += 1
+                logger.exception("Gagal menulis %d submission (percobaan %d)", len(batch), attempt)
+                with self._stats_lock:
+                    self.last_error = str(exc)
+                if self._stop.is_set() and attempt >= 3:
+                    logger.error("Menyerah menulis %d submission saat shutdown; baris tetap di spool %s", len(batch), self.spool_path)
+                    return False
+                time.sleep(min(2 ** attempt, 30))
+
+        failed = 0
+        for row in batch:
+            result = results[row["idempotency_key"]]
+            entry = {"receipt": row["idempotency_key"], "experiment_id": row["experiment_id"], "user_id": row["user_id"]}
+            self._receipts.set(row["idempotency_key"], {**entry, **result})
+            failed += result["status"] == "failed"
+        with self._stats_lock:
+            self.written += len(batch) - failed
+            self.failed += failed
+            self.batches += 1
+            self.last_batch_size = len(batch)
+            self.last_flush_at = datetime.now(timezone.utc)
+        return True
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "enabled": settings.SUBMISSION_WRITE_BEHIND,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "accepted": self.accepted,
+                "rejected_queue_full": self.rejected,
+                "written": self.written,
+                "failed": self.failed,
+                "replayed": self.replayed,
+                "unwritten": len(self._unwritten),
+                "batches": self.batches,
+                "last_batch_size": self.last_batch_size,
+                "last_flush_at": self.last_flush_at,
+                "last_error": self.last_error,
+                "spool_path": self.spool_path,
+                "running": self._thread is not None and self._thread.is_alive(),
+            }
+
+submission_ingestor = SubmissionIngestor(
+    batch_size=settings.INGEST_BATCH_SIZE,
+    flush_interval=settings.INGEST_FLUSH_INTERVAL,
+    max_queue=settings.INGEST_QUEUE_SIZE,
+    spool_path=settings.INGEST_SPOOL_PATH,
+    receipt_ttl=settings.INGEST_RECEIPT_TTL,
+)
@@ -0,0 +1,198 @@
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Metrik disimpan per proses worker dalam format Prometheus (text exposition 0.0.4) tanpa
+# dependensi tambahan; jalankan scrape ke setiap worker atau pakai satu worker per container.
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name, self.documentation, self.labelnames = name, documentation, tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: LabelValues = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        lines += [f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in values]
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float], labelnames: Sequence[str] = ()):
+        self.name, self.documentation, self.labelnames = name, documentation, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Per label: jumlah observasi per bucket (non-kumulatif), sum, count
+        self._values: Dict[LabelValues, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            values = sorted((labels, (list(counts), total, count)) for labels, (counts, total, count) in self._values.items())
+        for labels, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                bucket_labels = _labels(self.labelnames + ("le",), labels + (_number(bound),))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames + ('le',), labels + ('+Inf',))} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+ROUTE_LABELS = ("method", "route")
+requests_total = Counter("flashfield_http_requests_total", "Jumlah request HTTP", ROUTE_LABELS + ("status",))
+request_duration = Histogram("flashfield_http_request_duration_seconds", "Durasi request HTTP", DURATION_BUCKETS, ROUTE_LABELS)
+request_db_queries = Histogram("flashfield_http_request_db_queries", "Jumlah query database per request", QUERY_COUNT_BUCKETS, ROUTE_LABELS)
+request_db_duration = Histogram("flashfield_http_request_db_duration_seconds", "Total waktu query database per request", DURATION_BUCKETS, ROUTE_LABELS)
+response_size = Histogram("flashfield_http_response_size_bytes", "Ukuran body respons HTTP", SIZE_BUCKETS, ROUTE_LABELS)
+db_queries_total = Counter("flashfield_db_queries_total", "Jumlah query database, termasuk di luar request (audit writer, job latar belakang)")
+db_query_seconds_total = Counter("flashfield_db_query_seconds_total", "Total waktu query database dalam detik")
+METRICS = [requests_total, request_duration, request_db_queries, request_db_duration, response_size, db_queries_total, db_query_seconds_total]
+
+class RequestStats:
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+# Statistik request yang sedang berjalan. Objeknya mutable sehingga query dari route sync
+# (threadpool, context hasil salinan) tetap tercatat ke request yang sama.
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("flashfield_request_stats", default=None)
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _current_request.get()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    db_queries_total.inc()
+    db_query_seconds_total.inc(amount=elapsed)
+    stats = _current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+
+def _handle_error(exception_context):
+    # Query yang gagal tidak memanggil after_cursor_execute; buang waktu mulainya
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start"):
+        connection.info["query_start"].pop()
+
+def instrument_engine(engine) -> None:
+    """Pasang hook pencatat jumlah dan waktu query pada engine sync (atau AsyncEngine.sync_engine)."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+def _route_label(scope) -> str:
+    # FastAPI menaruh route yang cocok di scope; path template menjaga jumlah label tetap kecil
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or "unmatched"
+
+class InstrumentationMiddleware:
+    """
+    Middleware ASGI yang mencatat latency, jumlah/waktu query database, dan ukuran respons per
+    route, lalu menambahkan header Server-Timing (app = waktu sampai header dikirim, db = waktu query).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        start = time.perf_counter()
+        status_code, body_size = 500, 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, body_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.SERVER_TIMING_HEADER:
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    timing = f'app;dur={elapsed_ms:.1f}, db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"'
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode("latin-1"))]
+            elif message["type"] == "http.response.body":
+                body_size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_request.reset(token)
+            duration = time.perf_counter() - start
+            labels = (scope["method"], _route_label(scope))
+            requests_total.inc(labels + (str(status_code),))
+            request_duration.observe(duration, labels)
+            request_db_queries.observe(stats.queries, labels)
+            request_db_duration.observe(stats.db_time, labels)
+            response_size.observe(body_size, labels)
+            if settings.REQUEST_QUERY_WARNING and stats.queries > settings.REQUEST_QUERY_WARNING:
+                # Biasanya tanda N+1 (lazy load di dalam loop)
+                logger.warning("%s %s menjalankan %d query (%.1f ms di database)", labels[0], labels[1], stats.queries, stats.db_time * 1000)
+
+def gauge_lines(name: str, documentation: str, samples: Iterable[Tuple[Dict[str, str], Optional[float]]], metric_type: str = "gauge") -> List[str]:
+    """Baris Prometheus untuk nilai yang dibaca saat scrape (kondisi pool, antrean audit)."""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {metric_type}"]
+    for labels, value in samples:
+        if value is not None:
+            lines.append(f"{name}{_labels(list(labels), labels.values())} {_number(value)}")
+    return lines
+
+def render_metrics(extra: Iterable[str] = ()) -> str:
+    lines: List[str] = []
+    for metric in METRICS:
+        lines += metric.render()
+    lines += list(extra)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,166 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import orjson
+from app.core.config import settings
+from app.crud.experiment_stat import rollup_deltas
+
+_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+def _merge_stat_rows(target: Dict[Tuple, dict], rows: Iterable[dict]) -> None:
+    """Gabungkan delta rollup (lihat app.crud.experiment_stat) per (day, field_name, category)."""
+    for row in rows:
+        key = (row["day"], row["field_name"], row["category"])
+        bucket = target.get(key)
+        if bucket is None:
+            target[key] = dict(row)
+            continue
+        bucket["count"] += row["count"]
+        for name in ("sum", "sum_sq"):
+            if row[name] is not None:
+                bucket[name] = (bucket[name] or 0.0) + row[name]
+        if row["min"] is not None:
+            bucket["min"] = row["min"] if bucket["min"] is None else min(bucket["min"], row["min"])
+        if row["max"] is not None:
+            bucket["max"] = row["max"] if bucket["max"] is None else max(bucket["max"], row["max"])
+
+class Subscription:
+    """
+    Satu client live feed. Submission disimpan sebagai JSON yang sudah diserialisasi dalam buffer
+    berukuran tetap: jika client terlalu lambat, item paling lama dibuang dan jumlahnya dilaporkan
+    lewat event "lagged". Delta statistik tidak pernah dibuang, tetapi digabung menjadi satu event.
+    Semua method kecuali close() dipanggil dari event loop milik subscription.
+    """
+
+    def __init__(self, experiment_id: int, loop: asyncio.AbstractEventLoop, buffer_size: int):
+        self.experiment_id = experiment_id
+        self.loop = loop
+        self._items: deque = deque(maxlen=buffer_size)
+        self._stats: Dict[Tuple, dict] = {}
+        self._dropped = 0
+        self._ready = asyncio.Event()
+        self.closed = False
+
+    def _push(self, payloads: List[bytes], stat_rows: List[dict]) -> int:
+        overflow = max(0, len(self._items) + len(payloads) - self._items.maxlen)
+        self._items.extend(payloads)
+        self._dropped += overflow
+        _merge_stat_rows(self._stats, stat_rows)
+        self._ready.set()
+        return overflow
+
+    def close(self) -> None:
+        self.closed = True
+        self.loop.call_soon_threadsafe(self._ready.set)
+
+    async def next_messages(self, timeout: float) -> Optional[List[Tuple[str, bytes]]]:
+        """
+        Tunggu event berikutnya: list (tipe, JSON), list kosong jika timeout (kirim heartbeat),
+        atau None jika subscription sudah ditutup.
+        """
+        if not self._ready.is_set():
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None if self.closed else []
+        if self.closed:
+            return None
+        self._ready.clear()
+        messages = []
+        if self._dropped:
+            messages.append(("lagged", orjson.dumps({"type": "lagged", "dropped": self._dropped})))
+            self._dropped = 0
+        if self._items:
+            items = b",".join(self._items)
+            self._items.clear()
+            messages.append(("submissions", b'{"type":"submissions","items":[' + items + b"]}"))
+        if self._stats:
+            rows = list(self._stats.values())
+            self._stats = {}
+            messages.append(("stats", orjson.dumps({"type": "stats", "rows": rows}, option=_JSON_OPTIONS)))
+        return messages
+
+class LiveFeed:
+    """
+    Broadcaster submission baru per experiment untuk endpoint live (SSE dan WebSocket).
+    Dipanggil oleh jalur create submission setelah commit dengan data yang sudah ada di memori,
+    sehingga jumlah penonton tidak menambah query database. Serialisasi dilakukan sekali per
+    submission, lalu byte yang sama dibagikan ke semua subscriber.
+
+    Feed ini per proses: dengan beberapa worker, subscriber hanya menerima submission yang
+    ditulis oleh worker yang sama (dan oleh writer write-behind di worker itu).
+    """
+
+    def __init__(self, buffer_size: int, max_subscribers: int):
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._count = 0
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, experiment_id: int) -> Optional[Subscription]:
+        """Daftarkan client baru (dipanggil dari event loop). None jika batas subscriber tercapai."""
+        subscription = Subscription(experiment_id, asyncio.get_running_loop(), self.buffer_size)
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                return None
+            self._subscribers.setdefault(experiment_id, set()).add(subscription)
+            self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.experiment_id)
+            if subscribers is None or subscription not in subscribers:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.experiment_id]
+            self._count -= 1
+        subscription.closed = True
+
+    def publish(self, experiment_id: int, input_fields: List[Dict[str, Any]], submissions: List[Dict[str, Any]]) -> None:
+        """
+        Kirim submission baru (dict dengan field schemas.submission.Submission) beserta delta
+        statistiknya. Aman dipanggil dari thread mana pun; tanpa subscriber tidak ada yang dikerjakan.
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.get(experiment_id, ()))
+        if not subscribers or not submissions:
+            return
+        payloads = [orjson.dumps(submission, option=_JSON_OPTIONS) for submission in submissions]
+        stat_rows = rollup_deltas(experiment_id, input_fields, [(row["timestamp"], row["data_json"]) for row in submissions])
+        by_loop: Dict[asyncio.AbstractEventLoop, List[Subscription]] = {}
+        for subscription in subscribers:
+            by_loop.setdefault(subscription.loop, []).append(subscription)
+        for loop, group in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(self._deliver, group, payloads, stat_rows)
+            except RuntimeError:
+                # Event loop sudah ditutup (proses sedang berhenti)
+                for subscription in group:
+                    self.unsubscribe(subscription)
+        with self._lock:
+            self.published += len(submissions)
+
+    def _deliver(self, subscribers: List[Subscription], payloads: List[bytes], stat_rows: List[dict]) -> None:
+        dropped = sum(subscription._push(payloads, stat_rows) for subscription in subscribers if not subscription.closed)
+        if dropped:
+            with self._lock:
+                self.dropped += dropped
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "subscribers": self._count,
+                "max_subscribers": self.max_subscribers,
+                "experiments": len(self._subscribers),
+                "published": self.published,
+                "dropped": self.dropped,
+                "buffer_size": self.buffer_size,
+            }
+
+live_feed = LiveFeed(buffer_size=settings.LIVE_FEED_CLIENT_BUFFER, max_subscribers=settings.LIVE_FEED_MAX_SUBSCRIBERS)
@@ -0,0 +1,18 @@
+import base64
+import json
+from datetime import datetime
+from fastapi import HTTPException
+
+# Cursor keyset (timestamp, id) dikodekan sebagai string opaque untuk client
+
+def encode_cursor(timestamp: datetime, item_id: int) -> str:
+    raw = json.dumps([timestamp.isoformat(), item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(timestamp), int(item_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor tidak valid")
@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from app.core.config import settings
+
+class PoolTelemetry:
+    """
+    Statistik checkout connection pool: berapa kali koneksi diminta, berapa lama menunggu,
+    dan berapa kali gagal karena pool penuh (TimeoutError). Aman dipakai lintas thread.
+    """
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=window)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            self._recent.append(waited)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = sorted(self._recent)
+            checkouts, timeouts, wait_total, wait_max = self.checkouts, self.timeouts, self.wait_total, self.wait_max
+
+        def percentile(fraction: float):
+            if not recent:
+                return None
+            return round(recent[min(len(recent) - 1, int(fraction * len(recent)))] * 1000, 3)
+
+        return {
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "wait_ms_avg": round(wait_total / checkouts * 1000, 3) if checkouts else None,
+            "wait_ms_max": round(wait_max * 1000, 3),
+            "wait_ms_p50": percentile(0.50),
+            "wait_ms_p95": percentile(0.95),
+        }
+
+class _InstrumentedPool:
+    """Mixin yang mengukur waktu connect(): menunggu slot kosong + membuka koneksi baru bila perlu."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.telemetry = PoolTelemetry()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.telemetry.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.telemetry.record(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # Pool baru (mis. setelah engine.dispose) tetap melaporkan ke telemetry yang sama
+        pool = super().recreate()
+        pool.telemetry = self.telemetry
+        return pool
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    pass
+
+def engine_options(url: str, is_async: bool = False) -> Dict[str, Any]:
+    """
+    Argumen pool untuk create_engine / create_async_engine sesuai Settings.
+    DB_USE_NULLPOOL dipakai di belakang PgBouncer: setiap session membuka koneksi sendiri
+    dan pooling diserahkan ke PgBouncer.
+    """
+    if settings.DB_USE_NULLPOOL:
+        return {"poolclass": NullPool}
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # SQLite in-memory memakai SingletonThreadPool; biarkan default SQLAlchemy
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+def pool_status(engine) -> Dict[str, Any]:
+    """Kondisi pool saat ini ditambah statistik waktu tunggu checkout."""
+    pool = engine.pool
+    status: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "timeout_s": settings.DB_POOL_TIMEOUT,
+        })
+    if isinstance(pool, _InstrumentedPool):
+        status.update(pool.telemetry.snapshot())
+    return status
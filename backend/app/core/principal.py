@@ -0,0 +1,25 @@
+from typing import Optional
+from app.core.cache import build_cache
+from app.core.config import settings
+from app.schemas.user import User as Principal
+
+# Cache identitas user yang sudah terautentikasi, dengan key subject token (email).
+# Hit cache berarti get_current_user tidak menyentuh database sama sekali.
+_cache = build_cache(
+    "principal",
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL,
+    shared=True,
+)
+
+def get_cached_principal(subject: str) -> Optional[Principal]:
+    data = _cache.get(subject)
+    return None if data is None else Principal.model_validate(data)
+
+def cache_principal(subject: str, user) -> Principal:
+    principal = Principal.model_validate(user)
+    _cache.set(subject, principal.model_dump(mode="json"))
+    return principal
+
+def invalidate_principal(subject: str) -> None:
+    _cache.delete(subject)
@@ -0,0 +1,92 @@
+import hashlib
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Callable, Optional
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from app.core.cache import build_cache
+from app.core.config import settings
+
+class ResponseCache:
+    """
+    Cache body respons JSON untuk endpoint publik yang sering dibaca, dengan key
+    versi + path + query string. Versi dinaikkan oleh operasi tulis (lihat invalidate)
+    sehingga entri lama tidak pernah terbaca lagi dan cukup menunggu kedaluwarsa.
+    Setiap respons membawa ETag dan Last-Modified; request kondisional dijawab 304 tanpa body.
+    """
+
+    def __init__(self, namespace: str, maxsize: int, ttl: float):
+        self.namespace = namespace
+        self._cache = build_cache(namespace, maxsize=maxsize, ttl=ttl, shared=True)
+        # Counter versi disimpan terpisah agar tidak ikut tergusur LRU entri respons
+        self._versions = build_cache(f"{namespace}-version", maxsize=1, ttl=ttl, shared=True)
+
+    def version(self) -> int:
+        return self._versions.get("version") or 0
+
+    def invalidate(self) -> None:
+        self._versions.incr("version")
+
+    def key(self, request: Request) -> str:
+        """Key cache untuk request pada versi saat ini; hitung sekali per request untuk get dan put."""
+        query = "&".join(sorted(f"{name}={value}" for name, value in request.query_params.multi_items()))
+        return f"v{self.version()}:{request.url.path}?{query}"
+
+    def get(self, key: str) -> Optional[dict]:
+        return self._cache.get(key)
+
+    def put(self, key: str, body: bytes) -> dict:
+        entry = {
+            "body": body.decode(),
+            "etag": '"' + hashlib.sha1(body).hexdigest() + '"',
+            "last_modified": formatdate(time.time(), usegmt=True),
+        }
+        self._cache.set(key, entry)
+        return entry
+
+    def response(self, request: Request, entry: dict) -> Response:
+        headers = {
+            "ETag": entry["etag"],
+            "Last-Modified": entry["last_modified"],
+            # Browser selalu revalidasi, dan revalidasi yang cocok cukup dijawab 304
+            "Cache-Control": "no-cache",
+        }
+        if _not_modified(request, entry):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry["body"], media_type="application/json", headers=headers)
+
+    def respond(self, request: Request, render: Callable[[], bytes]) -> Response:
+        """Jawab dari cache jika ada; jika tidak, panggil render() untuk body JSON lalu simpan."""
+        # Key (dan versinya) dibaca sebelum render: jika invalidate() terjadi selama render,
+        # body lama tersimpan di bawah versi lama dan tidak akan terbaca lagi
+        key = self.key(request)
+        entry = self.get(key)
+        if entry is None:
+            entry = self.put(key, render())
+        return self.response(request, entry)
+
+def _not_modified(request: Request, entry: dict) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or entry["etag"] in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return parsedate_to_datetime(entry["last_modified"]) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def render_json(schema: Any, value: Any) -> bytes:
+    """Serialisasi objek ORM/dict ke JSON sesuai schema response_model route."""
+    adapter = TypeAdapter(schema)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+# Respons publik experiment (list, detail, fields). TTL pendek menjaga submission_count tetap segar,
+# karena submission baru sengaja tidak menaikkan versi.
+experiment_responses = ResponseCache(
+    "experiment-responses",
+    maxsize=settings.RESPONSE_CACHE_SIZE,
+    ttl=settings.RESPONSE_CACHE_TTL,
+)
@@ -0,0 +1,106 @@
+import bisect
+import math
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Fallback pencarian experiment untuk database tanpa full-text search (SQLite untuk pengujian).
+# Tokenisasi dan bobot dibuat semirip mungkin dengan jalur PostgreSQL di app.crud.experiment:
+# konfigurasi 'simple' (huruf kecil, tanpa stemming), setiap kata query dicocokkan sebagai prefix,
+# dan bobot judul/deskripsi/label field mengikuti bobot default A/B/C ts_rank.
+
+TOKEN_PATTERN = re.compile(r"\w+")
+FIELD_WEIGHTS = (("title", 1.0), ("description", 0.4), ("labels", 0.2))
+HIGHLIGHT_START, HIGHLIGHT_STOP = "<mark>", "</mark>"
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return [token.lower() for token in TOKEN_PATTERN.findall(text or "")]
+
+def highlight(text: Optional[str], terms: List[str], max_words: Optional[int] = None) -> Optional[str]:
+    """
+    Tandai kata yang diawali salah satu term dengan <mark>…</mark>, seperti ts_headline.
+    Jika max_words diisi dan teks lebih panjang, hanya potongan di sekitar kecocokan pertama yang dikembalikan.
+    """
+    if text is None:
+        return None
+    words = list(TOKEN_PATTERN.finditer(text))
+    start, end = 0, len(text)
+    if max_words and len(words) > max_words:
+        first = next((index for index, word in enumerate(words) if word.group().lower().startswith(tuple(terms))), 0)
+        first = max(0, min(first - max_words // 5, len(words) - max_words))
+        start = words[first].start()
+        end = words[first + max_words - 1].end()
+    fragment = TOKEN_PATTERN.sub(
+        lambda match: f"{HIGHLIGHT_START}{match.group()}{HIGHLIGHT_STOP}" if match.group().lower().startswith(tuple(terms)) else match.group(),
+        text[start:end],
+    )
+    return ("… " if start > 0 else "") + fragment + (" …" if end < len(text) else "")
+
+class InvertedIndex:
+    """
+    Inverted index in-process: term -> {experiment_id: skor berbobot}. Dibangun ulang dari database
+    pada pencarian pertama setelah invalidate(), yang dipanggil setiap kali experiment dibuat,
+    diubah, atau dihapus. Hanya berlaku per proses (cukup untuk database pengujian).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._built_generation: Optional[int] = None
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._terms: List[str] = []
+        self.size = 0
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+
+    @property
+    def stale(self) -> bool:
+        return self._built_generation != self._generation
+
+    def rebuild(self, documents: Iterable[Tuple[int, Dict[str, Optional[str]]]], generation: int) -> None:
+        """Ganti isi index dengan dokumen (id, {"title", "description", "labels"})."""
+        postings: Dict[str, Dict[int, float]] = {}
+        size = 0
+        for document_id, fields in documents:
+            size += 1
+            for name, weight in FIELD_WEIGHTS:
+                for token in tokenize(fields.get(name)):
+                    scores = postings.setdefault(token, {})
+                    scores[document_id] = scores.get(document_id, 0.0) + weight
+        with self._lock:
+            self._postings = postings
+            self._terms = sorted(postings)
+            self.size = size
+            self._built_generation = generation
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def _prefix_matches(self, prefix: str) -> Dict[int, float]:
+        scores: Dict[int, float] = {}
+        index = bisect.bisect_left(self._terms, prefix)
+        while index < len(self._terms) and self._terms[index].startswith(prefix):
+            for document_id, score in self._postings[self._terms[index]].items():
+                scores[document_id] = scores.get(document_id, 0.0) + score
+            index += 1
+        return scores
+
+    def search(self, terms: List[str]) -> Dict[int, float]:
+        """Dokumen yang memuat semua term (sebagai prefix) beserta skornya (tf berbobot × idf)."""
+        with self._lock:
+            results: Optional[Dict[int, float]] = None
+            for term in terms:
+                matches = self._prefix_matches(term)
+                idf = math.log(1 + self.size / len(matches)) if matches else 0.0
+                if results is None:
+                    results = {document_id: score * idf for document_id, score in matches.items()}
+                else:
+                    results = {document_id: results[document_id] + score * idf for document_id, score in matches.items() if document_id in results}
+                if not results:
+                    return {}
+            return results or {}
+
+experiment_search_index = InvertedIndex()
@@ -0,0 +1,33 @@
+from typing import Any, Dict, Iterable, List, Optional
+import orjson
+from fastapi.responses import ORJSONResponse
+from app.core.config import settings
+
+# Jalur serialisasi cepat (opt-in lewat FAST_JSON_RESPONSES) untuk endpoint list yang berat.
+# Baris Submission dari database sudah pasti sesuai schema, jadi validasi ulang Pydantic
+# per item dilewati dan dict langsung di-dump oleh orjson.
+
+SUBMISSION_FIELDS = ("id", "experiment_id", "user_id", "geo_lat", "geo_lng", "data_json", "timestamp")
+
+class FastJSONResponse(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        # OPT_UTC_Z: datetime UTC ditulis dengan akhiran "Z", sama seperti output Pydantic
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+
+def submission_row(submission) -> Dict[str, Any]:
+    """Objek ORM Submission -> dict dengan field yang sama dengan schemas.submission.Submission."""
+    return {field: getattr(submission, field) for field in SUBMISSION_FIELDS}
+
+def submission_rows(submissions: Iterable) -> List[Dict[str, Any]]:
+    return [submission_row(submission) for submission in submissions]
+
+def submission_page_response(items: list, next_cursor: Optional[str], total: Optional[int]):
+    """
+    Respons SubmissionPage. Jika FAST_JSON_RESPONSES aktif, dikembalikan sebagai FastJSONResponse
+    (response_model route tidak lagi memvalidasi); jika tidak, dict biasa untuk jalur FastAPI default.
+    """
+    page = {"items": items, "next_cursor": next_cursor, "total": total}
+    if not settings.FAST_JSON_RESPONSES:
+        return page
+    page["items"] = submission_rows(items)
+    return FastJSONResponse(page)
@@ -0,0 +1,141 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+# Validator hasil kompilasi: menerima data_json, mengembalikan daftar pesan error (kosong jika valid)
+CompiledValidator = Callable[[Dict[str, Any]], List[str]]
+
+VALIDATOR_CACHE_SIZE = 1024
+
+# Angka desimal biasa untuk nilai field number yang dikirim sebagai teks (input HTML mengirim "70").
+# Sama dengan pola SQL di app.crud.experiment_stat.number_value, sehingga nilai yang lolos validasi
+# selalu bisa di-cast ke float di PostgreSQL (tanpa NaN/Infinity/underscore yang diterima float())
+NUMBER_PATTERN = r"^\s*[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]+)?\s*$"
+_number_re = re.compile(NUMBER_PATTERN)
+
+def parse_number(value) -> Optional[float]:
+    """Nilai field number sebagai float, atau None jika bukan angka (termasuk boolean JSON)."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and _number_re.match(value):
+        return float(value)
+    return None
+
+_cache: "OrderedDict[tuple, CompiledValidator]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+def _number_check(label: str, min_value, max_value):
+    def check(value):
+        number = parse_number(value)
+        if number is None:
+            return f"Field '{label}' harus berupa angka"
+        if min_value is not None and number < min_value:
+            return f"Field '{label}' harus minimal {min_value}"
+        if max_value is not None and number > max_value:
+            return f"Field '{label}' harus maksimal {max_value}"
+        return None
+    return check
+
+def _text_check(label: str, min_length, max_length):
+    def check(value):
+        if not isinstance(value, str):
+            return f"Field '{label}' harus berupa teks"
+        if min_length is not None and len(value) < min_length:
+            return f"Field '{label}' minimal {min_length} karakter"
+        if max_length is not None and len(value) > max_length:
+            return f"Field '{label}' maksimal {max_length} karakter"
+        return None
+    return check
+
+def _choice_check(label: str, options: List[str]):
+    allowed = frozenset(options)
+    message = f"Field '{label}' harus salah satu dari: {', '.join(options)}"
+    def check(value):
+        try:
+            return None if value in allowed else message
+        except TypeError:  # nilai tidak hashable (mis. list)
+            return message
+    return check
+
+def _checkbox_check(label: str, options: List[str]):
+    allowed = frozenset(options)
+    def check(value):
+        if not isinstance(value, list):
+            return f"Field '{label}' harus berupa array"
+        if allowed:
+            for item in value:
+                try:
+                    valid = item in allowed
+                except TypeError:
+                    valid = False
+                if not valid:
+                    return f"Field '{label}' mengandung pilihan tidak valid: {item}"
+        return None
+    return check
+
+def _compile_field(field_config: Dict[str, Any]) -> Optional[Callable[[Any], Optional[str]]]:
+    field_type = field_config['type']
+    label = field_config['label']
+    if field_type == 'number':
+        return _number_check(label, field_config.get('min_value'), field_config.get('max_value'))
+    if field_type in ('text', 'textarea'):
+        return _text_check(label, field_config.get('min_length'), field_config.get('max_length'))
+    if field_type in ('select', 'radio'):
+        options = field_config.get('options') or []
+        return _choice_check(label, options) if options else None
+    if field_type == 'checkbox':
+        return _checkbox_check(label, field_config.get('options') or [])
+    # date, time, datetime: tidak ada validasi tambahan
+    return None
+
+def compile_validator(input_fields: List[Dict[str, Any]]) -> CompiledValidator:
+    """
+    Ubah konfigurasi input_fields menjadi satu fungsi validasi.
+    Semua error dikumpulkan dalam satu kali jalan, tidak berhenti di error pertama.
+    """
+    compiled = []
+    for field_config in input_fields:
+        name = field_config['name']
+        required = field_config.get('required', True)
+        missing_message = f"Field '{field_config['label']}' ({name}) wajib diisi"
+        compiled.append((name, required, missing_message, _compile_field(field_config)))
+
+    def validate(data: Dict[str, Any]) -> List[str]:
+        errors = []
+        for name, required, missing_message, check in compiled:
+            if name not in data:
+                if required:
+                    errors.append(missing_message)
+                continue
+            if check is not None:
+                error = check(data[name])
+                if error:
+                    errors.append(error)
+        return errors
+
+    return validate
+
+def get_validator(experiment) -> CompiledValidator:
+    """Ambil validator experiment dari cache, kompilasi jika belum ada untuk versi config ini."""
+    key = (experiment.id, experiment.input_fields_version)
+    with _cache_lock:
+        validator = _cache.get(key)
+        if validator is not None:
+            _cache.move_to_end(key)
+            return validator
+
+    validator = compile_validator(experiment.input_fields)
+    with _cache_lock:
+        _cache[key] = validator
+        if len(_cache) > VALIDATOR_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return validator
+
+def invalidate_validator(experiment_id: int) -> None:
+    """Buang semua versi validator milik experiment dari cache proses ini."""
+    with _cache_lock:
+        for key in [key for key in _cache if key[0] == experiment_id]:
+            del _cache[key]
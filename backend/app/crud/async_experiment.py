@@ -0,0 +1,27 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from app import models
+from app.crud.experiment import experiment_filters
+
+# Varian async dari app.crud.experiment untuk endpoint baca yang paling sering dipanggil.
+# Relasi owner selalu dimuat eager karena lazy load tidak tersedia pada AsyncSession.
+
+async def get_experiment(db: AsyncSession, experiment_id: int):
+    result = await db.execute(
+        select(models.Experiment)
+        .options(joinedload(models.Experiment.owner))
+        .where(models.Experiment.id == experiment_id)
+    )
+    return result.scalar_one_or_none()
+
+async def get_experiments(db: AsyncSession, skip: int = 0, limit: int = 100, **filters):
+    result = await db.execute(
+        select(models.Experiment)
+        .options(joinedload(models.Experiment.owner))
+        .where(*experiment_filters(**filters))
+        .order_by(models.Experiment.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return result.scalars().all()
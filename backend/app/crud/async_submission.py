@@ -0,0 +1,65 @@
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models
+from app.crud import experiment_stat as stat_crud
+from app.crud import spatial as spatial_crud
+from app.crud.submission import check_submission, keyset_result, keyset_window
+from app.core.live_feed import live_feed
+from app.core.serialization import submission_row
+from app.schemas import submission as schemas
+
+# Varian async dari app.crud.submission. Validasi, cursor, dan delta rollup memakai
+# fungsi yang sama dengan jalur sync sehingga hasil kedua mode identik.
+
+async def create_submission(db: AsyncSession, submission: schemas.SubmissionCreate, user_id: int):
+    experiment = await db.get(models.Experiment, submission.experiment_id)
+    if not experiment:
+        raise HTTPException(status_code=404, detail="Experiment tidak ditemukan")
+
+    check_submission(experiment, submission)
+
+    db_submission = models.Submission(
+        experiment_id=submission.experiment_id,
+        user_id=user_id,
+        geo_lat=submission.geo_lat,
+        geo_lng=submission.geo_lng,
+        data_json=submission.data_json
+    )
+    db.add(db_submission)
+    await db.flush()
+    # Counter dan rollup statistik experiment diperbarui dalam transaksi yang sama
+    rows = stat_crud.rollup_rows(experiment, [(db_submission.timestamp, db_submission.data_json)])
+    if rows:
+        await db.execute(stat_crud.upsert_statement(db.bind.dialect.name), rows)
+    await db.execute(
+        update(models.Experiment)
+        .where(models.Experiment.id == submission.experiment_id)
+        .values(
+            submission_count=models.Experiment.submission_count + 1,
+            last_submission_at=func.now(),
+        )
+    )
+    await db.commit()
+    await db.refresh(db_submission)
+    live_feed.publish(submission.experiment_id, experiment.input_fields, [submission_row(db_submission)])
+    return db_submission
+
+async def _keyset_page(db: AsyncSession, statement, cursor: Optional[str], limit: int):
+    result = await db.execute(keyset_window(statement, cursor, limit))
+    return keyset_result(result.scalars().all(), limit)
+
+async def get_submissions_for_experiment(db: AsyncSession, experiment_id: int, cursor: Optional[str] = None, limit: int = 100, bbox: Optional[tuple] = None):
+    statement = select(models.Submission).where(models.Submission.experiment_id == experiment_id)
+    if bbox is not None:
+        statement = statement.where(*spatial_crud.bbox_filter(db.bind.dialect.name, bbox))
+    return await _keyset_page(db, statement, cursor, limit)
+
+async def get_submissions_by_user(db: AsyncSession, user_id: int, cursor: Optional[str] = None, limit: int = 100):
+    statement = select(models.Submission).where(models.Submission.user_id == user_id)
+    return await _keyset_page(db, statement, cursor, limit)
+
+async def count_submissions_by_user(db: AsyncSession, user_id: int) -> int:
+    result = await db.execute(select(func.count(models.Submission.id)).where(models.Submission.user_id == user_id))
+    return result.scalar()
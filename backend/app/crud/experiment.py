@@ -1,12 +1,184 @@
-from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from typing import Callable, Optional
+from sqlalchemy import Text, case, cast, func, literal_column, not_, or_
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session, joinedload
 from app import models
 from app.schemas import experiment as schemas
+from app.core.validation import invalidate_validator
+from app.core.config import settings
+from app.core.response_cache import experiment_responses
+from app.core.search_index import experiment_search_index, highlight, tokenize
+from app.crud import experiment_stat as experiment_stat_crud
+from app.crud import submission as submission_crud
 
 def get_experiment(db: Session, experiment_id: int):
     return db.query(models.Experiment).filter(models.Experiment.id == experiment_id).first()
 
-def get_experiments(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Experiment).order_by(models.Experiment.created_at.desc()).offset(skip).limit(limit).all()
+def _is_active(now: datetime):
+    return or_(models.Experiment.deadline.is_(None), models.Experiment.deadline > now)
+
+def experiment_filters(created_by: Optional[int] = None, status: Optional[str] = None,
+                       created_from: Optional[datetime] = None, created_to: Optional[datetime] = None) -> list:
+    """
+    Filter daftar experiment: pemilik, status ("active" = belum lewat deadline / tanpa deadline,
+    "expired" = deadline sudah lewat), dan rentang created_at [created_from, created_to).
+    Didukung index (created_by, created_at) dan (deadline).
+    """
+    filters = []
+    if created_by is not None:
+        filters.append(models.Experiment.created_by == created_by)
+    if status is not None:
+        active = _is_active(datetime.now(timezone.utc))
+        filters.append(active if status == "active" else not_(active))
+    if created_from is not None:
+        filters.append(models.Experiment.created_at >= created_from)
+    if created_to is not None:
+        filters.append(models.Experiment.created_at < created_to)
+    return filters
+
+def get_experiments(db: Session, skip: int = 0, limit: int = 100, **filters):
+    return (
+        db.query(models.Experiment)
+        .options(joinedload(models.Experiment.owner))
+        .filter(*experiment_filters(**filters))
+        .order_by(models.Experiment.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+# --- Pencarian full-text ---
+# PostgreSQL: tsvector berbobot (judul A, deskripsi B, label input_fields C) dengan index GIN
+# ix_experiments_search (migrasi 0010); database lain memakai inverted index in-process.
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>"
+DESCRIPTION_HEADLINE_OPTIONS = HEADLINE_OPTIONS + ", MaxWords=25, MinWords=10, MaxFragments=2, FragmentDelimiter=\" … \""
+
+def _text_config():
+    # Literal (bukan bind parameter) agar ekspresi sama persis dengan ekspresi index
+    if not settings.SEARCH_TEXT_CONFIG.isidentifier():
+        raise ValueError("SEARCH_TEXT_CONFIG tidak valid")
+    return literal_column(f"'{settings.SEARCH_TEXT_CONFIG}'::regconfig")
+
+def search_document():
+    """Ekspresi tsvector experiment; harus sama persis dengan index di migrate_db.migration_0010_experiment_search."""
+    experiment = models.Experiment
+    config = _text_config()
+    labels = func.jsonb_path_query_array(cast(experiment.input_fields, JSONB), literal_column("'$[*].label'"))
+    return (
+        func.setweight(func.to_tsvector(config, func.coalesce(experiment.title, literal_column("''"))), literal_column("'A'"))
+        .op("||")(func.setweight(func.to_tsvector(config, func.coalesce(experiment.description, literal_column("''"))), literal_column("'B'")))
+        .op("||")(func.setweight(func.to_tsvector(config, cast(labels, Text)), literal_column("'C'")))
+    )
+
+def _search_postgres(db: Session, terms: list, skip: int, limit: int, filters: dict):
+    experiment = models.Experiment
+    # Setiap kata dicocokkan sebagai prefix (cocok untuk pencarian sambil mengetik); token hanya \w
+    query = func.to_tsquery(_text_config(), " & ".join(f"{term}:*" for term in terms))
+    document = search_document()
+    conditions = [document.op("@@")(query), *experiment_filters(**filters)]
+    total = db.query(func.count(experiment.id)).filter(*conditions).scalar()
+    rank = func.ts_rank(document, query).label("rank")
+    page = (
+        db.query(experiment.id.label("id"), rank)
+        .filter(*conditions)
+        .order_by(rank.desc(), experiment.id.desc())
+        .offset(skip)
+        .limit(limit)
+        .subquery()
+    )
+    # ts_headline mahal, jadi hanya dihitung untuk baris di halaman ini
+    rows = (
+        db.query(
+            experiment,
+            page.c.rank,
+            func.ts_headline(_text_config(), experiment.title, query, HEADLINE_OPTIONS + ", HighlightAll=true"),
+            func.ts_headline(_text_config(), experiment.description, query, DESCRIPTION_HEADLINE_OPTIONS),
+        )
+        .join(page, page.c.id == experiment.id)
+        .options(joinedload(experiment.owner))
+        .order_by(page.c.rank.desc(), experiment.id.desc())
+        .all()
+    )
+    return rows, total
+
+def _search_fallback(db: Session, terms: list, skip: int, limit: int, filters: dict):
+    experiment = models.Experiment
+    index = experiment_search_index
+    if index.stale:
+        generation = index.generation()
+        documents = db.query(experiment.id, experiment.title, experiment.description, experiment.input_fields).all()
+        index.rebuild(
+            (
+                (experiment_id, {
+                    "title": title,
+                    "description": description,
+                    "labels": " ".join(str(field.get("label") or "") for field in input_fields or []),
+                })
+                for experiment_id, title, description, input_fields in documents
+            ),
+            generation,
+        )
+    scores = index.search(terms)
+    conditions = experiment_filters(**filters)
+    if conditions and scores:
+        allowed = {experiment_id for (experiment_id,) in db.query(experiment.id).filter(*conditions)}
+        scores = {experiment_id: score for experiment_id, score in scores.items() if experiment_id in allowed}
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+    page = ranked[skip:skip + limit]
+    experiments = {
+        row.id: row
+        for row in db.query(experiment).options(joinedload(experiment.owner)).filter(experiment.id.in_([experiment_id for experiment_id, _ in page]))
+    }
+    rows = [
+        (experiments[experiment_id], score, highlight(experiments[experiment_id].title, terms), highlight(experiments[experiment_id].description, terms, max_words=25))
+        for experiment_id, score in page
+        if experiment_id in experiments
+    ]
+    return rows, len(ranked)
+
+def search_experiments(db: Session, q: str, skip: int = 0, limit: int = 20, **filters):
+    """
+    Cari experiment berdasarkan judul, deskripsi, dan label input_fields. Hasil terurut relevansi
+    dengan potongan teks yang menandai kata yang cocok (<mark>…</mark>). Filter sama dengan get_experiments.
+    """
+    terms = tokenize(q)
+    if not terms:
+        return {"items": [], "total": 0}
+    search = _search_postgres if db.get_bind().dialect.name == "postgresql" else _search_fallback
+    rows, total = search(db, terms, skip, limit, filters)
+    items = []
+    for db_experiment, rank, title_highlight, description_highlight in rows:
+        item = schemas.ExperimentSummary.model_validate(db_experiment).model_dump()
+        item.update(rank=rank, title_highlight=title_highlight, description_highlight=description_highlight)
+        items.append(item)
+    return {"items": items, "total": total}
+
+def get_experiment_owner_summaries(db: Session, **filters):
+    """Jumlah experiment, status, dan total submission per pemilik, dihitung di database."""
+    experiment = models.Experiment
+    active = _is_active(datetime.now(timezone.utc))
+    experiment_count = func.count(experiment.id)
+    active_count = func.coalesce(func.sum(case((active, 1), else_=0)), 0)
+    rows = (
+        db.query(
+            models.User.id.label("owner_id"),
+            models.User.full_name,
+            models.User.email,
+            experiment_count.label("experiment_count"),
+            active_count.label("active_count"),
+            (experiment_count - active_count).label("expired_count"),
+            func.coalesce(func.sum(experiment.submission_count), 0).label("submission_count"),
+            func.max(experiment.created_at).label("latest_created_at"),
+            func.max(experiment.last_submission_at).label("last_submission_at"),
+        )
+        .join(experiment, experiment.created_by == models.User.id)
+        .filter(*experiment_filters(**filters))
+        .group_by(models.User.id, models.User.full_name, models.User.email)
+        .order_by(experiment_count.desc(), models.User.full_name)
+        .all()
+    )
+    return [row._asdict() for row in rows]
 
 def create_experiment(db: Session, experiment: schemas.ExperimentCreate, user_id: int):
     experiment_data = experiment.model_dump()
@@ -17,6 +189,8 @@ def create_experiment(db: Session, experiment: schemas.ExperimentCreate, user_id
     db.add(db_experiment)
     db.commit()
     db.refresh(db_experiment)
+    experiment_responses.invalidate()
+    experiment_search_index.invalidate()
     return db_experiment
 
 # def update_experiment(db: Session, db_obj: models.Experiment, obj_in: schemas.ExperimentUpdate):
@@ -42,17 +216,49 @@ def update_experiment(db: Session, db_obj: models.Experiment, obj_in: schemas.Ex
     # if 'input_fields' in update_data and update_data['input_fields'] is not None:
     #     update_data['input_fields'] = [field.dict() for field in update_data['input_fields']]
 
+    old_input_fields = db_obj.input_fields
+
     # Loop dan update field yang ada di database
     for field, value in update_data.items():
         setattr(db_obj, field, value)
 
+    # Versi baru membuat validator lama tidak terpakai lagi di semua worker. Bucket rollup field
+    # yang dihapus langsung dibuang; field baru / tipe berubah membuat rollup dibangun ulang di
+    # latar belakang (stats_stale), bukan di dalam request ini
+    rebuild_stats = False
+    if 'input_fields' in update_data:
+        db_obj.input_fields_version = models.Experiment.input_fields_version + 1
+        new_names = experiment_stat_crud.stats_fields(db_obj.input_fields)
+        experiment_stat_crud.drop_field_stats(
+            db, db_obj.id, [name for name in experiment_stat_crud.stats_fields(old_input_fields) if name not in new_names]
+        )
+        rebuild_stats = experiment_stat_crud.rollup_needs_rebuild(old_input_fields, db_obj.input_fields)
+        if rebuild_stats:
+            db_obj.stats_stale = True
+
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+    if rebuild_stats:
+        experiment_stat_crud.schedule_rebuild(db_obj.id)
+    invalidate_validator(db_obj.id)
+    experiment_responses.invalidate()
+    experiment_search_index.invalidate()
     return db_obj
 
-def delete_experiment(db: Session, experiment_id: int):
-    db_obj = db.query(models.Experiment).get(experiment_id)
-    db.delete(db_obj)
+def delete_experiment(db: Session, experiment_id: int, chunk_size: Optional[int] = None, progress: Optional[Callable[[int], None]] = None):
+    """
+    Hapus experiment beserta submission dan rollup-nya dengan DELETE massal, tanpa memuat baris anak
+    ke session. chunk_size dipakai untuk experiment yang sangat besar (lihat delete_submissions_where).
+    Mengembalikan jumlah submission yang terhapus.
+    """
+    deleted = submission_crud.delete_submissions_where(
+        db, models.Submission.experiment_id == experiment_id, chunk_size=chunk_size, progress=progress
+    )
+    db.query(models.ExperimentStat).filter(models.ExperimentStat.experiment_id == experiment_id).delete(synchronize_session=False)
+    db.query(models.Experiment).filter(models.Experiment.id == experiment_id).delete(synchronize_session=False)
     db.commit()
-    return db_obj
\ No newline at end of file
+    invalidate_validator(experiment_id)
+    experiment_responses.invalidate()
+    experiment_search_index.invalidate()
+    return deleted
\ No newline at end of file
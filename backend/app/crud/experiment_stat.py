@@ -0,0 +1,291 @@
+import logging
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import Float, and_, case, cast, delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app import models
+from app.core.validation import NUMBER_PATTERN, parse_number
+
+logger = logging.getLogger(__name__)
+
+# Rollup statistik per (experiment, hari, field, kategori). Baris dengan field_name kosong
+# menyimpan jumlah submission harian; field number memakai category kosong dan mengisi
+# count/sum/sum_sq/min/max; opsi select/radio/checkbox masing-masing satu baris dengan count.
+SUBMISSIONS_ROW = ""
+
+BucketKey = Tuple[date, str, str]
+
+def submission_day(timestamp: datetime) -> date:
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc)
+    return timestamp.date()
+
+def _contributions(input_fields: List[Dict[str, Any]], data_json: Dict[str, Any]):
+    """Uraikan satu submission menjadi (field_name, category, nilai numerik atau None)."""
+    yield SUBMISSIONS_ROW, "", None
+    for field in input_fields:
+        name = field["name"]
+        value = data_json.get(name)
+        if value is None:
+            continue
+        field_type = field["type"]
+        if field_type == "number":
+            number = parse_number(value)
+            if number is not None:
+                yield name, "", number
+        elif field_type in ("select", "radio"):
+            yield name, str(value), None
+        elif field_type == "checkbox" and isinstance(value, list):
+            for item in value:
+                yield name, str(item), None
+
+class _Accumulator:
+    """Kumpulkan delta rollup di memori agar ditulis sebagai satu upsert multi-baris."""
+
+    def __init__(self):
+        self.buckets: Dict[BucketKey, dict] = {}
+        # Nilai terkecil/terbesar yang dikurangi per (day, field_name), untuk hitung ulang min/max
+        self.removed_bounds: Dict[Tuple[date, str], List[float]] = {}
+
+    def add(self, input_fields, timestamp: datetime, data_json: Dict[str, Any], sign: int = 1):
+        day = submission_day(timestamp)
+        for field_name, category, value in _contributions(input_fields, data_json or {}):
+            bucket = self.buckets.setdefault(
+                (day, field_name, category),
+                {"count": 0, "sum": None, "sum_sq": None, "min": None, "max": None},
+            )
+            bucket["count"] += sign
+            if value is not None:
+                bucket["sum"] = (bucket["sum"] or 0.0) + sign * value
+                bucket["sum_sq"] = (bucket["sum_sq"] or 0.0) + sign * value * value
+                if sign > 0:
+                    bucket["min"] = value if bucket["min"] is None else min(bucket["min"], value)
+                    bucket["max"] = value if bucket["max"] is None else max(bucket["max"], value)
+                else:
+                    bounds = self.removed_bounds.setdefault((day, field_name), [value, value])
+                    bounds[0], bounds[1] = min(bounds[0], value), max(bounds[1], value)
+
+    def rows(self, experiment_id: int):
+        return [
+            {"experiment_id": experiment_id, "day": day, "field_name": field_name, "category": category, **values}
+            for (day, field_name, category), values in self.buckets.items()
+        ]
+
+def number_value(dialect: str, field_name: str):
+    """
+    Ekspresi SQL nilai field number di data_json sebagai float; NULL untuk nilai yang bukan angka
+    (mis. boolean), sama dengan parse_number. Di PostgreSQL cast ke float tanpa penjaga ini akan
+    error untuk satu nilai 'true' saja dan menggagalkan seluruh agregat.
+    """
+    data_json = models.Submission.data_json
+    value = data_json[field_name].as_float()
+    if dialect == "postgresql":
+        kind = func.jsonb_typeof(data_json[field_name])
+        text = data_json[field_name].as_string()
+        return case(
+            (kind == "number", value),
+            (and_(kind == "string", text.regexp_match(NUMBER_PATTERN)), value),
+        )
+    # JSON_EXTRACT SQLite tidak meng-cast teks ("70"), jadi cast eksplisit agar MIN/MAX membandingkan angka
+    kind = func.json_type(data_json, f'$."{field_name}"')
+    return case((kind.in_(("integer", "real", "text")), cast(value, Float)))
+
+def _upsert(db: Session, rows: List[dict]):
+    if rows:
+        db.execute(upsert_statement(db.get_bind().dialect.name), rows)
+
+def upsert_statement(dialect: str):
+    """INSERT ... ON CONFLICT DO UPDATE yang menambahkan delta ke bucket rollup yang sudah ada."""
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    least, greatest = (func.least, func.greatest) if dialect == "postgresql" else (func.min, func.max)
+    table = models.ExperimentStat
+    statement = insert(table)
+    excluded = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=["experiment_id", "day", "field_name", "category"],
+        set_={
+            "count": table.count + excluded.count,
+            "sum": func.coalesce(table.sum, 0.0) + excluded.sum,
+            "sum_sq": func.coalesce(table.sum_sq, 0.0) + excluded.sum_sq,
+            # COALESCE agar NULL di salah satu sisi tidak menghapus nilai lainnya
+            "min": least(func.coalesce(table.min, excluded.min), func.coalesce(excluded.min, table.min)),
+            "max": greatest(func.coalesce(table.max, excluded.max), func.coalesce(excluded.max, table.max)),
+        },
+    )
+    return statement
+
+def rollup_rows(experiment: models.Experiment, submissions: Iterable[Tuple[datetime, Dict[str, Any]]]) -> List[dict]:
+    """Delta rollup untuk submission baru (timestamp, data_json), siap dipakai upsert_statement."""
+    return rollup_deltas(experiment.id, experiment.input_fields, submissions)
+
+def rollup_deltas(experiment_id: int, input_fields: List[Dict[str, Any]], submissions: Iterable[Tuple[datetime, Dict[str, Any]]]) -> List[dict]:
+    """Sama dengan rollup_rows tanpa objek Experiment (dipakai setelah commit, lihat app.core.live_feed)."""
+    accumulator = _Accumulator()
+    for timestamp, data_json in submissions:
+        accumulator.add(input_fields, timestamp, data_json)
+    return accumulator.rows(experiment_id)
+
+def apply_submissions(db: Session, experiment: models.Experiment, submissions: Iterable[Tuple[datetime, Dict[str, Any]]]):
+    """Tambahkan submission baru (timestamp, data_json) ke rollup. Tidak melakukan commit."""
+    _upsert(db, rollup_rows(experiment, submissions))
+
+def remove_submission(db: Session, experiment: models.Experiment, timestamp: datetime, data_json: Dict[str, Any]):
+    """
+    Kurangi kontribusi satu submission dari rollup. Dipanggil setelah submission dihapus/diubah
+    (sudah di-flush) sehingga min/max bucket yang terdampak bisa dihitung ulang dari tabel submissions.
+    """
+    accumulator = _Accumulator()
+    accumulator.add(experiment.input_fields, timestamp, data_json, sign=-1)
+    apply_removals(db, experiment.id, accumulator)
+
+def collect_removals(db: Session, condition, batch_size: int = 5000) -> Dict[int, _Accumulator]:
+    """
+    Delta negatif rollup per experiment untuk submission yang memenuhi condition. Dipanggil sebelum
+    DELETE massal; hanya membaca baris yang akan dihapus, bukan seluruh submission experiment-nya.
+    """
+    accumulators: Dict[int, _Accumulator] = {}
+    input_fields: Dict[int, List[Dict[str, Any]]] = {}
+    statement = (
+        select(models.Submission.experiment_id, models.Submission.timestamp, models.Submission.data_json)
+        .where(condition)
+        .execution_options(yield_per=batch_size)
+    )
+    for experiment_id, timestamp, data_json in db.execute(statement):
+        if experiment_id not in input_fields:
+            input_fields[experiment_id] = db.query(models.Experiment.input_fields).filter(models.Experiment.id == experiment_id).scalar() or []
+            accumulators[experiment_id] = _Accumulator()
+        accumulators[experiment_id].add(input_fields[experiment_id], timestamp, data_json, sign=-1)
+    return accumulators
+
+def apply_removals(db: Session, experiment_id: int, accumulator: _Accumulator):
+    """
+    Terapkan delta negatif (lihat collect_removals) setelah submission-nya dihapus. min/max hanya
+    dihitung ulang dari tabel submissions untuk hari yang nilai terhapusnya adalah batas bucket.
+    Tidak melakukan commit.
+    """
+    _upsert(db, accumulator.rows(experiment_id))
+
+    table = models.ExperimentStat
+    for (day, field_name), (removed_min, removed_max) in accumulator.removed_bounds.items():
+        bucket = db.query(table).filter(
+            table.experiment_id == experiment_id, table.day == day,
+            table.field_name == field_name, table.category == "",
+        ).first()
+        # min/max tidak bisa dikurangi; hitung ulang hanya jika nilai yang dihapus adalah batasnya
+        if bucket is not None and bucket.count > 0 and (removed_min == bucket.min or removed_max == bucket.max):
+            value = number_value(db.get_bind().dialect.name, field_name)
+            start = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+            bucket.min, bucket.max = db.query(func.min(value), func.max(value)).filter(
+                models.Submission.experiment_id == experiment_id,
+                models.Submission.timestamp >= start,
+                models.Submission.timestamp < start + timedelta(days=1),
+            ).one()
+
+    db.execute(delete(table).where(table.experiment_id == experiment_id, table.count <= 0))
+
+def removed_submission_count(accumulator: _Accumulator) -> int:
+    """Jumlah submission yang tercakup delta (baris SUBMISSIONS_ROW), bernilai positif."""
+    return -sum(values["count"] for (_, field_name, _), values in accumulator.buckets.items() if field_name == SUBMISSIONS_ROW)
+
+def rebuild_experiment_stats(db: Session, experiment: models.Experiment, batch_size: int = 5000):
+    """Bangun ulang rollup satu experiment dari seluruh submission-nya. Tidak melakukan commit."""
+    db.execute(delete(models.ExperimentStat).where(models.ExperimentStat.experiment_id == experiment.id))
+    accumulator = _Accumulator()
+    statement = (
+        select(models.Submission.timestamp, models.Submission.data_json)
+        .where(models.Submission.experiment_id == experiment.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for timestamp, data_json in db.execute(statement):
+        accumulator.add(experiment.input_fields, timestamp, data_json)
+    # Upsert: submission baru yang masuk selama rebuild menambahkan delta ke bucket yang sama
+    _upsert(db, accumulator.rows(experiment.id))
+
+def stats_fields(input_fields: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Nama -> tipe field; hanya ini yang menentukan isi rollup (label, opsi, dll. tidak berpengaruh)."""
+    return {field["name"]: field["type"] for field in input_fields or []}
+
+def rollup_needs_rebuild(old_fields: List[Dict[str, Any]], new_fields: List[Dict[str, Any]]) -> bool:
+    """True jika ada field baru atau tipe field berubah, sehingga bucket-nya harus dihitung dari submissions."""
+    old_types = stats_fields(old_fields)
+    return any(old_types.get(name) != field_type for name, field_type in stats_fields(new_fields).items())
+
+def drop_field_stats(db: Session, experiment_id: int, field_names: Iterable[str]):
+    """Hapus bucket field yang sudah tidak ada di input_fields. Tidak melakukan commit."""
+    field_names = list(field_names)
+    if field_names:
+        table = models.ExperimentStat
+        db.execute(delete(table).where(table.experiment_id == experiment_id, table.field_name.in_(field_names)))
+
+def rebuild_stale_stats(db: Session, experiment_id: int) -> bool:
+    """
+    Bangun ulang rollup experiment yang ditandai stats_stale, lalu hapus tandanya jika input_fields
+    tidak berubah lagi selama rebuild (perubahan berikutnya menjadwalkan rebuild sendiri).
+    """
+    experiment = db.query(models.Experiment).filter(models.Experiment.id == experiment_id).first()
+    if experiment is None or not experiment.stats_stale:
+        return False
+    version = experiment.input_fields_version
+    rebuild_experiment_stats(db, experiment)
+    db.query(models.Experiment).filter(
+        models.Experiment.id == experiment_id, models.Experiment.input_fields_version == version
+    ).update({models.Experiment.stats_stale: False}, synchronize_session=False)
+    db.commit()
+    return True
+
+# experiment_id -> perlu diulang setelah rebuild yang sedang berjalan selesai
+_pending_rebuilds: Dict[int, bool] = {}
+_pending_lock = threading.Lock()
+
+def schedule_rebuild(experiment_id: int) -> None:
+    """
+    Jalankan rebuild_stale_stats di thread latar belakang (per proses, satu thread per experiment).
+    Selama experiment masih stats_stale, statistik dibaca langsung dari submissions.
+    """
+    with _pending_lock:
+        if experiment_id in _pending_rebuilds:
+            _pending_rebuilds[experiment_id] = True
+            return
+        _pending_rebuilds[experiment_id] = False
+    threading.Thread(target=_rebuild_worker, args=(experiment_id,), name=f"rebuild-stats-{experiment_id}", daemon=True).start()
+
+def _rebuild_worker(experiment_id: int) -> None:
+    from app.database import SessionLocal
+
+    while True:
+        try:
+            with SessionLocal() as db:
+                rebuild_stale_stats(db, experiment_id)
+        except Exception:
+            # Tanda stats_stale tetap ada; rebuild_stats.py bisa dijalankan manual
+            logger.exception("Gagal membangun ulang rollup experiment %s", experiment_id)
+        with _pending_lock:
+            if not _pending_rebuilds[experiment_id]:
+                del _pending_rebuilds[experiment_id]
+                return
+            _pending_rebuilds[experiment_id] = False
+
+def day_range(start: Optional[datetime], end: Optional[datetime]) -> Tuple[Optional[date], Optional[date]]:
+    """
+    Rentang hari UTC [start_day, end_day) untuk filter timestamp [start, end). end tepat tengah malam
+    UTC tidak mencakup hari itu, sama seperti jalur scan (timestamp < end).
+    """
+    start_day = submission_day(start) if start is not None else None
+    end_day = None
+    if end is not None:
+        end_day = submission_day(end)
+        if (end.astimezone(timezone.utc) if end.tzinfo is not None else end).time() != datetime.min.time():
+            end_day += timedelta(days=1)
+    return start_day, end_day
+
+def get_rollup_rows(db: Session, experiment_id: int, start: Optional[date] = None, end: Optional[date] = None):
+    """Bucket rollup dengan start <= day < end."""
+    table = models.ExperimentStat
+    query = db.query(table).filter(table.experiment_id == experiment_id)
+    if start is not None:
+        query = query.filter(table.day >= start)
+    if end is not None:
+        query = query.filter(table.day < end)
+    return query.all()
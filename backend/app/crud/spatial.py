@@ -0,0 +1,108 @@
+from typing import List, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+from app import models
+from app.core import geohash
+from app.core.config import settings
+
+Submission = models.Submission
+INITIAL_SEARCH_RADIUS_M = 250.0
+MAX_SEARCH_RADIUS_M = 20037509.0  # setengah keliling bumi: seluruh permukaan
+
+def use_postgis(dialect: str) -> bool:
+    return settings.SPATIAL_BACKEND == "postgis" and dialect == "postgresql"
+
+def _geography(lat, lng):
+    # Ekspresi harus identik dengan index GiST ix_submissions_geography (migrate_db.py)
+    return func.geography(func.ST_SetSRID(func.ST_MakePoint(lng, lat), 4326))
+
+def parse_bbox(min_lat: Optional[float], min_lng: Optional[float], max_lat: Optional[float], max_lng: Optional[float]):
+    """Bounding box dari query string: semua sisi diisi atau tidak sama sekali."""
+    sides = (min_lat, min_lng, max_lat, max_lng)
+    if all(side is None for side in sides):
+        return None
+    if any(side is None for side in sides):
+        raise HTTPException(status_code=400, detail="Bounding box membutuhkan min_lat, min_lng, max_lat, dan max_lng")
+    if min_lat > max_lat:
+        raise HTTPException(status_code=400, detail="min_lat harus lebih kecil atau sama dengan max_lat")
+    return sides
+
+def bbox_filter(dialect: str, bbox: Tuple[float, float, float, float]) -> list:
+    """
+    Filter SQL untuk submission di dalam bounding box (min_lng > max_lng = melintasi antimeridian).
+    Tanpa PostGIS, range prefix geohash mempersempit pencarian lewat index (experiment_id, geohash)
+    lalu dicocokkan ulang dengan lat/lng persis.
+    """
+    boxes = geohash.split_bbox(*bbox)
+    if use_postgis(dialect):
+        point = _geography(Submission.geo_lat, Submission.geo_lng)
+        return [or_(*[
+            point.op("&&")(func.geography(func.ST_MakeEnvelope(min_lng, min_lat, max_lng, max_lat, 4326)))
+            for min_lat, min_lng, max_lat, max_lng in boxes
+        ])]
+
+    clauses = [Submission.geo_lat.isnot(None), Submission.geo_lng.isnot(None)]
+    ranges = geohash.cover_ranges(boxes)
+    if ranges:
+        clauses.append(or_(*[
+            and_(Submission.geohash >= lower, Submission.geohash < upper) if upper else Submission.geohash >= lower
+            for lower, upper in ranges
+        ]))
+    clauses.append(or_(*[
+        and_(Submission.geo_lat.between(min_lat, max_lat), Submission.geo_lng.between(min_lng, max_lng))
+        for min_lat, min_lng, max_lat, max_lng in boxes
+    ]))
+    return clauses
+
+def get_nearby_submissions(db: Session, experiment_id: int, lat: float, lng: float, k: int = 100, radius_m: Optional[float] = None) -> List[Tuple[models.Submission, float]]:
+    """
+    Maksimal k submission terdekat dari titik (lat, lng), opsional dibatasi radius_m.
+    Mengembalikan [(submission, jarak_meter)] terurut dari yang terdekat.
+    """
+    dialect = db.get_bind().dialect.name
+    if use_postgis(dialect):
+        return _nearby_postgis(db, experiment_id, lat, lng, k, radius_m)
+
+    # Radius pencarian diperbesar bertahap sampai ada k titik di dalam lingkaran: titik di dalam
+    # lingkaran radius r pasti lebih dekat dari titik mana pun di luarnya. Hanya (id, lat, lng)
+    # yang diambil untuk kandidat; baris lengkap dimuat untuk k hasil akhir saja.
+    radius = INITIAL_SEARCH_RADIUS_M if radius_m is None else min(radius_m, INITIAL_SEARCH_RADIUS_M)
+    while True:
+        candidates = (
+            db.query(Submission.id, Submission.geo_lat, Submission.geo_lng)
+            .filter(Submission.experiment_id == experiment_id, *bbox_filter(dialect, geohash.radius_bbox(lat, lng, radius)))
+            .all()
+        )
+        within = sorted(
+            (distance, submission_id)
+            for submission_id, distance in (
+                (submission_id, geohash.haversine_m(lat, lng, point_lat, point_lng))
+                for submission_id, point_lat, point_lng in candidates
+            )
+            if distance <= radius
+        )
+        exhausted = radius >= MAX_SEARCH_RADIUS_M or (radius_m is not None and radius >= radius_m)
+        if len(within) >= k or exhausted:
+            break
+        radius = min(radius * 4, radius_m if radius_m is not None else MAX_SEARCH_RADIUS_M)
+
+    nearest = within[:k]
+    submissions = {
+        submission.id: submission
+        for submission in db.query(Submission).filter(Submission.id.in_([submission_id for _, submission_id in nearest]))
+    }
+    return [(submissions[submission_id], distance) for distance, submission_id in nearest]
+
+def _nearby_postgis(db: Session, experiment_id: int, lat: float, lng: float, k: int, radius_m: Optional[float]):
+    point = _geography(Submission.geo_lat, Submission.geo_lng)
+    target = _geography(lat, lng)
+    query = db.query(Submission, func.ST_Distance(point, target)).filter(
+        Submission.experiment_id == experiment_id,
+        Submission.geo_lat.isnot(None),
+        Submission.geo_lng.isnot(None),
+    )
+    if radius_m is not None:
+        query = query.filter(func.ST_DWithin(point, target, radius_m))
+    # Operator KNN <-> memakai index GiST untuk urutan jarak
+    return query.order_by(point.op("<->")(target)).limit(k).all()
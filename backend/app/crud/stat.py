@@ -0,0 +1,367 @@
+import math
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from sqlalchemy import Integer, String, and_, cast, func, literal, select, union_all
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+from app import models
+from app.crud import experiment_stat as experiment_stat_crud
+
+# Persentil yang dihitung untuk field number (hanya PostgreSQL)
+PERCENTILES = (0.25, 0.5, 0.75, 0.9)
+TIME_BUCKETS = ("day", "week", "month")
+NUMBER_TYPES = ("number",)
+CATEGORY_TYPES = ("select", "radio")
+MULTI_CATEGORY_TYPES = ("checkbox",)
+
+# Jumlah sel grid per tile peta 256px (kira-kira 1 sel setiap 8 piksel layar)
+HEATMAP_CELLS_PER_TILE = 32
+
+def heatmap_cell_size(zoom: int) -> float:
+    """Ukuran sel grid (derajat) yang sesuai dengan level zoom peta."""
+    return 360.0 / (2 ** zoom * HEATMAP_CELLS_PER_TILE)
+
+def get_heatmap_cells(
+    db: Session,
+    cell_size: float,
+    experiment_id: Optional[int] = None,
+    min_lat: Optional[float] = None,
+    min_lng: Optional[float] = None,
+    max_lat: Optional[float] = None,
+    max_lng: Optional[float] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = 5000,
+):
+    """
+    Kelompokkan submission ke dalam sel grid berdasarkan geo_lat/geo_lng.
+    Mengembalikan (lat rata-rata, lng rata-rata, jumlah) per sel, terpadat lebih dulu.
+    """
+    Submission = models.Submission
+    # Koordinat digeser agar selalu positif. PostgreSQL membulatkan saat CAST float ke integer,
+    # jadi di sana dipakai FLOOR; SQLite memotong (truncate), yang untuk bilangan positif sama dengan FLOOR
+    if db.get_bind().dialect.name == "postgresql":
+        to_cell = lambda value: cast(func.floor(value), Integer)
+    else:
+        to_cell = lambda value: cast(value, Integer)
+    lat_cell = to_cell((Submission.geo_lat + 90) / cell_size)
+    lng_cell = to_cell((Submission.geo_lng + 180) / cell_size)
+    weight = func.count(Submission.id)
+
+    query = db.query(
+        func.avg(Submission.geo_lat),
+        func.avg(Submission.geo_lng),
+        weight,
+    ).filter(Submission.geo_lat.isnot(None), Submission.geo_lng.isnot(None))
+
+    if experiment_id is not None:
+        query = query.filter(Submission.experiment_id == experiment_id)
+    if min_lat is not None:
+        query = query.filter(Submission.geo_lat >= min_lat)
+    if max_lat is not None:
+        query = query.filter(Submission.geo_lat <= max_lat)
+    if min_lng is not None:
+        query = query.filter(Submission.geo_lng >= min_lng)
+    if max_lng is not None:
+        query = query.filter(Submission.geo_lng <= max_lng)
+    if start is not None:
+        query = query.filter(Submission.timestamp >= start)
+    if end is not None:
+        query = query.filter(Submission.timestamp < end)
+
+    return query.group_by(lat_cell, lng_cell).order_by(weight.desc()).limit(limit).all()
+
+def _submission_filters(experiment_id: int, start: Optional[datetime], end: Optional[datetime]):
+    Submission = models.Submission
+    filters = [Submission.experiment_id == experiment_id]
+    if start is not None:
+        filters.append(Submission.timestamp >= start)
+    if end is not None:
+        filters.append(Submission.timestamp < end)
+    return and_(*filters)
+
+def _number_stats(db: Session, dialect: str, fields: List[Dict[str, Any]], where) -> tuple[int, Dict[str, dict]]:
+    """Satu SELECT berisi agregat semua field number, ditambah jumlah total submission."""
+    Submission = models.Submission
+    columns = [func.count(Submission.id)]
+    for field in fields:
+        value = experiment_stat_crud.number_value(dialect, field["name"])
+        columns += [func.count(value), func.min(value), func.max(value), func.sum(value), func.sum(value * value)]
+        if dialect == "postgresql":
+            columns += [func.percentile_cont(p).within_group(value) for p in PERCENTILES]
+
+    row = db.execute(select(*columns).where(where)).one()
+    total, values = row[0], list(row[1:])
+    result = {}
+    for field in fields:
+        count, minimum, maximum, total_sum, sum_sq = values[:5]
+        values = values[5:]
+        percentiles = None
+        if dialect == "postgresql":
+            percentiles = {f"p{int(p * 100)}": v for p, v in zip(PERCENTILES, values[:len(PERCENTILES)])}
+            values = values[len(PERCENTILES):]
+        result[field["name"]] = _summarize_number(count, total_sum, sum_sq, minimum, maximum, percentiles)
+    return total, result
+
+def _summarize_number(count, total_sum, sum_sq, minimum, maximum, percentiles=None) -> dict:
+    mean = total_sum / count if count else None
+    stddev = None
+    if count and count > 1:
+        # Varians sampel dari jumlah dan jumlah kuadrat; max(…, 0) meredam error pembulatan
+        stddev = math.sqrt(max((sum_sq - total_sum * total_sum / count) / (count - 1), 0.0))
+    return {
+        "count": count,
+        "min": minimum,
+        "max": maximum,
+        "mean": mean,
+        "stddev": stddev,
+        "percentiles": percentiles,
+    }
+
+def _array_elements(dialect: str, field_name: str):
+    """Table-valued function yang menguraikan array checkbox menjadi satu baris per opsi."""
+    Submission = models.Submission
+    if dialect == "postgresql":
+        array_value = cast(Submission.data_json[field_name], JSONB)
+        elements = func.jsonb_array_elements_text(array_value).table_valued("value")
+        return elements, func.jsonb_typeof(array_value) == "array"
+    elements = func.json_each(Submission.data_json, f'$."{field_name}"').table_valued("value")
+    return elements, func.json_type(Submission.data_json, f'$."{field_name}"') == "array"
+
+def _category_counts(db: Session, dialect: str, fields: List[Dict[str, Any]], where) -> Dict[str, Dict[str, int]]:
+    """Frekuensi kategori semua field select/radio/checkbox dalam satu query UNION ALL."""
+    Submission = models.Submission
+    selects = []
+    for field in fields:
+        name = field["name"]
+        if field["type"] in CATEGORY_TYPES:
+            value = Submission.data_json[name].as_string()
+            selects.append(
+                select(literal(name).label("field"), value.label("value"), func.count().label("total"))
+                .where(where, value.isnot(None))
+                .group_by(value)
+            )
+        else:
+            elements, is_array = _array_elements(dialect, name)
+            value = cast(elements.c.value, String)
+            selects.append(
+                select(literal(name).label("field"), value.label("value"), func.count().label("total"))
+                .select_from(Submission)
+                .join(elements, literal(True))
+                .where(where, is_array)
+                .group_by(value)
+            )
+    result = {field["name"]: {} for field in fields}
+    if selects:
+        for field_name, value, total in db.execute(union_all(*selects)):
+            result[field_name][value] = total
+    return result
+
+def _time_bucket(dialect: str, bucket: str):
+    timestamp = models.Submission.timestamp
+    if dialect == "postgresql":
+        return func.to_char(func.date_trunc(bucket, timestamp), "YYYY-MM-DD")
+    if bucket == "week":
+        return func.date(timestamp, "weekday 0", "-6 days")
+    if bucket == "month":
+        return func.strftime("%Y-%m-01", timestamp)
+    return func.date(timestamp)
+
+def get_submission_timeline(db: Session, experiment_id: int, bucket: str = "day", start: Optional[datetime] = None, end: Optional[datetime] = None):
+    dialect = db.get_bind().dialect.name
+    bucket_column = _time_bucket(dialect, bucket).label("bucket")
+    rows = db.execute(
+        select(bucket_column, func.count(models.Submission.id))
+        .where(_submission_filters(experiment_id, start, end))
+        .group_by(bucket_column)
+        .order_by(bucket_column)
+    )
+    return [{"bucket": bucket_value, "count": count} for bucket_value, count in rows]
+
+def _bucket_start(day: date, bucket: str) -> date:
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+def _assemble(experiment: models.Experiment, total: int, bucket: str, number_stats, category_counts, timeline):
+    fields = []
+    for field in experiment.input_fields or []:
+        name = field["name"]
+        if name not in number_stats and name not in category_counts:
+            continue
+        fields.append({
+            "name": name,
+            "label": field["label"],
+            "type": field["type"],
+            "unit": field.get("unit"),
+            "number": number_stats.get(name),
+            "categories": category_counts.get(name),
+        })
+    return {
+        "experiment_id": experiment.id,
+        "total_submissions": total,
+        "bucket": bucket,
+        "fields": fields,
+        "timeline": timeline,
+    }
+
+def get_field_stats_from_rollup(
+    db: Session,
+    experiment: models.Experiment,
+    bucket: str = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """
+    Statistik yang sama dengan get_field_stats, dibaca dari tabel rollup experiment_stats
+    (O(hari × field) baris, tanpa memindai submissions). Filter waktu beresolusi harian.
+    """
+    start_day, end_day = experiment_stat_crud.day_range(start, end)
+    rows = experiment_stat_crud.get_rollup_rows(db, experiment.id, start=start_day, end=end_day)
+    input_fields = experiment.input_fields or []
+    number_names = {f["name"] for f in input_fields if f["type"] in NUMBER_TYPES}
+    category_names = {f["name"] for f in input_fields if f["type"] in CATEGORY_TYPES + MULTI_CATEGORY_TYPES}
+
+    total = 0
+    timeline: Dict[date, int] = {}
+    numbers = {name: [0, 0.0, 0.0, None, None] for name in number_names}
+    category_counts: Dict[str, Dict[str, int]] = {name: {} for name in category_names}
+    for row in rows:
+        if row.field_name == experiment_stat_crud.SUBMISSIONS_ROW:
+            total += row.count
+            bucket_day = _bucket_start(row.day, bucket)
+            timeline[bucket_day] = timeline.get(bucket_day, 0) + row.count
+        elif row.field_name in numbers:
+            acc = numbers[row.field_name]
+            acc[0] += row.count
+            acc[1] += row.sum or 0.0
+            acc[2] += row.sum_sq or 0.0
+            acc[3] = row.min if acc[3] is None else min(acc[3], row.min)
+            acc[4] = row.max if acc[4] is None else max(acc[4], row.max)
+        elif row.field_name in category_counts:
+            counts = category_counts[row.field_name]
+            counts[row.category] = counts.get(row.category, 0) + row.count
+
+    number_stats = {name: _summarize_number(*acc) for name, acc in numbers.items()}
+    timeline_list = [{"bucket": day.isoformat(), "count": count} for day, count in sorted(timeline.items())]
+    return _assemble(experiment, total, bucket, number_stats, category_counts, timeline_list)
+
+def get_field_stats(
+    db: Session,
+    experiment: models.Experiment,
+    bucket: str = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """
+    Statistik per field berdasarkan Experiment.input_fields, dihitung seluruhnya di database.
+    Jumlah query tetap (agregat number, frekuensi kategori, timeline) berapa pun jumlah field.
+    """
+    dialect = db.get_bind().dialect.name
+    where = _submission_filters(experiment.id, start, end)
+    input_fields = experiment.input_fields or []
+    number_fields = [f for f in input_fields if f["type"] in NUMBER_TYPES]
+    category_fields = [f for f in input_fields if f["type"] in CATEGORY_TYPES + MULTI_CATEGORY_TYPES]
+
+    total, number_stats = _number_stats(db, dialect, number_fields, where)
+    category_counts = _category_counts(db, dialect, category_fields, where)
+    timeline = get_submission_timeline(db, experiment.id, bucket=bucket, start=start, end=end)
+    return _assemble(experiment, total, bucket, number_stats, category_counts, timeline)
+
+def get_platform_overview(db: Session, days: int = 90, top: int = 5):
+    """
+    Agregat seluruh platform untuk dashboard admin, seluruhnya dari query ber-GROUP BY
+    (counter experiment, rollup harian, dan tabel users), tanpa memuat baris mentah.
+    """
+    User, Experiment, Submission = models.User, models.Experiment, models.Submission
+    Stat = models.ExperimentStat
+    now = datetime.now(timezone.utc)
+    today = now.date()
+
+    roles = dict(
+        db.query(User.role, func.count(User.id)).filter(User.role != "admin").group_by(User.role).all()
+    )
+    total_experiments, total_submissions = db.query(
+        func.count(Experiment.id), func.coalesce(func.sum(Experiment.submission_count), 0)
+    ).one()
+    active_experiments = db.query(func.count(Experiment.id)).filter(
+        Experiment.last_submission_at >= now - timedelta(days=7),
+        (Experiment.deadline.is_(None)) | (Experiment.deadline > now),
+    ).scalar()
+
+    # Jumlah submission harian dari rollup (baris field_name kosong)
+    daily_rows = (
+        db.query(Stat.day, func.sum(Stat.count))
+        .filter(Stat.field_name == experiment_stat_crud.SUBMISSIONS_ROW, Stat.day > today - timedelta(days=max(days, 30)))
+        .group_by(Stat.day)
+        .all()
+    )
+    daily = {day: int(count) for day, count in daily_rows}
+
+    def submissions_between(start_days_ago: int, end_days_ago: int) -> int:
+        start, end = today - timedelta(days=start_days_ago), today - timedelta(days=end_days_ago)
+        return sum(count for day, count in daily.items() if start < day <= end)
+
+    last_week = submissions_between(7, 0)
+    previous_week = submissions_between(14, 7)
+    if previous_week:
+        trend = round((last_week - previous_week) / previous_week * 100)
+    else:
+        trend = 100 if last_week else 0
+
+    researcher_rows = (
+        db.query(User.id, User.full_name, func.count(Experiment.id), func.coalesce(func.sum(Experiment.submission_count), 0))
+        .join(Experiment, Experiment.created_by == User.id)
+        .filter(User.role == "researcher")
+        .group_by(User.id, User.full_name)
+        .order_by(func.count(Experiment.id).desc())
+        .limit(top)
+        .all()
+    )
+    experiment_rows = (
+        db.query(Experiment.id, Experiment.title, User.full_name, Experiment.submission_count)
+        .join(User, Experiment.created_by == User.id)
+        .order_by(Experiment.submission_count.desc())
+        .limit(top)
+        .all()
+    )
+    contribution_count = func.count(Submission.id)
+    volunteer_rows = (
+        db.query(User.id, User.full_name, contribution_count, func.count(func.distinct(Submission.experiment_id)))
+        .join(Submission, Submission.user_id == User.id)
+        .filter(User.role == "volunteer")
+        .group_by(User.id, User.full_name)
+        .order_by(contribution_count.desc())
+        .limit(top)
+        .all()
+    )
+
+    return {
+        "total_users": sum(roles.values()),
+        "roles": roles,
+        "total_experiments": total_experiments,
+        "active_experiments": active_experiments,
+        "total_submissions": int(total_submissions),
+        "recent_submissions": submissions_between(30, 0),
+        "avg_submissions_per_experiment": round(int(total_submissions) / max(total_experiments, 1)),
+        "submission_trend": trend,
+        "submissions_by_date": [
+            {"bucket": day.isoformat(), "count": count}
+            for day, count in sorted(daily.items()) if day > today - timedelta(days=days)
+        ],
+        "top_researchers": [
+            {"id": id_, "name": name, "experiments": experiments, "submissions": int(submissions)}
+            for id_, name, experiments, submissions in researcher_rows
+        ],
+        "top_experiments": [
+            {"id": id_, "title": title, "owner_name": owner_name, "submissions": submissions}
+            for id_, title, owner_name, submissions in experiment_rows
+        ],
+        "top_volunteers": [
+            {"id": id_, "name": name, "submissions": submissions, "experiments": experiments}
+            for id_, name, submissions, experiments in volunteer_rows
+        ],
+        "generated_at": now,
+    }
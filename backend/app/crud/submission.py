@@ -1,99 +1,40 @@
+from sqlalchemy import and_, func, insert, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from app import models
+from app.crud import experiment_stat as stat_crud
+from app.crud import spatial as spatial_crud
+from app.core.geohash import encode_or_none
+from app.core.live_feed import live_feed
+from app.core.serialization import submission_row
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.validation import get_validator
 from app.schemas import submission as schemas
-from typing import Dict, Any
+from typing import Callable, Dict, Any, List, Optional
 
 def validate_submission_data(experiment: models.Experiment, submission_data: Dict[str, Any]) -> None:
     """
-    Validasi data submission berdasarkan konfigurasi input_fields experiment
+    Validasi data submission berdasarkan konfigurasi input_fields experiment.
+    Semua field yang tidak valid dilaporkan sekaligus.
     """
-    input_fields = experiment.input_fields
-    
-    # Validasi setiap field yang dikonfigurasi
-    for field_config in input_fields:
-        field_name = field_config['name']
-        field_type = field_config['type']
-        is_required = field_config.get('required', True)
-        
-        # Cek apakah field wajib ada
-        if is_required and field_name not in submission_data:
+    errors = get_validator(experiment)(submission_data)
+    if errors:
+        raise HTTPException(status_code=400, detail="; ".join(errors))
+
+def check_submission(experiment: models.Experiment, submission: schemas.SubmissionBase) -> None:
+    """Validasi lokasi dan data_json satu submission terhadap experiment-nya (HTTP 400 jika tidak valid)."""
+    # Validasi apakah lokasi diperlukan
+    if experiment.require_location:
+        if submission.geo_lat is None or submission.geo_lng is None:
             raise HTTPException(
-                status_code=400, 
-                detail=f"Field '{field_config['label']}' ({field_name}) wajib diisi"
+                status_code=400,
+                detail="Experiment ini memerlukan data lokasi (latitude dan longitude)"
             )
-        
-        # Skip validasi jika field tidak ada dan tidak wajib
-        if field_name not in submission_data:
-            continue
-            
-        value = submission_data[field_name]
-        
-        # Validasi tipe data
-        if field_type == 'number':
-            try:
-                float(value)
-                # Validasi range jika ada
-                if 'min_value' in field_config and field_config['min_value'] is not None:
-                    if float(value) < field_config['min_value']:
-                        raise HTTPException(
-                            status_code=400,
-                            detail=f"Field '{field_config['label']}' harus minimal {field_config['min_value']}"
-                        )
-                if 'max_value' in field_config and field_config['max_value'] is not None:
-                    if float(value) > field_config['max_value']:
-                        raise HTTPException(
-                            status_code=400,
-                            detail=f"Field '{field_config['label']}' harus maksimal {field_config['max_value']}"
-                        )
-            except ValueError:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Field '{field_config['label']}' harus berupa angka"
-                )
-        
-        elif field_type in ['text', 'textarea']:
-            if not isinstance(value, str):
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Field '{field_config['label']}' harus berupa teks"
-                )
-            # Validasi panjang teks
-            if 'min_length' in field_config and field_config['min_length'] is not None:
-                if len(value) < field_config['min_length']:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Field '{field_config['label']}' minimal {field_config['min_length']} karakter"
-                    )
-            if 'max_length' in field_config and field_config['max_length'] is not None:
-                if len(value) > field_config['max_length']:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Field '{field_config['label']}' maksimal {field_config['max_length']} karakter"
-                    )
-        
-        elif field_type in ['select', 'radio']:
-            options = field_config.get('options', [])
-            if options and value not in options:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Field '{field_config['label']}' harus salah satu dari: {', '.join(options)}"
-                )
-        
-        elif field_type == 'checkbox':
-            if not isinstance(value, list):
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Field '{field_config['label']}' harus berupa array"
-                )
-            options = field_config.get('options', [])
-            if options:
-                for item in value:
-                    if item not in options:
-                        raise HTTPException(
-                            status_code=400,
-                            detail=f"Field '{field_config['label']}' mengandung pilihan tidak valid: {item}"
-                        )
+
+    # Validasi data sesuai konfigurasi field
+    validate_submission_data(experiment, submission.data_json)
 
 def create_submission(db: Session, submission: schemas.SubmissionCreate, user_id: int):
     # Ambil experiment untuk validasi
@@ -104,16 +45,7 @@ def create_submission(db: Session, submission: schemas.SubmissionCreate, user_id
     if not experiment:
         raise HTTPException(status_code=404, detail="Experiment tidak ditemukan")
     
-    # Validasi apakah lokasi diperlukan
-    if experiment.require_location:
-        if submission.geo_lat is None or submission.geo_lng is None:
-            raise HTTPException(
-                status_code=400,
-                detail="Experiment ini memerlukan data lokasi (latitude dan longitude)"
-            )
-    
-    # Validasi data sesuai konfigurasi field
-    validate_submission_data(experiment, submission.data_json)
+    check_submission(experiment, submission)
     
     db_submission = models.Submission(
         experiment_id=submission.experiment_id,
@@ -123,19 +55,241 @@ def create_submission(db: Session, submission: schemas.SubmissionCreate, user_id
         data_json=submission.data_json
     )
     db.add(db_submission)
+    db.flush()
+    # Counter dan rollup statistik experiment diperbarui dalam transaksi yang sama
+    stat_crud.apply_submissions(db, experiment, [(db_submission.timestamp, db_submission.data_json)])
+    db.query(models.Experiment).filter(models.Experiment.id == submission.experiment_id).update(
+        {
+            models.Experiment.submission_count: models.Experiment.submission_count + 1,
+            models.Experiment.last_submission_at: func.now(),
+        },
+        synchronize_session=False,
+    )
+    # Diambil sebelum commit: setelah commit atribut experiment kedaluwarsa dan akan di-query ulang
+    input_fields = experiment.input_fields
     db.commit()
     db.refresh(db_submission)
+    live_feed.publish(submission.experiment_id, input_fields, [submission_row(db_submission)])
     return db_submission
 
-def get_submissions_for_experiment(db: Session, experiment_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Submission).filter(models.Submission.experiment_id == experiment_id).offset(skip).limit(limit).all()
+def _submission_errors(experiment: models.Experiment, item: schemas.SubmissionBase) -> List[str]:
+    """Kumpulkan alasan penolakan satu item batch tanpa menghentikan item lainnya."""
+    errors = []
+    if experiment.require_location and (item.geo_lat is None or item.geo_lng is None):
+        errors.append("Experiment ini memerlukan data lokasi (latitude dan longitude)")
+    errors.extend(get_validator(experiment)(item.data_json))
+    return errors
+
+def create_submissions_batch(db: Session, experiment_id: int, items: List[schemas.SubmissionBatchItem], user_id: int):
+    """
+    Simpan banyak submission sekaligus dalam satu transaksi dan satu INSERT multi-baris.
+    Item dengan idempotency_key yang sudah pernah diterima dilaporkan sebagai duplicate.
+    """
+    experiment = db.query(models.Experiment).filter(models.Experiment.id == experiment_id).first()
+    if not experiment:
+        raise HTTPException(status_code=404, detail="Experiment tidak ditemukan")
+
+    keys = {item.idempotency_key for item in items if item.idempotency_key}
+    known_keys = {}
+    if keys:
+        known_keys = dict(
+            db.query(models.Submission.idempotency_key, models.Submission.id)
+            .filter(models.Submission.user_id == user_id, models.Submission.idempotency_key.in_(keys))
+            .all()
+        )
+
+    results = []
+    rows = []
+    pending = []  # (index hasil, idempotency_key) untuk baris yang akan di-insert
+    batch_keys = set()
+    for index, item in enumerate(items):
+        key = item.idempotency_key
+        result = {"index": index, "idempotency_key": key}
+        if key and (key in known_keys or key in batch_keys):
+            result.update(status="duplicate", submission_id=known_keys.get(key))
+        else:
+            errors = _submission_errors(experiment, item)
+            if errors:
+                result.update(status="rejected", errors=errors)
+            else:
+                result.update(status="accepted")
+                rows.append({
+                    "experiment_id": experiment_id,
+                    "user_id": user_id,
+                    "geo_lat": item.geo_lat,
+                    "geo_lng": item.geo_lng,
+                    "data_json": item.data_json,
+                    "idempotency_key": key,
+                })
+                pending.append(index)
+                if key:
+                    batch_keys.add(key)
+        results.append(result)
+
+    if rows:
+        try:
+            inserted = db.execute(
+                insert(models.Submission).returning(
+                    models.Submission.id, models.Submission.timestamp, sort_by_parameter_order=True
+                ),
+                rows,
+            ).all()
+            new_ids = [new_id for new_id, _ in inserted]
+            stat_crud.apply_submissions(
+                db, experiment, [(timestamp, row["data_json"]) for (_, timestamp), row in zip(inserted, rows)]
+            )
+            db.query(models.Experiment).filter(models.Experiment.id == experiment_id).update(
+                {
+                    models.Experiment.submission_count: models.Experiment.submission_count + len(rows),
+                    models.Experiment.last_submission_at: func.now(),
+                },
+                synchronize_session=False,
+            )
+            input_fields = experiment.input_fields
+            db.commit()
+        except IntegrityError:
+            # Batch yang sama sedang dikirim bersamaan; pengiriman ulang akan menandainya sebagai duplicate
+            db.rollback()
+            raise HTTPException(status_code=409, detail="Idempotency key sedang diproses, silakan kirim ulang")
+
+        for index, new_id in zip(pending, new_ids):
+            results[index]["submission_id"] = new_id
+        live_feed.publish(experiment_id, input_fields, [
+            {"id": new_id, "experiment_id": experiment_id, "user_id": user_id, "geo_lat": row["geo_lat"],
+             "geo_lng": row["geo_lng"], "data_json": row["data_json"], "timestamp": timestamp}
+            for (new_id, timestamp), row in zip(inserted, rows)
+        ])
+        # Duplikat di dalam batch yang sama merujuk ke submission yang baru dibuat
+        created_by_key = {results[index]["idempotency_key"]: results[index]["submission_id"] for index in pending}
+        for result in results:
+            if result["status"] == "duplicate" and result["submission_id"] is None:
+                result["submission_id"] = created_by_key.get(result["idempotency_key"])
+
+    return results
+
+def persist_queued_submissions(db: Session, rows: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Tulis submission dari antrean write-behind (campuran experiment dan user) dengan satu INSERT
+    multi-baris, lalu perbarui rollup dan counter per experiment dalam transaksi yang sama.
+    idempotency_key setiap baris berisi receipt, sehingga baris yang sudah pernah ditulis (mis. saat
+    spool diputar ulang) dilewati oleh ON CONFLICT DO NOTHING.
+    Mengembalikan {receipt: {"status": "persisted"|"failed", "submission_id", "error"}}.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    experiments = {
+        experiment.id: experiment
+        for experiment in db.query(models.Experiment).filter(
+            models.Experiment.id.in_({row["experiment_id"] for row in rows})
+        )
+    }
+    writable = []
+    for row in rows:
+        if row["experiment_id"] in experiments:
+            writable.append(row)
+        else:
+            results[row["idempotency_key"]] = {"status": "failed", "submission_id": None, "error": "Experiment sudah dihapus"}
+    if not writable:
+        return results
+
+    dialect = db.get_bind().dialect.name
+    insert_statement = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(models.Submission)
+    statement = insert_statement.on_conflict_do_nothing(index_elements=["user_id", "idempotency_key"]).returning(
+        models.Submission.id, models.Submission.idempotency_key, models.Submission.experiment_id,
+        models.Submission.timestamp, models.Submission.data_json,
+    )
+    inserted = db.execute(statement, writable).all()
+
+    by_receipt = {row["idempotency_key"]: row for row in writable}
+    by_experiment: Dict[int, list] = {}
+    for submission_id, receipt, experiment_id, timestamp, data_json in inserted:
+        row = by_receipt[receipt]
+        by_experiment.setdefault(experiment_id, []).append({
+            "id": submission_id, "experiment_id": experiment_id, "user_id": row["user_id"], "geo_lat": row["geo_lat"],
+            "geo_lng": row["geo_lng"], "data_json": data_json, "timestamp": timestamp,
+        })
+        results[receipt] = {"status": "persisted", "submission_id": submission_id, "error": None}
+    input_fields = {experiment_id: experiment.input_fields for experiment_id, experiment in experiments.items()}
+    for experiment_id, submissions in by_experiment.items():
+        stat_crud.apply_submissions(db, experiments[experiment_id], [(row["timestamp"], row["data_json"]) for row in submissions])
+        db.query(models.Experiment).filter(models.Experiment.id == experiment_id).update(
+            {
+                models.Experiment.submission_count: models.Experiment.submission_count + len(submissions),
+                models.Experiment.last_submission_at: func.now(),
+            },
+            synchronize_session=False,
+        )
+    db.commit()
+    for experiment_id, submissions in by_experiment.items():
+        live_feed.publish(experiment_id, input_fields[experiment_id], submissions)
+    # Baris yang bentrok sudah tersimpan sebelumnya (replay spool); id-nya dicari saat status diminta
+    for row in writable:
+        results.setdefault(row["idempotency_key"], {"status": "persisted", "submission_id": None, "error": None})
+    return results
+
+def keyset_window(query, cursor: Optional[str], limit: int):
+    """
+    Terapkan filter cursor, urutan stabil (timestamp, id) terbaru lebih dulu, dan limit + 1.
+    Bisa dipakai untuk Query sync maupun select() pada AsyncSession.
+    """
+    order_key = tuple_(models.Submission.timestamp, models.Submission.id)
+    if cursor:
+        query = query.filter(order_key < tuple_(*decode_cursor(cursor)))
+    return query.order_by(models.Submission.timestamp.desc(), models.Submission.id.desc()).limit(limit + 1)
+
+def keyset_result(items: list, limit: int):
+    """Potong baris ekstra dari keyset_window menjadi (items, next_cursor)."""
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1].timestamp, items[-1].id)
+    return items, next_cursor
+
+def _keyset_page(query, cursor: Optional[str], limit: int):
+    """
+    Ambil satu halaman submission terbaru lebih dulu, diurutkan stabil pada (timestamp, id).
+    Mengembalikan (items, next_cursor); next_cursor None jika tidak ada halaman berikutnya.
+    """
+    return keyset_result(keyset_window(query, cursor, limit).all(), limit)
+
+def get_submissions_for_experiment(db: Session, experiment_id: int, cursor: Optional[str] = None, limit: int = 100, bbox: Optional[tuple] = None):
+    query = db.query(models.Submission).filter(models.Submission.experiment_id == experiment_id)
+    if bbox is not None:
+        query = query.filter(*spatial_crud.bbox_filter(db.get_bind().dialect.name, bbox))
+    return _keyset_page(query, cursor, limit)
+
+def iter_submission_batches(db: Session, experiment_id: int, batch_size: int = 1000):
+    """
+    Baca submission satu experiment sebagai tuple kolom mentah (tanpa objek ORM),
+    per batch melalui server-side cursor sehingga memori tetap datar.
+    """
+    statement = (
+        select(
+            models.Submission.id,
+            models.Submission.user_id,
+            models.Submission.timestamp,
+            models.Submission.geo_lat,
+            models.Submission.geo_lng,
+            models.Submission.data_json,
+        )
+        .where(models.Submission.experiment_id == experiment_id)
+        .order_by(models.Submission.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for partition in db.execute(statement).partitions():
+        yield partition
 
 def get_submission_by_id(db: Session, submission_id: int):
     return db.query(models.Submission).filter(models.Submission.id == submission_id).first()
 
 def update_submission(db: Session, db_obj: models.Submission, obj_in: schemas.SubmissionUpdate):
+    old_data_json = db_obj.data_json
     for field, value in obj_in.model_dump(exclude_unset=True).items():
         setattr(db_obj, field, value)
+    db_obj.geohash = encode_or_none(db_obj.geo_lat, db_obj.geo_lng)
+    if db_obj.data_json != old_data_json:
+        db.flush()
+        stat_crud.remove_submission(db, db_obj.experiment, db_obj.timestamp, old_data_json)
+        stat_crud.apply_submissions(db, db_obj.experiment, [(db_obj.timestamp, db_obj.data_json)])
     db.commit()
     db.refresh(db_obj)
     return db_obj
@@ -143,14 +297,90 @@ def update_submission(db: Session, db_obj: models.Submission, obj_in: schemas.Su
 def delete_submission(db: Session, submission_id: int):
     db_obj = db.query(models.Submission).filter(models.Submission.id == submission_id).first()
     if db_obj:
+        experiment_id = db_obj.experiment_id
+        experiment, timestamp, data_json = db_obj.experiment, db_obj.timestamp, db_obj.data_json
         db.delete(db_obj)
+        db.flush()
+        stat_crud.remove_submission(db, experiment, timestamp, data_json)
+        db.query(models.Experiment).filter(models.Experiment.id == experiment_id).update(
+            {
+                models.Experiment.submission_count: models.Experiment.submission_count - 1,
+                models.Experiment.last_submission_at: _last_submission_at(experiment_id),
+            },
+            synchronize_session=False,
+        )
         db.commit()
     return db_obj
+
+def _last_submission_at(experiment_id):
+    return (
+        select(func.max(models.Submission.timestamp))
+        .where(models.Submission.experiment_id == experiment_id)
+        .scalar_subquery()
+    )
+
+def subtract_submission_counters(db: Session, removed: Dict[int, int]):
+    """
+    Kurangi submission_count per experiment ({experiment_id: jumlah terhapus}) dan hitung ulang
+    last_submission_at (MAX lewat index). Dipakai setelah penghapusan massal yang tidak melewati delete_submission.
+    """
+    for experiment_id, count in removed.items():
+        db.query(models.Experiment).filter(models.Experiment.id == experiment_id).update(
+            {
+                models.Experiment.submission_count: models.Experiment.submission_count - count,
+                models.Experiment.last_submission_at: _last_submission_at(experiment_id),
+            },
+            synchronize_session=False,
+        )
     
 
-def get_submissions_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100):
+def _delete_and_adjust(db: Session, condition, adjust) -> int:
+    """
+    DELETE submission yang memenuhi condition. Baris yang juga memenuhi adjust (experiment yang tidak
+    ikut dihapus) dikurangi dari counter dan rollup experiment-nya dalam transaksi yang sama.
     """
-    Mengambil semua submisi yang dibuat oleh seorang pengguna, 
+    removals = stat_crud.collect_removals(db, and_(condition, adjust)) if adjust is not None else {}
+    deleted = db.query(models.Submission).filter(condition).delete(synchronize_session=False)
+    for experiment_id, accumulator in removals.items():
+        stat_crud.apply_removals(db, experiment_id, accumulator)
+    subtract_submission_counters(db, {
+        experiment_id: stat_crud.removed_submission_count(accumulator)
+        for experiment_id, accumulator in removals.items()
+    })
+    return deleted
+
+def delete_submissions_where(db: Session, condition, chunk_size: Optional[int] = None, progress: Optional[Callable[[int], None]] = None, adjust=None) -> int:
+    """
+    Hapus submission yang memenuhi condition dengan DELETE berbasis set, tanpa memuat barisnya ke session.
+    Dengan chunk_size, penghapusan dibagi per chunk yang masing-masing di-commit agar transaksi dan lock
+    tetap kecil; chunk terakhir tidak di-commit supaya pemanggil bisa menyelesaikannya dalam transaksi
+    yang sama dengan penghapusan induknya. Counter dan rollup hanya diperbarui untuk baris yang memenuhi
+    adjust (lihat _delete_and_adjust), per chunk, sehingga tetap konsisten jika job berhenti di tengah.
+    """
+    if chunk_size is None:
+        deleted = _delete_and_adjust(db, condition, adjust)
+        if progress:
+            progress(deleted)
+        return deleted
+
+    deleted = 0
+    while True:
+        ids = db.scalars(select(models.Submission.id).where(condition).limit(chunk_size)).all()
+        count = _delete_and_adjust(db, models.Submission.id.in_(ids), adjust) if ids else 0
+        deleted += count
+        if progress:
+            progress(deleted)
+        if count < chunk_size:
+            return deleted
+        db.commit()
+
+def get_submissions_by_user(db: Session, user_id: int, cursor: Optional[str] = None, limit: int = 100):
+    """
+    Mengambil submisi yang dibuat oleh seorang pengguna per halaman,
     diurutkan dari yang terbaru.
     """
-    return db.query(models.Submission).filter(models.Submission.user_id == user_id).order_by(models.Submission.timestamp.desc()).offset(skip).limit(limit).all()
+    query = db.query(models.Submission).filter(models.Submission.user_id == user_id)
+    return _keyset_page(query, cursor, limit)
+
+def count_submissions_by_user(db: Session, user_id: int) -> int:
+    return db.query(func.count(models.Submission.id)).filter(models.Submission.user_id == user_id).scalar()
@@ -1,7 +1,14 @@
+from typing import Callable, Optional
+from sqlalchemy import func, or_, select
 from sqlalchemy.orm import Session
 from app import models
 from app.schemas import user
 from app.auth.security import get_password_hash
+from app.core.principal import invalidate_principal
+from app.core.validation import invalidate_validator
+from app.core.response_cache import experiment_responses
+from app.core.search_index import experiment_search_index
+from app.crud import submission as submission_crud
 
 def get_user(db: Session, user_id: int):
     return db.query(models.User).filter(models.User.id == user_id).first()
@@ -22,6 +29,7 @@ def create_user(db: Session, user: user.UserCreate):
 
 def update_user(db: Session, db_user: models.User, updates: user.UserUpdate):
     update_data = updates.dict(exclude_unset=True)
+    invalidate_principal(db_user.email)
 
     if "password" in update_data:
         update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
@@ -32,9 +40,52 @@ def update_user(db: Session, db_user: models.User, updates: user.UserUpdate):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    invalidate_principal(db_user.email)
+    # Nama dan email pemilik ikut tampil di respons publik experiment
+    experiment_responses.invalidate()
     return db_user
 
-def delete_user(db: Session, db_user: models.User):
-    db.delete(db_user)
+def update_password_hash(db: Session, db_user: models.User, hashed_password: str):
+    db_user.hashed_password = hashed_password
     db.commit()
+    return db_user
+
+def _deletion_scope(user_id: int):
+    """Submission yang ikut terhapus bersama user: miliknya sendiri dan semua submission di experiment miliknya."""
+    owned_experiments = select(models.Experiment.id).where(models.Experiment.created_by == user_id)
+    return or_(models.Submission.user_id == user_id, models.Submission.experiment_id.in_(owned_experiments))
+
+def count_deletion_submissions(db: Session, user_id: int) -> int:
+    return db.query(func.count(models.Submission.id)).filter(_deletion_scope(user_id)).scalar()
 
+def delete_user(db: Session, db_user: models.User, chunk_size: Optional[int] = None, progress: Optional[Callable[[int], None]] = None):
+    """
+    Hapus user beserta experiment miliknya dan semua submission terkait dengan DELETE massal, tanpa
+    memuat baris anak ke session. Audit log user tetap disimpan dengan user_id NULL.
+    chunk_size dipakai untuk user yang sangat besar (lihat delete_submissions_where).
+    Mengembalikan jumlah submission yang terhapus.
+    """
+    user_id, email = db_user.id, db_user.email
+    owned_experiment_ids = [
+        experiment_id for (experiment_id,) in
+        db.query(models.Experiment.id).filter(models.Experiment.created_by == user_id)
+    ]
+    invalidate_principal(email)
+
+    # Submission user ini di experiment milik orang lain ikut terhapus: counter dan rollup experiment
+    # tersebut dikurangi per chunk dengan delta dari baris user ini saja, tanpa memindai ulang seluruh submission-nya
+    deleted = submission_crud.delete_submissions_where(
+        db, _deletion_scope(user_id), chunk_size=chunk_size, progress=progress,
+        adjust=models.Submission.experiment_id.notin_(owned_experiment_ids),
+    )
+    db.query(models.ExperimentStat).filter(models.ExperimentStat.experiment_id.in_(owned_experiment_ids)).delete(synchronize_session=False)
+    db.query(models.Experiment).filter(models.Experiment.created_by == user_id).delete(synchronize_session=False)
+    db.query(models.AuditLog).filter(models.AuditLog.user_id == user_id).update({models.AuditLog.user_id: None}, synchronize_session=False)
+    db.query(models.User).filter(models.User.id == user_id).delete(synchronize_session=False)
+    db.commit()
+    for experiment_id in owned_experiment_ids:
+        invalidate_validator(experiment_id)
+    experiment_responses.invalidate()
+    if owned_experiment_ids:
+        experiment_search_index.invalidate()
+    return deleted
@@ -1,13 +1,14 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-import os
-from dotenv import load_dotenv
+from app.core.config import settings
+from app.core.pool import engine_options
+from app.core.instrumentation import instrument_engine
 
-load_dotenv() # baca .env file
-DATABASE_URL = os.getenv("DATABASE_URL") # ambil URL database dari .env
+DATABASE_URL = settings.DATABASE_URL # ambil URL database dari .env
 
-# Inisialisasi SQLAlchemy
-engine = create_engine(DATABASE_URL) # Buat koneksi ke database
+# Inisialisasi SQLAlchemy; parameter pool diatur lewat Settings (DB_POOL_*)
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL)) # Buat koneksi ke database
+instrument_engine(engine) # Hitung jumlah & waktu query per request
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine) # Buat session factory
 Base = declarative_base() # Buat base class untuk model
 
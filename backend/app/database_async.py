@@ -0,0 +1,48 @@
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.core.config import settings
+from app.core.pool import engine_options
+from app.core.instrumentation import instrument_engine
+
+# Driver async untuk setiap backend database sync yang didukung
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+_engine = None
+_session_factory = None
+
+def async_database_url(url: str) -> str:
+    """Turunkan URL async dari DATABASE_URL sync (mis. postgresql:// -> postgresql+asyncpg://)."""
+    parsed = make_url(url)
+    backend = parsed.drivername.split("+")[0]
+    parsed = parsed.set(drivername=ASYNC_DRIVERS.get(backend, parsed.drivername))
+    if parsed.drivername == "postgresql+asyncpg":
+        # asyncpg memakai `ssl`, bukan `sslmode`, dan tidak mengenal channel_binding (URL Neon)
+        query = dict(parsed.query)
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        query.pop("channel_binding", None)
+        parsed = parsed.set(query=query)
+    return parsed.render_as_string(hide_password=False)
+
+def get_async_engine():
+    """Engine async dibuat saat pertama dipakai, sehingga mode sync tidak memerlukan driver async."""
+    global _engine, _session_factory
+    if _engine is None:
+        url = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+        _engine = create_async_engine(url, **engine_options(url, is_async=True))
+        instrument_engine(_engine.sync_engine)
+        _session_factory = async_sessionmaker(_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    return _engine
+
+async def get_async_db():
+    get_async_engine()
+    async with _session_factory() as db:
+        yield db
+
+def get_async_engine_if_started():
+    """Engine async jika sudah pernah dibuat, tanpa membuatnya (untuk metrics)."""
+    return _engine
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.database import engine
@@ -6,11 +7,28 @@ from app.auth.router import router as auth_router
 from app.router.user import router as users_router
 from app.router.experiment import router as experiments_router
 from app.router.stat import router as stats_router
+from app.router.metrics import router as metrics_router, prometheus_router
+from app.core.config import settings
+from app.core.audit import audit_writer
+from app.core.ingest import submission_ingestor
+from app.core.instrumentation import InstrumentationMiddleware
 
 # Buat semua tabel di database
 Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    audit_writer.start()
+    if settings.SUBMISSION_WRITE_BEHIND:
+        # Memutar ulang spool dari proses sebelumnya
+        submission_ingestor.start()
+    yield
+    # Tulis sisa submission dan audit log yang masih di antrean sebelum proses berhenti
+    submission_ingestor.stop()
+    audit_writer.stop()
+
 app = FastAPI(
+    lifespan=lifespan,
     title="FlashField API",
     description="API untuk platform Citizen Science Micro-Experiments",
     version="1.0.0"
@@ -29,13 +47,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+# Ditambahkan terakhir agar menjadi lapisan terluar dan mengukur seluruh request
+app.add_middleware(InstrumentationMiddleware)
 
 @app.get("/", tags=["Root"])
 def read_root():
     return {"message": "Selamat datang di FlashField API!"}
 
 app.include_router(auth_router, prefix="/auth")
+if settings.DB_ASYNC_MODE:
+    # Route async didaftarkan lebih dulu sehingga menggantikan pasangan sync-nya
+    from app.router.async_user import router as async_users_router
+    from app.router.async_experiment import router as async_experiments_router
+    app.include_router(async_users_router)
+    app.include_router(async_experiments_router)
 app.include_router(users_router)
 app.include_router(experiments_router)
-app.include_router(stats_router)
\ No newline at end of file
+app.include_router(stats_router)
+app.include_router(metrics_router)
+app.include_router(prometheus_router)
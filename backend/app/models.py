@@ -1,7 +1,13 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, Float, Text
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, ForeignKey, Index, JSON, Float, Text, UniqueConstraint, false
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
+from app.core.geohash import encode_or_none
+
+# JSON biasa di SQLite, JSONB di PostgreSQL (bisa di-index GIN dan lebih cepat dibaca per key)
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
 
 # Tabel User
 class User(Base):
@@ -15,9 +21,11 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, comment="Waktu dibuat")
 
     # Relationships
-    experiments = relationship("Experiment", back_populates="owner", cascade="all, delete")
-    submissions = relationship("Submission", back_populates="submitter", cascade="all, delete")
-    audit_logs = relationship("AuditLog", back_populates="user", cascade="all, delete")
+    # Penghapusan anak dilakukan database (ON DELETE CASCADE) / DELETE massal di crud, bukan per objek ORM
+    experiments = relationship("Experiment", back_populates="owner", cascade="all, delete", passive_deletes=True)
+    submissions = relationship("Submission", back_populates="submitter", cascade="all, delete", passive_deletes=True)
+    # Jejak audit tetap disimpan setelah user dihapus (user_id menjadi NULL di database)
+    audit_logs = relationship("AuditLog", back_populates="user", passive_deletes=True)
 
 # Tabel Experiment
 class Experiment(Base):
@@ -25,33 +33,80 @@ class Experiment(Base):
     id = Column(Integer, primary_key=True, index=True, comment="ID Eksperimen")
     title = Column(String, nullable=False, comment="Judul")
     description = Column(Text, comment="Deskripsi")
-    input_fields = Column(JSON, nullable=False, comment="Konfigurasi field input yang diperlukan")
+    input_fields = Column(JSONDocument, nullable=False, comment="Konfigurasi field input yang diperlukan")
+    input_fields_version = Column(Integer, default=1, server_default="1", nullable=False, comment="Versi konfigurasi field, naik setiap input_fields diubah")
     require_location = Column(Boolean, default=True, comment="Apakah memerlukan data lokasi")
     deadline = Column(DateTime(timezone=True), nullable=True, comment="Batas waktu partisipasi")
-    created_by = Column(Integer, ForeignKey("users.id"), nullable=False, comment="ID User pembuat")
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, comment="ID User pembuat")
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, comment="Waktu dibuat")
+    submission_count = Column(Integer, default=0, server_default="0", nullable=False, comment="Jumlah submission (dijaga oleh crud.submission)")
+    last_submission_at = Column(DateTime(timezone=True), nullable=True, comment="Waktu submission terakhir")
+    stats_stale = Column(Boolean, default=False, server_default=false(), nullable=False, comment="Rollup experiment_stats sedang dibangun ulang di latar belakang")
     owner = relationship("User", back_populates="experiments")
-    submissions = relationship("Submission", back_populates="experiment", cascade="all, delete")
+    submissions = relationship("Submission", back_populates="experiment", cascade="all, delete", passive_deletes=True)
+    stats = relationship("ExperimentStat", back_populates="experiment", cascade="all, delete", passive_deletes=True)
+
+    __table_args__ = (
+        # Daftar experiment per pemilik terurut created_at, dan filter status aktif/kedaluwarsa (lihat migrate_db.py)
+        Index("ix_experiments_created_by_created_at", "created_by", "created_at"),
+        Index("ix_experiments_deadline", "deadline"),
+    )
+
+def _submission_geohash(context):
+    params = context.get_current_parameters()
+    return encode_or_none(params.get("geo_lat"), params.get("geo_lng"))
 
 # Tabel Submission
 class Submission(Base):
     __tablename__ = "submissions"
     id = Column(Integer, primary_key=True, index=True, comment="ID Submission")
-    experiment_id = Column(Integer, ForeignKey("experiments.id"), nullable=False, comment="ID Eksperimen terkait")
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, comment="ID User pengirim")
+    experiment_id = Column(Integer, ForeignKey("experiments.id", ondelete="CASCADE"), nullable=False, comment="ID Eksperimen terkait")
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, comment="ID User pengirim")
     geo_lat = Column(Float, nullable=True, comment="Latitude (optional)")
     geo_lng = Column(Float, nullable=True, comment="Longitude (optional)")
-    data_json = Column(JSON, nullable=False, comment="Data pengamatan sesuai konfigurasi field experiment")
-    timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, comment="Waktu pengiriman")
+    data_json = Column(JSONDocument, nullable=False, comment="Data pengamatan sesuai konfigurasi field experiment")
+    # Diisi otomatis dari geo_lat/geo_lng saat insert (ORM maupun INSERT batch); lihat app.core.geohash
+    geohash = Column(String(12), nullable=True, default=_submission_geohash, comment="Geohash lokasi untuk query spasial")
+    idempotency_key = Column(String(64), nullable=True, comment="Kunci dari client agar sinkronisasi ulang tidak menduplikasi data")
+    # Default di sisi Python agar presisi timestamp konsisten untuk cursor keyset (timestamp, id)
+    timestamp = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), server_default=func.now(), nullable=False, comment="Waktu pengiriman")
     experiment = relationship("Experiment", back_populates="submissions")
     submitter = relationship("User", back_populates="submissions")
 
+    __table_args__ = (
+        UniqueConstraint("user_id", "idempotency_key", name="uq_submissions_user_idempotency_key"),
+        # Listing keyset per experiment / per user, count, dan agregasi (lihat migrate_db.py)
+        Index("ix_submissions_experiment_id_timestamp", "experiment_id", "timestamp", "id"),
+        Index("ix_submissions_user_id_timestamp", "user_id", "timestamp", "id"),
+        # Query bbox/radius/nearest per experiment memakai range prefix geohash
+        Index("ix_submissions_experiment_id_geohash", "experiment_id", "geohash"),
+    )
+
+# Tabel ExperimentStat (rollup statistik harian per field, dijaga oleh crud.experiment_stat)
+class ExperimentStat(Base):
+    __tablename__ = "experiment_stats"
+    id = Column(Integer, primary_key=True, index=True)
+    experiment_id = Column(Integer, ForeignKey("experiments.id", ondelete="CASCADE"), nullable=False, comment="ID Eksperimen terkait")
+    day = Column(Date, nullable=False, comment="Tanggal submission (UTC)")
+    field_name = Column(String, nullable=False, comment="Nama field; string kosong untuk jumlah submission harian")
+    category = Column(String, nullable=False, default="", comment="Opsi untuk select/radio/checkbox; string kosong untuk field number")
+    count = Column(Integer, nullable=False, default=0, comment="Jumlah nilai")
+    sum = Column(Float, nullable=True, comment="Jumlah nilai (field number)")
+    sum_sq = Column(Float, nullable=True, comment="Jumlah kuadrat nilai (field number)")
+    min = Column(Float, nullable=True, comment="Nilai terkecil (field number)")
+    max = Column(Float, nullable=True, comment="Nilai terbesar (field number)")
+    experiment = relationship("Experiment", back_populates="stats")
+
+    __table_args__ = (
+        UniqueConstraint("experiment_id", "day", "field_name", "category", name="uq_experiment_stats_bucket"),
+    )
+
 # Tabel AuditLog
 class AuditLog(Base):
     __tablename__ = "audit_logs"
     id = Column(Integer, primary_key=True, index=True, comment="ID Log")
     action = Column(String, nullable=False, comment="Aksi yang dilakukan (mis: USER_LOGIN)")
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, comment="ID User yang melakukan aksi")
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, comment="ID User yang melakukan aksi (NULL jika tidak dikenal/sudah dihapus)")
     details = Column(String, comment="Detail tambahan")
     timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, comment="Waktu aksi")
     user = relationship("User", back_populates="audit_logs")
@@ -0,0 +1,102 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas import experiment as schemas
+from app.crud import async_experiment as crud
+from app.crud import async_submission as submission_crud
+from app.crud.spatial import parse_bbox
+from app.database_async import get_async_db
+from app.core.response_cache import experiment_responses, render_json
+from app.core.dependencies import get_current_active_user_async, role_checker_async
+from app.core.audit import audit
+from app.core.serialization import submission_page_response
+from app.core.config import settings
+from app.router.experiment import experiment_list_filters, queue_submission
+from app.models import User
+from app.schemas.submission import SubmissionCreate, Submission, SubmissionPage, SubmissionReceipt
+
+# Endpoint experiment yang paling sering dipanggil, dijalankan di atas AsyncSession.
+# Hanya dipasang saat DB_ASYNC_MODE aktif, sebelum router sync sehingga route di sini yang dipakai;
+# endpoint lain tetap dilayani router sync. Path memakai konverter int agar tidak menutupi route statis.
+router = APIRouter(prefix="/experiments", tags=["experiments"])
+
+
+@router.get("/", response_model=list[schemas.ExperimentSummary])
+async def read_all_experiments(request: Request, skip: int = 0, limit: int = 100, filters: dict = Depends(experiment_list_filters), db: AsyncSession = Depends(get_async_db)):
+    key = experiment_responses.key(request)
+    entry = experiment_responses.get(key)
+    if entry is None:
+        experiments = await crud.get_experiments(db, skip=skip, limit=limit, **filters)
+        entry = experiment_responses.put(key, render_json(list[schemas.ExperimentSummary], experiments))
+    return experiment_responses.response(request, entry)
+
+
+@router.get("/{experiment_id:int}", response_model=schemas.Experiment)
+async def read_experiment(request: Request, experiment_id: int, db: AsyncSession = Depends(get_async_db)):
+    key = experiment_responses.key(request)
+    entry = experiment_responses.get(key)
+    if entry is None:
+        db_experiment = await crud.get_experiment(db, experiment_id=experiment_id)
+        if db_experiment is None:
+            raise HTTPException(status_code=404, detail="Experiment not found")
+        entry = experiment_responses.put(key, render_json(schemas.Experiment, db_experiment))
+    return experiment_responses.response(request, entry)
+
+
+@router.get("/{experiment_id:int}/fields")
+async def get_experiment_fields(request: Request, experiment_id: int, db: AsyncSession = Depends(get_async_db)):
+    key = experiment_responses.key(request)
+    entry = experiment_responses.get(key)
+    if entry is None:
+        db_experiment = await crud.get_experiment(db, experiment_id=experiment_id)
+        if db_experiment is None:
+            raise HTTPException(status_code=404, detail="Experiment not found")
+        entry = experiment_responses.put(key, render_json(dict, {
+            "experiment_id": experiment_id,
+            "title": db_experiment.title,
+        }))
+    return experiment_responses.response(request, entry)
+
+
+@router.post(
+    "/{experiment_id:int}/submissions",
+    response_model=Submission,
+    status_code=status.HTTP_201_CREATED,
+    responses={202: {"model": SubmissionReceipt, "description": "Diterima ke antrean (SUBMISSION_WRITE_BEHIND)"}},
+)
+async def submit_to_experiment(
+    experiment_id: int,
+    submission: SubmissionCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    db_experiment = await crud.get_experiment(db, experiment_id=experiment_id)
+    if db_experiment is None:
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    if settings.SUBMISSION_WRITE_BEHIND:
+        return queue_submission(db_experiment, submission, current_user)
+    db_submission = await submission_crud.create_submission(db=db, submission=submission, user_id=current_user.id)
+    audit("SUBMISSION_CREATE", current_user.id, f"experiment_id={experiment_id} submission_id={db_submission.id}")
+    return db_submission
+
+
+@router.get("/{experiment_id:int}/submissions", response_model=SubmissionPage, dependencies=[Depends(role_checker_async(["researcher", "admin"]))])
+async def get_experiment_submissions(
+    experiment_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    include_total: bool = False,
+    min_lat: Optional[float] = Query(None, ge=-90, le=90),
+    min_lng: Optional[float] = Query(None, ge=-180, le=180),
+    max_lat: Optional[float] = Query(None, ge=-90, le=90),
+    max_lng: Optional[float] = Query(None, ge=-180, le=180),
+    db: AsyncSession = Depends(get_async_db)
+):
+    bbox = parse_bbox(min_lat, min_lng, max_lat, max_lng)
+    db_experiment = await crud.get_experiment(db, experiment_id=experiment_id)
+    if db_experiment is None:
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    items, next_cursor = await submission_crud.get_submissions_for_experiment(db=db, experiment_id=experiment_id, cursor=cursor, limit=limit, bbox=bbox)
+    # Total diambil dari counter experiment, bukan COUNT(*); tidak berlaku untuk hasil bbox
+    total = db_experiment.submission_count if include_total and bbox is None else None
+    return submission_page_response(items, next_cursor, total)
@@ -0,0 +1,29 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas import user as user_schemas
+from app.database_async import get_async_db
+from app.core.dependencies import get_current_active_user_async
+from app.core.serialization import submission_page_response
+from app.models import User
+from app.crud import async_submission as submission_crud
+from app.schemas import submission as submission_schemas
+
+# Varian async endpoint /users/me; dipasang sebelum router sync saat DB_ASYNC_MODE aktif.
+router = APIRouter(prefix="/users", tags=["users"])
+
+@router.get("/me", response_model=user_schemas.User)
+async def read_users_me(current_user: User = Depends(get_current_active_user_async)):
+    return current_user
+
+@router.get("/me/submissions", response_model=submission_schemas.SubmissionPage)
+async def read_own_submissions(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    items, next_cursor = await submission_crud.get_submissions_by_user(db=db, user_id=current_user.id, cursor=cursor, limit=limit)
+    total = await submission_crud.count_submissions_by_user(db=db, user_id=current_user.id) if include_total else None
+    return submission_page_response(items, next_cursor, total)
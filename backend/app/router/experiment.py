@@ -1,13 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from app.schemas import experiment as schemas
 from app.crud import experiment as crud
 from app.models import Experiment as models
-from app.database import get_db
-from app.core.dependencies import get_current_active_user, role_checker
-from app.models import User
-from app.crud.submission import create_submission as create_submission_crud, get_submissions_for_experiment, delete_submission, get_submission_by_id
-from app.schemas.submission import SubmissionCreate, Submission
+from app.database import SessionLocal, get_db
+from app.crud.spatial import get_nearby_submissions, parse_bbox
+from app.core.response_cache import experiment_responses, render_json
+from app.core.export import EXPORT_EXTENSIONS, EXPORT_MEDIA_TYPES, EXPORT_WRITERS, content_disposition
+from app.core.dependencies import get_current_active_user, get_user_from_token, role_checker
+from app.core.audit import audit
+from app.core.config import settings
+from app.core.deletion_jobs import deletion_jobs
+from app.core.ingest import submission_ingestor
+from app.core.live_feed import live_feed
+from app.core.serialization import submission_page_response
+from app.models import User, Submission as SubmissionModel
+from app.crud.submission import check_submission, create_submission as create_submission_crud, get_submissions_for_experiment, delete_submission, get_submission_by_id, iter_submission_batches, create_submissions_batch
+from app.schemas.submission import SubmissionCreate, Submission, SubmissionPage, SubmissionBatchCreate, SubmissionBatchResponse, NearbySubmissions, SubmissionReceipt
 
 router = APIRouter(prefix="/experiments", tags=["experiments"])
 
@@ -19,36 +34,81 @@ def create_new_experiment(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    return crud.create_experiment(db=db, experiment=experiment, user_id=current_user.id)
+    db_experiment = crud.create_experiment(db=db, experiment=experiment, user_id=current_user.id)
+    audit("EXPERIMENT_CREATE", current_user.id, f"experiment_id={db_experiment.id}")
+    return db_experiment
+
+
+def experiment_list_filters(
+    created_by: Optional[int] = None,
+    status: Optional[Literal["active", "expired"]] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    """Filter query string untuk daftar experiment (lihat crud.experiment.experiment_filters)."""
+    if created_from and created_to and created_from > created_to:
+        raise HTTPException(status_code=400, detail="created_from harus lebih kecil atau sama dengan created_to")
+    return {"created_by": created_by, "status": status, "created_from": created_from, "created_to": created_to}
 
 
-# --- TIDAK ADA PERUBAHAN --- (Publik)
-@router.get("/", response_model=list[schemas.Experiment])
-def read_all_experiments(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_experiments(db, skip=skip, limit=limit)
+# (Publik) Respons di-cache dengan ETag; lihat app.core.response_cache
+@router.get("/", response_model=list[schemas.ExperimentSummary])
+def read_all_experiments(request: Request, skip: int = 0, limit: int = 100, filters: dict = Depends(experiment_list_filters), db: Session = Depends(get_db)):
+    return experiment_responses.respond(
+        request,
+        lambda: render_json(list[schemas.ExperimentSummary], crud.get_experiments(db, skip=skip, limit=limit, **filters)),
+    )
 
 
-# --- TIDAK ADA PERUBAHAN --- (Publik)
+# (Publik) Pencarian full-text terurut relevansi; didaftarkan sebelum /{experiment_id}
+@router.get("/search", response_model=schemas.ExperimentSearchPage)
+def search_experiments(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200, description="Kata kunci; setiap kata dicocokkan sebagai awalan"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    filters: dict = Depends(experiment_list_filters),
+    db: Session = Depends(get_db),
+):
+    """Cari di judul, deskripsi, dan label field experiment. Highlight memakai tag <mark>."""
+    return experiment_responses.respond(
+        request,
+        lambda: render_json(schemas.ExperimentSearchPage, crud.search_experiments(db, q=q, skip=skip, limit=limit, **filters)),
+    )
+
+
+# (Admin) Ringkasan experiment per pemilik; didaftarkan sebelum /{experiment_id}
+@router.get("/by-owner", response_model=list[schemas.ExperimentOwnerSummary], dependencies=[Depends(role_checker(["admin"]))])
+def read_experiments_by_owner(filters: dict = Depends(experiment_list_filters), db: Session = Depends(get_db)):
+    return crud.get_experiment_owner_summaries(db, **filters)
+
+
+# (Publik) Respons di-cache dengan ETag
 @router.get("/{experiment_id}", response_model=schemas.Experiment)
-def read_experiment(experiment_id: int, db: Session = Depends(get_db)):
-    db_experiment = crud.get_experiment(db, experiment_id=experiment_id)
-    if db_experiment is None:
-        raise HTTPException(status_code=404, detail="Experiment not found")
-    return db_experiment
+def read_experiment(request: Request, experiment_id: int, db: Session = Depends(get_db)):
+    def render():
+        db_experiment = crud.get_experiment(db, experiment_id=experiment_id)
+        if db_experiment is None:
+            raise HTTPException(status_code=404, detail="Experiment not found")
+        return render_json(schemas.Experiment, db_experiment)
 
+    return experiment_responses.respond(request, render)
 
-# --- TIDAK ADA PERUBAHAN --- (Publik)
+
+# (Publik) Respons di-cache dengan ETag
 @router.get("/{experiment_id}/fields")
-def get_experiment_fields(experiment_id: int, db: Session = Depends(get_db)):
-    db_experiment = crud.get_experiment(db, experiment_id=experiment_id)
-    if db_experiment is None:
-        raise HTTPException(status_code=404, detail="Experiment not found")
-    
-    return {
-        "experiment_id": experiment_id,
-        "title": db_experiment.title,
-        # ... (sisa field)
-    }
+def get_experiment_fields(request: Request, experiment_id: int, db: Session = Depends(get_db)):
+    def render():
+        db_experiment = crud.get_experiment(db, experiment_id=experiment_id)
+        if db_experiment is None:
+            raise HTTPException(status_code=404, detail="Experiment not found")
+        return render_json(dict, {
+            "experiment_id": experiment_id,
+            "title": db_experiment.title,
+            # ... (sisa field)
+        })
+
+    return experiment_responses.respond(request, render)
 
 
 # --- PERUBAHAN DI SINI ---
@@ -67,6 +127,7 @@ def update_existing_experiment(
     # Hanya pemilik yang bisa mengedit
     if db_experiment.created_by != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to update this experiment")
+    audit("EXPERIMENT_UPDATE", current_user.id, f"experiment_id={experiment_id}")
     return crud.update_experiment(db=db, db_obj=db_experiment, obj_in=experiment_in)
 
 
@@ -84,14 +145,60 @@ def delete_existing_experiment(
     # Pemilik ATAU admin bisa menghapus
     if db_experiment.created_by != current_user.id and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized to delete this experiment")
+    audit("EXPERIMENT_DELETE", current_user.id, f"experiment_id={experiment_id}")
+    # Experiment yang sangat besar dihapus bertahap di latar belakang; progress lewat GET /{experiment_id}/deletion
+    if db_experiment.submission_count >= settings.BULK_DELETE_BACKGROUND_THRESHOLD:
+        def work(progress):
+            with SessionLocal() as session:
+                crud.delete_experiment(session, experiment_id, chunk_size=settings.BULK_DELETE_CHUNK_SIZE, progress=progress)
+        job = deletion_jobs.start("experiment", experiment_id, db_experiment.submission_count, work, owner_id=db_experiment.created_by)
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=jsonable_encoder(job))
     crud.delete_experiment(db=db, experiment_id=experiment_id)
     return {"ok": True}
 
+@router.get("/{experiment_id}/deletion")
+def read_experiment_deletion(
+    experiment_id: int,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Progress penghapusan experiment yang berjalan di latar belakang."""
+    job = deletion_jobs.snapshot("experiment", experiment_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Tidak ada proses penghapusan untuk experiment ini")
+    if job["owner_id"] != current_user.id and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized to view this deletion")
+    return job
+
 
 # --- Submissions for an Experiment ---
 
+def queue_submission(db_experiment: models, submission: SubmissionCreate, current_user: User) -> JSONResponse:
+    """
+    Jalur write-behind POST submission: validasi tetap sinkron (error 400 langsung ke client),
+    penulisan ke database dilakukan writer per batch. Balasan 202 berisi receipt untuk cek status.
+    """
+    check_submission(db_experiment, submission)
+    entry = submission_ingestor.submit(
+        experiment_id=db_experiment.id,
+        user_id=current_user.id,
+        geo_lat=submission.geo_lat,
+        geo_lng=submission.geo_lng,
+        data_json=submission.data_json,
+    )
+    audit("SUBMISSION_QUEUED", current_user.id, f"experiment_id={db_experiment.id} receipt={entry['receipt']}")
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=jsonable_encoder(SubmissionReceipt(**entry)),
+        headers={"Location": f"/experiments/{db_experiment.id}/submissions/receipts/{entry['receipt']}"},
+    )
+
 # --- TIDAK ADA PERUBAHAN --- (Volunteer bisa submit)
-@router.post("/{experiment_id}/submissions", response_model=Submission, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/{experiment_id}/submissions",
+    response_model=Submission,
+    status_code=status.HTTP_201_CREATED,
+    responses={202: {"model": SubmissionReceipt, "description": "Diterima ke antrean (SUBMISSION_WRITE_BEHIND)"}},
+)
 def submit_to_experiment(
     experiment_id: int,
     submission: SubmissionCreate,
@@ -102,16 +209,224 @@ def submit_to_experiment(
     db_experiment = crud.get_experiment(db, experiment_id=experiment_id)
     if db_experiment is None:
         raise HTTPException(status_code=404, detail="Experiment not found")
-    return create_submission_crud(db=db, submission=submission, user_id=current_user.id)
+    if settings.SUBMISSION_WRITE_BEHIND:
+        return queue_submission(db_experiment, submission, current_user)
+    db_submission = create_submission_crud(db=db, submission=submission, user_id=current_user.id)
+    audit("SUBMISSION_CREATE", current_user.id, f"experiment_id={experiment_id} submission_id={db_submission.id}")
+    return db_submission
+
+
+@router.get("/{experiment_id}/submissions/receipts/{receipt}", response_model=SubmissionReceipt)
+def read_submission_receipt(
+    experiment_id: int,
+    receipt: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Status submission yang diterima lewat antrean write-behind: queued, persisted, atau failed."""
+    entry = submission_ingestor.receipt(receipt)
+    if entry is not None and entry["experiment_id"] == experiment_id:
+        if entry["user_id"] != current_user.id and current_user.role != "admin":
+            raise HTTPException(status_code=404, detail="Receipt tidak ditemukan")
+        if entry["status"] != "persisted" or entry["submission_id"] is not None:
+            return entry
+    # Status di memori sudah kedaluwarsa (atau proses sudah restart): receipt = idempotency_key
+    query = db.query(SubmissionModel.id).filter(
+        SubmissionModel.experiment_id == experiment_id,
+        SubmissionModel.idempotency_key == receipt,
+    )
+    if current_user.role != "admin":
+        query = query.filter(SubmissionModel.user_id == current_user.id)
+    submission_id = query.scalar()
+    if submission_id is None:
+        raise HTTPException(status_code=404, detail="Receipt tidak ditemukan")
+    return {"receipt": receipt, "status": "persisted", "experiment_id": experiment_id, "submission_id": submission_id}
+
+
+# Batch ingestion untuk perangkat lapangan yang menyinkronkan data offline
+@router.post("/{experiment_id}/submissions/batch", response_model=SubmissionBatchResponse)
+def submit_batch_to_experiment(
+    experiment_id: int,
+    batch: SubmissionBatchCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Kirim banyak observasi sekaligus. Setiap item divalidasi terpisah dan hasilnya
+    (accepted/duplicate/rejected) dikembalikan sesuai urutan item.
+    """
+    results = create_submissions_batch(db=db, experiment_id=experiment_id, items=batch.items, user_id=current_user.id)
+    summary = {
+        "accepted": sum(result["status"] == "accepted" for result in results),
+        "duplicates": sum(result["status"] == "duplicate" for result in results),
+        "rejected": sum(result["status"] == "rejected" for result in results),
+    }
+    audit("SUBMISSION_BATCH", current_user.id, f"experiment_id={experiment_id} " + " ".join(f"{key}={value}" for key, value in summary.items()))
+    return {**summary, "results": results}
 
 
 # --- TIDAK ADA PERUBAHAN --- (Researcher & Admin bisa lihat submisi)
-@router.get("/{experiment_id}/submissions", response_model=list[Submission], dependencies=[Depends(role_checker(["researcher", "admin"]))])
+@router.get("/{experiment_id}/submissions", response_model=SubmissionPage, dependencies=[Depends(role_checker(["researcher", "admin"]))])
 def get_experiment_submissions(
     experiment_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    include_total: bool = False,
+    min_lat: Optional[float] = Query(None, ge=-90, le=90),
+    min_lng: Optional[float] = Query(None, ge=-180, le=180),
+    max_lat: Optional[float] = Query(None, ge=-90, le=90),
+    max_lng: Optional[float] = Query(None, ge=-180, le=180),
     db: Session = Depends(get_db)
 ):
-    return get_submissions_for_experiment(db=db, experiment_id=experiment_id)
+    """Halaman submission terbaru; isi min_lat/min_lng/max_lat/max_lng untuk hanya mengambil area peta yang terlihat."""
+    bbox = parse_bbox(min_lat, min_lng, max_lat, max_lng)
+    db_experiment = crud.get_experiment(db, experiment_id=experiment_id)
+    if db_experiment is None:
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    items, next_cursor = get_submissions_for_experiment(db=db, experiment_id=experiment_id, cursor=cursor, limit=limit, bbox=bbox)
+    # Total diambil dari counter experiment, bukan COUNT(*); tidak berlaku untuk hasil bbox
+    total = db_experiment.submission_count if include_total and bbox is None else None
+    return submission_page_response(items, next_cursor, total)
+
+
+# --- Live feed submission (SSE dan WebSocket) ---
+# EventSource dan WebSocket di browser tidak bisa mengirim header Authorization, jadi JWT dikirim
+# lewat query ?token=. Database hanya dibaca sekali saat koneksi dibuka; event berikutnya datang
+# dari app.core.live_feed tanpa query tambahan.
+
+def _authorize_live_feed(experiment_id: int, token: Optional[str]) -> None:
+    if not token:
+        raise HTTPException(status_code=401, detail="Token diperlukan", headers={"WWW-Authenticate": "Bearer"})
+    with SessionLocal() as db:
+        current_user = get_user_from_token(token, db)
+        if not current_user.is_active:
+            raise HTTPException(status_code=400, detail="Inactive user")
+        if current_user.role not in ("researcher", "admin"):
+            raise HTTPException(status_code=403, detail="You don't have enough permissions")
+        if crud.get_experiment(db, experiment_id=experiment_id) is None:
+            raise HTTPException(status_code=404, detail="Experiment not found")
+
+def _subscribe(experiment_id: int):
+    subscription = live_feed.subscribe(experiment_id)
+    if subscription is None:
+        raise HTTPException(status_code=503, detail="Terlalu banyak koneksi live feed, silakan coba lagi", headers={"Retry-After": "5"})
+    return subscription
+
+@router.get("/{experiment_id}/live")
+async def stream_experiment_submissions(experiment_id: int, token: Optional[str] = Query(None)):
+    """
+    Server-Sent Events: event "submissions" (submission baru), "stats" (delta rollup statistik,
+    digabung jika client tertinggal), dan "lagged" (jumlah submission yang dibuang karena client
+    terlalu lambat; muat ulang daftar submission jika menerima event ini).
+    """
+    await run_in_threadpool(_authorize_live_feed, experiment_id, token)
+    subscription = _subscribe(experiment_id)
+
+    async def events():
+        try:
+            yield b"retry: 5000\n\n"
+            while True:
+                messages = await subscription.next_messages(settings.LIVE_FEED_HEARTBEAT)
+                if messages is None:
+                    return
+                if not messages:
+                    yield b": ping\n\n"
+                for event, data in messages:
+                    yield b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+        finally:
+            live_feed.unsubscribe(subscription)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.websocket("/{experiment_id}/live/ws")
+async def websocket_experiment_submissions(websocket: WebSocket, experiment_id: int, token: Optional[str] = Query(None)):
+    """Pesan yang sama dengan endpoint SSE sebagai teks JSON; {"type": "ping"} dikirim sebagai heartbeat."""
+    try:
+        await run_in_threadpool(_authorize_live_feed, experiment_id, token)
+        subscription = _subscribe(experiment_id)
+    except HTTPException as exc:
+        # 1008 = policy violation, 1013 = try again later
+        await websocket.close(code=1013 if exc.status_code == 503 else 1008, reason=str(exc.detail))
+        return
+    await websocket.accept()
+
+    async def watch_disconnect():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+        subscription.close()
+
+    watcher = asyncio.ensure_future(watch_disconnect())
+    try:
+        while True:
+            messages = await subscription.next_messages(settings.LIVE_FEED_HEARTBEAT)
+            if messages is None:
+                break
+            for _, data in messages or [("ping", b'{"type":"ping"}')]:
+                await websocket.send_text(data.decode())
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        watcher.cancel()
+        live_feed.unsubscribe(subscription)
+
+
+# Query spasial: k submission terdekat dari sebuah titik, opsional dalam radius tertentu
+@router.get("/{experiment_id}/submissions/nearby", response_model=NearbySubmissions, dependencies=[Depends(role_checker(["researcher", "admin"]))])
+def get_nearby_experiment_submissions(
+    experiment_id: int,
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_m: Optional[float] = Query(None, gt=0, le=20037509, description="Batas jarak dalam meter"),
+    k: int = Query(100, ge=1, le=500, description="Jumlah submission terdekat maksimum"),
+    db: Session = Depends(get_db)
+):
+    db_experiment = crud.get_experiment(db, experiment_id=experiment_id)
+    if db_experiment is None:
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    nearby = get_nearby_submissions(db, experiment_id=experiment_id, lat=lat, lng=lng, k=k, radius_m=radius_m)
+    items = [
+        {**Submission.model_validate(submission).model_dump(), "distance_m": round(distance, 2)}
+        for submission, distance in nearby
+    ]
+    return {"lat": lat, "lng": lng, "radius_m": radius_m, "items": items}
+
+
+# Export streaming (Researcher pemilik & Admin)
+@router.get("/{experiment_id}/export", dependencies=[Depends(role_checker(["researcher", "admin"]))])
+def export_experiment_submissions(
+    experiment_id: int,
+    format: Literal["csv", "ndjson", "columnar"] = "csv",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Unduh seluruh submission experiment secara streaming.
+    data_json diratakan menjadi kolom sesuai input_fields experiment.
+    """
+    db_experiment = crud.get_experiment(db, experiment_id=experiment_id)
+    if db_experiment is None:
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    if current_user.role != "admin" and db_experiment.created_by != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to export this experiment")
+
+    audit("SUBMISSION_EXPORT", current_user.id, f"experiment_id={experiment_id} format={format}")
+    input_fields = db_experiment.input_fields
+    filename = f"{db_experiment.title.replace(' ', '_')}_submissions.{EXPORT_EXTENSIONS[format]}"
+
+    def stream():
+        # Session sendiri: session dari dependency sudah ditutup sebelum body dikirim
+        export_db = SessionLocal()
+        try:
+            batches = iter_submission_batches(export_db, experiment_id=experiment_id)
+            yield from EXPORT_WRITERS[format](batches, input_fields)
+        finally:
+            export_db.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": content_disposition(filename)},
+    )
 
 
 # --- ENDPOINT BARU --- Delete individual submission
@@ -159,6 +474,7 @@ def delete_individual_submission(
     
     # Hapus submission
     delete_submission(db=db, submission_id=submission_id)
+    audit("SUBMISSION_DELETE", current_user.id, f"experiment_id={db_submission.experiment_id} submission_id={submission_id}")
     return {"ok": True}
 
 
@@ -199,4 +515,5 @@ def delete_experiment_submission(
     
     # Hapus submission
     delete_submission(db=db, submission_id=submission_id)
+    audit("SUBMISSION_DELETE", current_user.id, f"experiment_id={experiment_id} submission_id={submission_id}")
     return {"ok": True}
\ No newline at end of file
@@ -0,0 +1,93 @@
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from app.database import engine
+from app.database_async import get_async_engine_if_started
+from app.core.dependencies import role_checker
+from app.core.pool import pool_status
+from app.core.audit import audit_writer
+from app.core.ingest import submission_ingestor
+from app.core.live_feed import live_feed
+from app.core.config import settings
+from app.core.instrumentation import gauge_lines, render_metrics
+
+router = APIRouter(prefix="/metrics", tags=["metrics"], dependencies=[Depends(role_checker(["admin"]))])
+
+@router.get("/pool")
+def get_pool_metrics():
+    """
+    Kondisi connection pool database per proses worker: koneksi yang sedang dipakai,
+    overflow, serta waktu tunggu checkout. Dipakai untuk menentukan jumlah worker dan DB_POOL_SIZE.
+    """
+    pools = {"sync": pool_status(engine)}
+    async_engine = get_async_engine_if_started()
+    if async_engine is not None:
+        pools["async"] = pool_status(async_engine.sync_engine)
+    return pools
+
+@router.get("/audit")
+def get_audit_metrics():
+    """Kedalaman antrean dan statistik penulisan audit log di proses worker ini."""
+    return audit_writer.metrics()
+
+@router.get("/ingest")
+def get_ingest_metrics():
+    """Antrean write-behind submission di proses worker ini: kedalaman, penolakan 429, dan batch terakhir."""
+    return submission_ingestor.metrics()
+
+@router.get("/live-feed")
+def get_live_feed_metrics():
+    """Subscriber live feed di proses worker ini dan jumlah submission yang dibuang untuk client lambat."""
+    return live_feed.metrics()
+
+# Endpoint untuk Prometheus: tidak memakai JWT admin, opsional dilindungi METRICS_TOKEN
+prometheus_router = APIRouter(tags=["metrics"])
+
+def _check_metrics_token(authorization: Optional[str] = Header(None)):
+    if settings.METRICS_TOKEN and not secrets.compare_digest(authorization or "", f"Bearer {settings.METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Token metrics tidak valid", headers={"WWW-Authenticate": "Bearer"})
+
+def _runtime_metrics():
+    engines = {"sync": engine}
+    async_engine = get_async_engine_if_started()
+    if async_engine is not None:
+        engines["async"] = async_engine.sync_engine
+    pools = {name: pool_status(current) for name, current in engines.items()}
+    audit_stats = audit_writer.metrics()
+    ingest_stats = submission_ingestor.metrics()
+    live_stats = live_feed.metrics()
+    lines = []
+    for key, name, documentation, metric_type in (
+        ("checked_out", "flashfield_db_pool_checked_out", "Koneksi pool yang sedang dipakai", "gauge"),
+        ("overflow", "flashfield_db_pool_overflow", "Koneksi overflow yang sedang terbuka", "gauge"),
+        ("timeouts", "flashfield_db_pool_checkout_timeouts_total", "Checkout pool yang gagal karena timeout", "counter"),
+    ):
+        lines += gauge_lines(name, documentation, [({"engine": label}, status.get(key)) for label, status in pools.items()], metric_type)
+    for key, name, documentation, metric_type in (
+        ("queue_depth", "flashfield_audit_queue_depth", "Event audit yang menunggu ditulis", "gauge"),
+        ("written", "flashfield_audit_written_total", "Event audit yang sudah ditulis", "counter"),
+        ("dropped", "flashfield_audit_dropped_total", "Event audit yang dibuang karena antrean penuh", "counter"),
+    ):
+        lines += gauge_lines(name, documentation, [({}, audit_stats[key])], metric_type)
+    for key, name, documentation, metric_type in (
+        ("queue_depth", "flashfield_ingest_queue_depth", "Submission write-behind yang menunggu ditulis", "gauge"),
+        ("accepted", "flashfield_ingest_accepted_total", "Submission yang diterima ke antrean", "counter"),
+        ("rejected_queue_full", "flashfield_ingest_rejected_total", "Submission yang ditolak 429 karena antrean penuh", "counter"),
+        ("written", "flashfield_ingest_written_total", "Submission antrean yang sudah ditulis", "counter"),
+        ("failed", "flashfield_ingest_failed_total", "Submission antrean yang gagal ditulis", "counter"),
+        ("batches", "flashfield_ingest_batches_total", "Batch INSERT yang dijalankan writer", "counter"),
+    ):
+        lines += gauge_lines(name, documentation, [({}, ingest_stats[key])], metric_type)
+    for key, name, documentation, metric_type in (
+        ("subscribers", "flashfield_live_feed_subscribers", "Client live feed yang sedang terhubung", "gauge"),
+        ("published", "flashfield_live_feed_published_total", "Submission yang dikirim ke live feed", "counter"),
+        ("dropped", "flashfield_live_feed_dropped_total", "Submission yang dibuang untuk client lambat", "counter"),
+    ):
+        lines += gauge_lines(name, documentation, [({}, live_stats[key])], metric_type)
+    return lines
+
+@prometheus_router.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(_check_metrics_token)])
+def get_prometheus_metrics():
+    """Latency, query database, dan ukuran respons per route dalam format teks Prometheus."""
+    return PlainTextResponse(render_metrics(_runtime_metrics()), media_type="text/plain; version=0.0.4")
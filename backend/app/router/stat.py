@@ -1,9 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from app.database import get_db
 from app.models import Submission
 from app.crud.experiment import get_experiment
+from app.crud import stat as stat_crud
+from app.crud.experiment_stat import number_value
+from app.schemas import stat as stat_schemas
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.dependencies import role_checker
 from pydantic import BaseModel
 
@@ -19,12 +26,90 @@ def get_stats_summary(exp_id: int, db: Session = Depends(get_db)):
     if not experiment:
         raise HTTPException(status_code=404, detail="Experiment not found")
         
-    total_submissions = db.query(Submission).filter(Submission.experiment_id == exp_id).count()
-
-    # Contoh: Menghitung rata-rata 'level_db' jika ada
-    avg_query = db.query(func.avg(Submission.data_json['level_db'].as_float())).filter(Submission.experiment_id == exp_id).scalar()
+    # Jumlah dan rata-rata 'level_db' dalam satu query
+    total_submissions, avg_query = db.query(
+        func.count(Submission.id),
+        func.avg(number_value(db.get_bind().dialect.name, 'level_db')),
+    ).filter(Submission.experiment_id == exp_id).one()
 
     return {
         "total_submissions": total_submissions,
         "average_level_db": round(avg_query, 2) if avg_query is not None else "N/A"
     }
+
+
+@router.get("/fields", response_model=stat_schemas.ExperimentStats)
+def get_field_stats(
+    exp_id: int,
+    bucket: Literal["day", "week", "month"] = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    source: Literal["rollup", "scan"] = Query("rollup", description="rollup: dari tabel experiment_stats; scan: hitung langsung dari submissions (termasuk persentil)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Statistik setiap field experiment sesuai tipenya: ringkasan numerik untuk number,
+    frekuensi opsi untuk select/radio/checkbox, serta jumlah submission per periode.
+    """
+    experiment = get_experiment(db, exp_id)
+    if not experiment:
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    # Rollup yang sedang dibangun ulang (setelah input_fields diubah) belum lengkap
+    if source == "scan" or experiment.stats_stale:
+        return stat_crud.get_field_stats(db, experiment, bucket=bucket, start=start, end=end)
+    return stat_crud.get_field_stats_from_rollup(db, experiment, bucket=bucket, start=start, end=end)
+
+
+# Cache singkat agar banyak admin yang membuka dashboard bersamaan hanya memicu satu set query
+_overview_cache = TTLCache(maxsize=32, ttl=settings.STATS_OVERVIEW_CACHE_TTL)
+
+@router.get("/overview", response_model=stat_schemas.PlatformOverview, dependencies=[Depends(role_checker(["admin"]))])
+def get_platform_overview(
+    days: int = Query(90, ge=1, le=366, description="Rentang hari untuk grafik submisi harian"),
+    db: Session = Depends(get_db)
+):
+    """Statistik agregat seluruh platform untuk dashboard admin."""
+    return _overview_cache.get_or_set(days, lambda: stat_crud.get_platform_overview(db, days=days))
+
+
+@router.get("/heatmap", response_model=stat_schemas.Heatmap)
+def get_heatmap(
+    zoom: int = Query(5, ge=0, le=18, description="Level zoom peta"),
+    exp_id: Optional[int] = None,
+    min_lat: Optional[float] = Query(None, ge=-90, le=90),
+    min_lng: Optional[float] = Query(None, ge=-180, le=180),
+    max_lat: Optional[float] = Query(None, ge=-90, le=90),
+    max_lng: Optional[float] = Query(None, ge=-180, le=180),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(5000, ge=1, le=50000, description="Jumlah sel maksimum"),
+    db: Session = Depends(get_db)
+):
+    """
+    Titik heatmap yang sudah diagregasi per sel grid di sisi server.
+    Ukuran sel mengikuti level zoom sehingga payload tetap kecil berapa pun jumlah submission.
+    """
+    if exp_id is not None and not get_experiment(db, exp_id):
+        raise HTTPException(status_code=404, detail="Experiment not found")
+
+    cell_size = stat_crud.heatmap_cell_size(zoom)
+    cells = stat_crud.get_heatmap_cells(
+        db,
+        cell_size=cell_size,
+        experiment_id=exp_id,
+        min_lat=min_lat,
+        min_lng=min_lng,
+        max_lat=max_lat,
+        max_lng=max_lng,
+        start=start,
+        end=end,
+        limit=limit,
+    )
+    points = [[round(lat, 6), round(lng, 6), weight] for lat, lng, weight in cells]
+    return {
+        "zoom": zoom,
+        "cell_size": cell_size,
+        "total": sum(point[2] for point in points),
+        "max_weight": max((point[2] for point in points), default=0),
+        "points": points,
+    }
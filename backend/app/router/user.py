@@ -1,15 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from app.crud import user as user_crud
 from app.schemas import user as user_schemas
-from app.database import get_db
+from app.database import SessionLocal, get_db
 from app.core.dependencies import get_current_active_user, role_checker
+from app.core.audit import audit
+from app.core.config import settings
+from app.core.deletion_jobs import deletion_jobs
+from app.core.serialization import submission_page_response
 from app.models import User
 from app.crud import submission as submission_crud
 from app.schemas import submission as submission_schemas
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+def _delete_user(db: Session, db_user: User):
+    """User dengan submission sangat banyak dihapus bertahap di latar belakang (respons 202 berisi progress)."""
+    total = user_crud.count_deletion_submissions(db, db_user.id)
+    if total < settings.BULK_DELETE_BACKGROUND_THRESHOLD:
+        user_crud.delete_user(db, db_user)
+        return None
+    user_id = db_user.id
+
+    def work(progress):
+        with SessionLocal() as session:
+            user_crud.delete_user(session, user_crud.get_user(session, user_id), chunk_size=settings.BULK_DELETE_CHUNK_SIZE, progress=progress)
+    job = deletion_jobs.start("user", user_id, total, work)
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=jsonable_encoder(job))
+
 # Endpoint untuk mengambil data diri user yang sedang login
 @router.get("/me", response_model=user_schemas.User)
 def read_users_me(current_user: User = Depends(get_current_active_user)):
@@ -27,8 +48,11 @@ def update_own_profile(
         db_user_with_new_email = user_crud.get_user_by_email(db, email=updates.email)
         if db_user_with_new_email:
             raise HTTPException(status_code=400, detail="Email ini sudah terdaftar.")
-            
-    return user_crud.update_user(db=db, db_user=current_user, updates=updates)
+
+    # current_user adalah principal dari cache; update dilakukan pada objek database
+    db_user = user_crud.get_user(db, current_user.id)
+    audit("USER_UPDATE", current_user.id, f"user_id={current_user.id} fields={','.join(sorted(updates.model_dump(exclude_unset=True)))}")
+    return user_crud.update_user(db=db, db_user=db_user, updates=updates)
 
 # Endpoint untuk menghapus data diri user yang sedang login
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
@@ -36,16 +60,23 @@ def delete_own_account(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    user_crud.delete_user(db=db, db_user=current_user)
-    return None
+    db_user = user_crud.get_user(db, current_user.id)
+    # user_id tercatat di details karena kolom user_id menjadi NULL setelah user terhapus
+    audit("USER_DELETE", current_user.id, f"user_id={current_user.id} email={current_user.email}")
+    return _delete_user(db, db_user)
 
 # Menampilkan daftar semua data yang pernah user kirim
-@router.get("/me/submissions", response_model=list[submission_schemas.Submission])
+@router.get("/me/submissions", response_model=submission_schemas.SubmissionPage)
 def read_own_submissions(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    include_total: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    return submission_crud.get_submissions_by_user(db=db, user_id=current_user.id)
+    items, next_cursor = submission_crud.get_submissions_by_user(db=db, user_id=current_user.id, cursor=cursor, limit=limit)
+    total = submission_crud.count_submissions_by_user(db=db, user_id=current_user.id) if include_total else None
+    return submission_page_response(items, next_cursor, total)
 
 
 # Endpoint untuk mendapatkan semua user (khusus admin)
@@ -56,17 +87,26 @@ def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
 
 # Endpoint update user (khusus admin)
 @router.put("/{user_id}", response_model=user_schemas.User, dependencies=[Depends(role_checker(["admin"]))])
-def update_user(user_id: int, updates: user_schemas.UserUpdate, db: Session = Depends(get_db)):
+def update_user(user_id: int, updates: user_schemas.UserUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     db_user = user_crud.get_user(db, user_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
+    audit("USER_UPDATE", current_user.id, f"user_id={user_id} fields={','.join(sorted(updates.model_dump(exclude_unset=True)))}")
     return user_crud.update_user(db, db_user, updates)
 
 # Endpoint delete user (khusus admin)
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(role_checker(["admin"]))])
-def delete_user(user_id: int, db: Session = Depends(get_db)):
+def delete_user(user_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     db_user = user_crud.get_user(db, user_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
-    user_crud.delete_user(db, db_user)
-    return None
\ No newline at end of file
+    audit("USER_DELETE", current_user.id, f"user_id={user_id} email={db_user.email}")
+    return _delete_user(db, db_user)
+
+# Progress penghapusan user yang berjalan di latar belakang (khusus admin)
+@router.get("/{user_id}/deletion", dependencies=[Depends(role_checker(["admin"]))])
+def read_user_deletion(user_id: int):
+    job = deletion_jobs.snapshot("user", user_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Tidak ada proses penghapusan untuk user ini")
+    return job
\ No newline at end of file
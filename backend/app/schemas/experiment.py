@@ -2,7 +2,6 @@ from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any, Union
 from datetime import datetime
 from app.schemas import user
-from app.schemas import submission as submission_schema
 
 # Schema untuk field input yang dikonfigurasi researcher
 class InputField(BaseModel):
@@ -41,7 +40,46 @@ class Experiment(ExperimentBase):
     created_by: int
     created_at: datetime
     owner: user.User
-    submissions : Optional[List[submission_schema.Submission]] = None
+    submission_count: int = 0
+    last_submission_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Representasi ringkas untuk daftar experiment (tanpa konfigurasi field)
+class ExperimentSummary(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+    require_location: bool
+    deadline: Optional[datetime] = None
+    created_by: int
+    created_at: datetime
+    owner: user.User
+    submission_count: int = 0
+    last_submission_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+# Hasil pencarian full-text experiment beserta skor dan highlight
+class ExperimentSearchHit(ExperimentSummary):
+    rank: float = Field(description="Skor relevansi (makin besar makin relevan)")
+    title_highlight: str = Field(description="Judul dengan kata yang cocok diapit <mark>…</mark>")
+    description_highlight: Optional[str] = Field(default=None, description="Potongan deskripsi dengan kata yang cocok diapit <mark>…</mark>")
+
+class ExperimentSearchPage(BaseModel):
+    items: List[ExperimentSearchHit]
+    total: int
+
+# Agregat experiment per pemilik (khusus admin)
+class ExperimentOwnerSummary(BaseModel):
+    owner_id: int
+    full_name: str
+    email: str
+    experiment_count: int
+    active_count: int
+    expired_count: int
+    submission_count: int
+    latest_created_at: Optional[datetime] = None
+    last_submission_at: Optional[datetime] = None
@@ -0,0 +1,70 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+class Heatmap(BaseModel):
+    zoom: int
+    cell_size: float = Field(description="Ukuran sel grid dalam derajat")
+    total: int = Field(description="Jumlah submission yang tercakup")
+    max_weight: int = Field(description="Bobot sel terbesar, untuk normalisasi intensitas")
+    points: List[List[float]] = Field(description="Daftar [lat, lng, bobot] per sel grid")
+
+class NumberStats(BaseModel):
+    count: int
+    min: Optional[float] = None
+    max: Optional[float] = None
+    mean: Optional[float] = None
+    stddev: Optional[float] = None
+    percentiles: Optional[Dict[str, Optional[float]]] = Field(default=None, description="p25/p50/p75/p90, hanya tersedia di PostgreSQL")
+
+class FieldStats(BaseModel):
+    name: str
+    label: str
+    type: str
+    unit: Optional[str] = None
+    number: Optional[NumberStats] = None
+    categories: Optional[Dict[str, int]] = Field(default=None, description="Frekuensi per opsi untuk select/radio/checkbox")
+
+class TimeBucket(BaseModel):
+    bucket: str
+    count: int
+
+class ExperimentStats(BaseModel):
+    experiment_id: int
+    total_submissions: int
+    bucket: str
+    fields: List[FieldStats]
+    timeline: List[TimeBucket]
+
+class ResearcherRank(BaseModel):
+    id: int
+    name: str
+    experiments: int
+    submissions: int
+
+class ExperimentRank(BaseModel):
+    id: int
+    title: str
+    owner_name: str
+    submissions: int
+
+class VolunteerRank(BaseModel):
+    id: int
+    name: str
+    submissions: int
+    experiments: int
+
+class PlatformOverview(BaseModel):
+    total_users: int = Field(description="Jumlah researcher dan volunteer")
+    roles: Dict[str, int]
+    total_experiments: int
+    active_experiments: int = Field(description="Experiment belum berakhir dengan submission dalam 7 hari terakhir")
+    total_submissions: int
+    recent_submissions: int = Field(description="Submission dalam 30 hari terakhir")
+    avg_submissions_per_experiment: int
+    submission_trend: int = Field(description="Perubahan (%) submission 7 hari terakhir dibanding 7 hari sebelumnya")
+    submissions_by_date: List[TimeBucket]
+    top_researchers: List[ResearcherRank]
+    top_experiments: List[ExperimentRank]
+    top_volunteers: List[VolunteerRank]
+    generated_at: datetime
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Literal, Optional
 from datetime import datetime
 
 class SubmissionBase(BaseModel):
@@ -22,4 +22,47 @@ class Submission(SubmissionBase):
     timestamp: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class NearbySubmission(Submission):
+    distance_m: float = Field(description="Jarak dari titik pencarian dalam meter")
+
+class NearbySubmissions(BaseModel):
+    lat: float
+    lng: float
+    radius_m: Optional[float] = None
+    items: List[NearbySubmission]
+
+class SubmissionPage(BaseModel):
+    items: List[Submission]
+    next_cursor: Optional[str] = Field(default=None, description="Cursor untuk halaman berikutnya, null jika sudah habis")
+    total: Optional[int] = Field(default=None, description="Jumlah total submission (hanya jika include_total=true)")
+
+# --- Batch ingestion (sinkronisasi perangkat offline) ---
+
+class SubmissionBatchItem(SubmissionBase):
+    idempotency_key: Optional[str] = Field(default=None, max_length=64, description="Kunci unik per user; pengiriman ulang dengan kunci yang sama tidak menduplikasi data")
+
+class SubmissionBatchCreate(BaseModel):
+    items: List[SubmissionBatchItem] = Field(min_length=1, max_length=500, description="Daftar observasi yang dikumpulkan offline")
+
+class SubmissionBatchResult(BaseModel):
+    index: int
+    status: Literal["accepted", "duplicate", "rejected"]
+    idempotency_key: Optional[str] = None
+    submission_id: Optional[int] = None
+    errors: List[str] = []
+
+class SubmissionBatchResponse(BaseModel):
+    accepted: int
+    duplicates: int
+    rejected: int
+    results: List[SubmissionBatchResult]
+
+class SubmissionReceipt(BaseModel):
+    """Balasan POST submission saat mode write-behind aktif (lihat app.core.ingest)."""
+    receipt: str
+    status: Literal["queued", "persisted", "failed"]
+    experiment_id: int
+    submission_id: Optional[int] = None
+    error: Optional[str] = None
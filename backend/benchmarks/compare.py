@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Bandingkan dua hasil benchmarks/load.py (mis. commit lama vs commit baru).
+
+    python benchmarks/compare.py baseline.json hasil.json --threshold 10
+
+Keluar dengan kode 1 jika ada skenario yang p95-nya naik atau RPS-nya turun lebih dari
+--threshold persen, sehingga bisa dipakai sebagai gate di CI.
+"""
+
+import argparse
+import json
+import sys
+
+def change(before, after):
+    if not before or after is None:
+        return None
+    return round((after - before) / before * 100, 1)
+
+def compare(baseline, current, threshold):
+    rows, regressions = [], []
+    for name, result in current["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if base is None:
+            continue
+        p95_change = change(base["latency_ms"]["p95"], result["latency_ms"]["p95"])
+        rps_change = change(base["rps"], result["rps"])
+        rows.append({
+            "scenario": name,
+            "p95_ms": [base["latency_ms"]["p95"], result["latency_ms"]["p95"]],
+            "p95_change_pct": p95_change,
+            "rps": [base["rps"], result["rps"]],
+            "rps_change_pct": rps_change,
+            "errors": [base["errors"], result["errors"]],
+        })
+        if (p95_change is not None and p95_change > threshold) or (rps_change is not None and rps_change < -threshold):
+            regressions.append(name)
+    return rows, regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Bandingkan dua hasil benchmark beban")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Persen perubahan yang dianggap regresi")
+    args = parser.parse_args()
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+    rows, regressions = compare(baseline, current, args.threshold)
+    # Hasil hanya sebanding jika dijalankan dengan target dan parameter yang sama
+    mismatched = [
+        key for key in ("target", "database", "concurrency", "duration", "operations", "seed")
+        if baseline["meta"].get(key) != current["meta"].get(key)
+    ]
+    print(json.dumps({
+        "baseline": baseline["meta"].get("commit"),
+        "current": current["meta"].get("commit"),
+        "threshold_pct": args.threshold,
+        "scenarios": rows,
+        "regressions": regressions,
+        "mismatched_settings": mismatched,
+    }, indent=2))
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Benchmark beban API terhadap data dari benchmarks/seed.py. Setiap skenario dijalankan oleh
+sejumlah worker konkuren selama --duration detik; hasilnya (p50/p95/p99, RPS, status)
+dicetak sebagai JSON agar bisa dibandingkan antar commit dengan benchmarks/compare.py.
+
+    # In-process (ASGI, tanpa server; database dari DATABASE_URL)
+    python benchmarks/load.py --target asgi --scenario browse --scenario submission_burst
+    # Server yang sedang berjalan, banyak koneksi HTTP sekaligus
+    python benchmarks/load.py --target http --base-url http://127.0.0.1:8000 --concurrency 64 --output hasil.json
+
+Skenario:
+    browse            daftar experiment publik + detail experiment
+    login             POST /auth/login (dibatasi pool bcrypt, 429 dihitung sebagai error)
+    submission_burst  POST submission ke experiment yang masih aktif
+    dashboard         dashboard researcher: experiment miliknya, statistik field, halaman submission
+    export            export CSV satu experiment (body dibaca sampai habis)
+    search            pencarian full-text experiment (kata dari judul dan label field seed)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+# Tambahkan path aplikasi
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from seed import PASSWORD, email, fake_data, fake_location
+
+SCENARIOS = {}
+
+def scenario(name):
+    def register(function):
+        SCENARIOS[name] = function
+        return function
+    return register
+
+class Context:
+    """Token dan experiment hasil seed yang dipakai bersama oleh semua worker."""
+
+    def __init__(self):
+        self.volunteers = []   # header Authorization
+        self.researchers = []  # (header, user_id, [experiment_id])
+        self.admin = None
+        self.experiments = []  # ringkasan experiment publik
+        self.active = []       # (experiment_id, input_fields)
+
+def auth_header(token):
+    return {"Authorization": f"Bearer {token}"}
+
+async def login(client, address):
+    response = await client.post("/auth/login", data={"username": address, "password": PASSWORD})
+    response.raise_for_status()
+    return response.json()
+
+async def prepare(client, accounts):
+    """Login akun seed (berurutan agar tidak kena batas pool bcrypt) dan kumpulkan experiment."""
+    context = Context()
+    context.admin = auth_header((await login(client, email("admin", 0)))["access_token"])
+    for index in range(accounts):
+        try:
+            context.volunteers.append(auth_header((await login(client, email("volunteer", index)))["access_token"]))
+        except httpx.HTTPStatusError:
+            break
+    for index in range(accounts):
+        try:
+            payload = await login(client, email("researcher", index))
+        except httpx.HTTPStatusError:
+            break
+        owned = (await client.get("/experiments/", params={"created_by": payload["user"]["id"], "limit": 500})).json()
+        if owned:
+            context.researchers.append((auth_header(payload["access_token"]), payload["user"]["id"], [experiment["id"] for experiment in owned]))
+    context.experiments = (await client.get("/experiments/", params={"limit": 100})).json()
+    for summary in (await client.get("/experiments/", params={"status": "active", "limit": 50})).json():
+        detail = (await client.get(f"/experiments/{summary['id']}")).json()
+        context.active.append((detail["id"], detail["input_fields"]))
+    if not context.volunteers or not context.researchers or not context.experiments:
+        raise SystemExit("Data benchmark tidak ditemukan; jalankan benchmarks/seed.py terlebih dahulu")
+    return context
+
+@scenario("browse")
+async def browse(client, context, rng):
+    statuses = [(await client.get("/experiments/", params={"limit": 20})).status_code]
+    experiment = rng.choice(context.experiments)
+    statuses.append((await client.get(f"/experiments/{experiment['id']}")).status_code)
+    return statuses
+
+@scenario("login")
+async def login_scenario(client, context, rng):
+    index = rng.randrange(len(context.volunteers))
+    response = await client.post("/auth/login", data={"username": email("volunteer", index), "password": PASSWORD})
+    return [response.status_code]
+
+@scenario("submission_burst")
+async def submission_burst(client, context, rng):
+    if not context.active:
+        raise SystemExit("Tidak ada experiment aktif untuk skenario submission_burst")
+    experiment_id, input_fields = rng.choice(context.active)
+    lat, lng = fake_location(rng)
+    body = {"experiment_id": experiment_id, "geo_lat": lat, "geo_lng": lng, "data_json": fake_data(input_fields, rng)}
+    response = await client.post(f"/experiments/{experiment_id}/submissions", json=body, headers=rng.choice(context.volunteers))
+    return [response.status_code]
+
+@scenario("dashboard")
+async def dashboard(client, context, rng):
+    headers, user_id, experiment_ids = rng.choice(context.researchers)
+    experiment_id = rng.choice(experiment_ids)
+    # Halaman dashboard memanggil endpoint ini bersamaan, seperti browser
+    responses = await asyncio.gather(
+        client.get("/users/me", headers=headers),
+        client.get("/experiments/", params={"created_by": user_id}, headers=headers),
+        client.get("/stats/fields", params={"exp_id": experiment_id}, headers=headers),
+        client.get(f"/experiments/{experiment_id}/submissions", params={"limit": 100}, headers=headers),
+    )
+    return [response.status_code for response in responses]
+
+@scenario("export")
+async def export(client, context, rng):
+    headers, _, experiment_ids = rng.choice(context.researchers)
+    async with client.stream("GET", f"/experiments/{rng.choice(experiment_ids)}/export", params={"format": "csv"}, headers=headers) as response:
+        async for _ in response.aiter_bytes():
+            pass
+    return [response.status_code]
+
+SEARCH_TERMS = ["benchmark", "kebisingan", "suhu", "lingkungan", "cuaca", "sumber", "catatan", "experiment 1", "pm2"]
+
+@scenario("search")
+async def search(client, context, rng):
+    term = rng.choice(SEARCH_TERMS)
+    # Sebagian query hanya awalan kata, seperti pencarian sambil mengetik
+    if rng.random() < 0.5:
+        term = term[: max(3, len(term) - 2)]
+    response = await client.get("/experiments/search", params={"q": term, "limit": 9, "skip": rng.choice([0, 0, 9])})
+    return [response.status_code]
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return round(sorted_values[index] * 1000, 2)
+
+async def run_scenario(client, context, name, concurrency, duration, max_operations, seed):
+    function = SCENARIOS[name]
+    latencies, statuses = [], Counter()
+    errors = 0
+    deadline = time.perf_counter() + duration
+    remaining = [max_operations]
+
+    async def worker(worker_id):
+        nonlocal errors
+        rng = random.Random(f"{seed}-{name}-{worker_id}")
+        while time.perf_counter() < deadline and (remaining[0] is None or remaining[0] > 0):
+            if remaining[0] is not None:
+                remaining[0] -= 1
+            start = time.perf_counter()
+            try:
+                codes = await function(client, context, rng)
+            except httpx.HTTPError as exc:
+                codes = [type(exc).__name__]
+            latencies.append(time.perf_counter() - start)
+            statuses.update(str(code) for code in codes)
+            if any(not isinstance(code, int) or code >= 400 for code in codes):
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    ordered = sorted(latencies)
+    return {
+        "operations": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 2),
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "p50": percentile(ordered, 0.50),
+            "p95": percentile(ordered, 0.95),
+            "p99": percentile(ordered, 0.99),
+            "max": percentile(ordered, 1.0),
+            "mean": round(statistics.fmean(ordered) * 1000, 2) if ordered else None,
+        },
+        "status": dict(sorted(statuses.items())),
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def make_client(args):
+    timeout = httpx.Timeout(args.timeout)
+    if args.target == "http":
+        limits = httpx.Limits(max_connections=args.concurrency * 4, max_keepalive_connections=args.concurrency * 4)
+        return httpx.AsyncClient(base_url=args.base_url, timeout=timeout, limits=limits), None
+    from app.main import app
+    from app.database import engine
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=timeout)
+    return client, engine.url.get_backend_name()
+
+async def run(args):
+    client, database = make_client(args)
+    async with client:
+        context = await prepare(client, args.accounts)
+        results = {}
+        for name in args.scenario or list(SCENARIOS):
+            if args.warmup:
+                await run_scenario(client, context, name, args.concurrency, args.warmup, None, args.seed + 1)
+            results[name] = await run_scenario(client, context, name, args.concurrency, args.duration, args.operations, args.seed)
+            if not args.quiet:
+                print(f"   {name}: {results[name]['rps']} rps, p95 {results[name]['latency_ms']['p95']} ms", file=sys.stderr)
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "target": args.target,
+            "base_url": args.base_url if args.target == "http" else None,
+            "database": database,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "operations": args.operations,
+            "seed": args.seed,
+            "python": platform.python_version(),
+        },
+        "scenarios": results,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark beban FlashField API")
+    parser.add_argument("--target", choices=["asgi", "http"], default="asgi")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Bisa diulang; default semua skenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=15.0, help="Detik per skenario")
+    parser.add_argument("--operations", type=int, default=None, help="Batas jumlah operasi per skenario")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Detik pemanasan per skenario (tidak dihitung)")
+    parser.add_argument("--accounts", type=int, default=20, help="Jumlah akun volunteer/researcher seed yang dipakai")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Simpan hasil JSON ke file ini")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Generator data sintetis untuk benchmark: user (volunteer, researcher, admin), experiment dengan
+input_fields yang bervariasi, dan submission bergeotag dalam jumlah besar.
+
+    python benchmarks/seed.py --users 1000 --researchers 20 --experiments 50 --submissions 1000000
+    DATABASE_URL=sqlite:///bench.db python benchmarks/seed.py --reset --submissions 200000
+
+Database diambil dari DATABASE_URL (PostgreSQL atau SQLite). Semua akun memakai email
+bench-<role>-<n>@bench.example.com dengan password PASSWORD, sehingga benchmarks/load.py
+bisa login tanpa file tambahan. Data dibuat deterministik dari --seed.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+# Tambahkan path aplikasi
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSWORD = "benchmark-password"
+EMAIL_DOMAIN = "bench.example.com"
+
+# Pusat cluster lokasi submission (lat, lng, sebaran derajat)
+CITIES = [
+    (-6.2088, 106.8456, 0.15),  # Jakarta
+    (-6.9175, 107.6191, 0.08),  # Bandung
+    (-7.2575, 112.7521, 0.10),  # Surabaya
+    (-7.7956, 110.3695, 0.06),  # Yogyakarta
+    (3.5952, 98.6722, 0.08),    # Medan
+    (-8.6500, 115.2167, 0.10),  # Denpasar
+]
+
+# Template input_fields; experiment memakai kombinasi acak dari template ini
+FIELD_TEMPLATES = [
+    {"name": "level_db", "label": "Tingkat Kebisingan (dB)", "type": "number", "required": True, "min_value": 20, "max_value": 140, "unit": "dB"},
+    {"name": "pm25", "label": "PM2.5", "type": "number", "required": True, "min_value": 0, "max_value": 500, "unit": "µg/m³"},
+    {"name": "temperature", "label": "Suhu", "type": "number", "required": False, "min_value": -10, "max_value": 50, "unit": "°C"},
+    {"name": "environment", "label": "Lingkungan", "type": "select", "required": True, "options": ["Indoor", "Outdoor", "Jalan Raya", "Taman"]},
+    {"name": "weather", "label": "Cuaca", "type": "radio", "required": False, "options": ["Cerah", "Berawan", "Hujan"]},
+    {"name": "sources", "label": "Sumber", "type": "checkbox", "required": False, "options": ["Kendaraan", "Industri", "Manusia", "Hewan", "Konstruksi"]},
+    {"name": "notes", "label": "Catatan", "type": "text", "required": False, "max_length": 200},
+    {"name": "observed_on", "label": "Tanggal Pengamatan", "type": "date", "required": False},
+]
+NOTES = ["pengamatan rutin", "ramai", "sepi", "setelah hujan", "jam sibuk", "dekat sekolah", ""]
+
+def email(role, index):
+    return f"bench-{role}-{index}@{EMAIL_DOMAIN}"
+
+def make_input_fields(rng):
+    numeric = rng.sample(FIELD_TEMPLATES[:3], rng.randint(1, 2))
+    others = rng.sample(FIELD_TEMPLATES[3:], rng.randint(1, 4))
+    return [dict(field) for field in numeric + others]
+
+def fake_value(field, rng):
+    """Nilai valid untuk satu field sesuai tipenya (dipakai seed dan skenario submission)."""
+    field_type = field["type"]
+    if field_type == "number":
+        return round(rng.uniform(field.get("min_value", 0), field.get("max_value", 100)), 1)
+    if field_type in ("select", "radio"):
+        return rng.choice(field["options"])
+    if field_type == "checkbox":
+        return rng.sample(field["options"], rng.randint(0, min(3, len(field["options"]))))
+    if field_type in ("text", "textarea"):
+        return rng.choice(NOTES)[: field.get("max_length") or 200]
+    if field_type == "date":
+        return (datetime(2025, 1, 1) + timedelta(days=rng.randint(0, 365))).date().isoformat()
+    return None
+
+def fake_data(input_fields, rng):
+    data = {}
+    for field in input_fields:
+        if not field.get("required") and rng.random() < 0.3:
+            continue
+        data[field["name"]] = fake_value(field, rng)
+    return data
+
+def fake_location(rng):
+    lat, lng, spread = rng.choice(CITIES)
+    return lat + rng.gauss(0, spread), lng + rng.gauss(0, spread)
+
+def seed(args):
+    from sqlalchemy import bindparam, delete, insert, select, update
+    from app import models
+    from app.auth.security import get_password_hash
+    from app.core.geohash import encode
+    from app.crud.experiment_stat import rebuild_experiment_stats
+    from app.database import Base, SessionLocal, engine
+
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    if args.reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with SessionLocal() as db:
+        # Data benchmark lama dihapus dulu agar hasil seed selalu sama untuk --seed yang sama
+        old_users = select(models.User.id).where(models.User.email.like(f"bench-%@{EMAIL_DOMAIN}"))
+        old_experiments = select(models.Experiment.id).where(models.Experiment.created_by.in_(old_users))
+        db.execute(delete(models.Submission).where(models.Submission.user_id.in_(old_users) | models.Submission.experiment_id.in_(old_experiments)))
+        db.execute(delete(models.ExperimentStat).where(models.ExperimentStat.experiment_id.in_(old_experiments)))
+        db.execute(delete(models.Experiment).where(models.Experiment.id.in_(old_experiments)))
+        db.execute(models.AuditLog.__table__.update().where(models.AuditLog.user_id.in_(old_users)).values(user_id=None))
+        db.execute(delete(models.User).where(models.User.id.in_(old_users)))
+        db.commit()
+
+        # Satu hash untuk semua akun: bcrypt per user akan mendominasi waktu seed
+        hashed_password = get_password_hash(PASSWORD)
+        accounts = [("admin", 0, "admin")]
+        accounts += [("researcher", index, "researcher") for index in range(args.researchers)]
+        accounts += [("volunteer", index, "volunteer") for index in range(args.users)]
+        db.execute(insert(models.User), [
+            {"email": email(prefix, index), "full_name": f"Bench {prefix.title()} {index}", "hashed_password": hashed_password,
+             "role": role, "is_active": True}
+            for prefix, index, role in accounts
+        ])
+        users = dict(db.execute(select(models.User.email, models.User.id).where(models.User.email.like(f"bench-%@{EMAIL_DOMAIN}"))).all())
+        researcher_ids = [users[email("researcher", index)] for index in range(args.researchers)]
+        volunteer_ids = [users[email("volunteer", index)] for index in range(args.users)]
+
+        now = datetime.now(timezone.utc)
+        experiment_rows = []
+        for index in range(args.experiments):
+            # Sebagian experiment sudah lewat deadline, sebagian tanpa deadline
+            deadline = rng.choice([None, now + timedelta(days=rng.randint(1, 120)), now - timedelta(days=rng.randint(1, 60))])
+            experiment_rows.append({
+                "title": f"Benchmark Experiment {index}",
+                "description": "Experiment sintetis untuk benchmark",
+                "input_fields": make_input_fields(rng),
+                "require_location": True,
+                "deadline": deadline,
+                "created_by": rng.choice(researcher_ids),
+                "created_at": now - timedelta(days=rng.randint(0, 365)),
+            })
+        db.execute(insert(models.Experiment), experiment_rows)
+        experiments = db.execute(
+            select(models.Experiment.id, models.Experiment.input_fields)
+            .where(models.Experiment.created_by.in_(researcher_ids))
+            .order_by(models.Experiment.id)
+        ).all()
+        db.commit()
+        users_seconds = time.perf_counter() - started
+
+        # Popularitas experiment mengikuti distribusi Zipf: beberapa experiment menerima sebagian besar submission
+        weights = [1 / (rank + 1) for rank in range(len(experiments))]
+        # Counter experiment dihitung sambil membuat data, tanpa COUNT(*) ulang setelahnya
+        counters = {experiment_id: [0, None] for experiment_id, _ in experiments}
+        inserted, submission_started = 0, time.perf_counter()
+        while inserted < args.submissions:
+            batch = []
+            for _ in range(min(args.batch_size, args.submissions - inserted)):
+                experiment_id, input_fields = rng.choices(experiments, weights)[0]
+                lat, lng = fake_location(rng)
+                timestamp = now - timedelta(seconds=rng.randint(0, 90 * 86400))
+                batch.append({
+                    "experiment_id": experiment_id,
+                    "user_id": rng.choice(volunteer_ids),
+                    "geo_lat": lat,
+                    "geo_lng": lng,
+                    "geohash": encode(lat, lng),
+                    "data_json": fake_data(input_fields, rng),
+                    "timestamp": timestamp,
+                })
+                counter = counters[experiment_id]
+                counter[0] += 1
+                counter[1] = timestamp if counter[1] is None else max(counter[1], timestamp)
+            db.execute(insert(models.Submission), batch)
+            db.commit()
+            inserted += len(batch)
+            if not args.quiet:
+                print(f"   {inserted}/{args.submissions} submission", file=sys.stderr)
+        submission_seconds = time.perf_counter() - submission_started
+
+        derived_started = time.perf_counter()
+        experiment_ids = [experiment_id for experiment_id, _ in experiments]
+        if counters:
+            db.execute(
+                update(models.Experiment.__table__)
+                .where(models.Experiment.__table__.c.id == bindparam("experiment_id"))
+                .values(submission_count=bindparam("count"), last_submission_at=bindparam("last_at")),
+                [{"experiment_id": experiment_id, "count": count, "last_at": last_at} for experiment_id, (count, last_at) in counters.items()],
+            )
+        if not args.skip_stats:
+            for experiment in db.query(models.Experiment).filter(models.Experiment.id.in_(experiment_ids)):
+                rebuild_experiment_stats(db, experiment)
+        db.commit()
+        derived_seconds = time.perf_counter() - derived_started
+
+    return {
+        "database": engine.url.get_backend_name(),
+        "seed": args.seed,
+        "users": args.users,
+        "researchers": args.researchers,
+        "experiments": args.experiments,
+        "submissions": args.submissions,
+        "seconds": {
+            "users_and_experiments": round(users_seconds, 2),
+            "submissions": round(submission_seconds, 2),
+            "counters_and_stats": round(derived_seconds, 2),
+            "total": round(time.perf_counter() - started, 2),
+        },
+        "submissions_per_second": round(args.submissions / submission_seconds) if submission_seconds else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Isi database dengan data sintetis untuk benchmark")
+    parser.add_argument("--users", type=int, default=500, help="Jumlah volunteer")
+    parser.add_argument("--researchers", type=int, default=10)
+    parser.add_argument("--experiments", type=int, default=30)
+    parser.add_argument("--submissions", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Drop dan buat ulang semua tabel (hanya untuk database benchmark!)")
+    parser.add_argument("--skip-stats", action="store_true", help="Lewati rebuild rollup experiment_stats")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+    if args.researchers < 1 or args.users < 1 or args.experiments < 1:
+        parser.error("--users, --researchers, dan --experiments minimal 1")
+    print(json.dumps(seed(args), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark serialisasi SubmissionPage: jalur FastAPI default (validasi response_model Pydantic
++ JSONResponse) dibandingkan jalur cepat FAST_JSON_RESPONSES (dict langsung + orjson).
+
+    python benchmarks/serialization.py --rows 10000 --repeat 7
+
+Tidak membutuhkan database: baris Submission dibuat sebagai objek ORM di memori.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+# Tambahkan path aplikasi
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from app.models import Submission
+from app.schemas.submission import SubmissionPage
+from app.core.serialization import FastJSONResponse, submission_rows
+
+def make_submissions(count):
+    random.seed(42)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        Submission(
+            id=index + 1,
+            experiment_id=1,
+            user_id=random.randint(1, 200),
+            geo_lat=random.uniform(-8, -6),
+            geo_lng=random.uniform(106, 108),
+            data_json={
+                "level_db": round(random.uniform(30, 120), 1),
+                "env": random.choice(["indoor", "outdoor", "traffic"]),
+                "sources": random.sample(["car", "bird", "people", "machine"], 2),
+                "note": "pengamatan rutin",
+            },
+            timestamp=start + timedelta(seconds=index * 37),
+        )
+        for index in range(count)
+    ]
+
+def default_path(items):
+    # Sama dengan FastAPI: validasi terhadap response_model, serialize mode json, lalu JSONResponse
+    adapter = TypeAdapter(SubmissionPage)
+    page = adapter.validate_python({"items": items, "next_cursor": None, "total": None}, from_attributes=True)
+    return JSONResponse(adapter.dump_python(page, mode="json")).body
+
+def fast_path(items):
+    return FastJSONResponse({"items": submission_rows(items), "next_cursor": None, "total": None}).body
+
+def measure(function, items, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(items)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serialisasi list submission")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    items = make_submissions(args.rows)
+    # Kedua jalur harus menghasilkan JSON yang sama
+    assert json.loads(default_path(items)) == json.loads(fast_path(items)), "output serialisasi berbeda"
+
+    results = {"rows": args.rows, "repeat": args.repeat}
+    for name, function in (("default", default_path), ("fast", fast_path)):
+        timings = measure(function, items, args.repeat)
+        results[name] = {
+            "median_ms": round(statistics.median(timings) * 1000, 2),
+            "min_ms": round(min(timings) * 1000, 2),
+            "ms_per_10k": round(statistics.median(timings) * 1000 * 10000 / args.rows, 2),
+        }
+    results["speedup"] = round(results["default"]["median_ms"] / results["fast"]["median_ms"], 2)
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
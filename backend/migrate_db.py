@@ -1,8 +1,15 @@
 #!/usr/bin/env python3
 """
-Script untuk memperbarui database dengan field email verification dan dynamic input fields
+Runner migrasi berversi untuk database (PostgreSQL / Neon.tech).
+Setiap migrasi dijalankan sekali dan dicatat di tabel schema_migrations.
+
+    python migrate_db.py              # jalankan migrasi yang belum diterapkan
+    python migrate_db.py --with-gin   # sekaligus buat index GIN opsional pada data_json
+    python migrate_db.py --with-postgis  # pasang PostGIS untuk query spasial (SPATIAL_BACKEND=postgis)
+    python migrate_db.py --status     # tampilkan status migrasi
 """
 
+import argparse
 import sys
 import os
 from sqlalchemy import text, inspect
@@ -11,6 +18,7 @@ from sqlalchemy import text, inspect
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app.database import engine
+from app.core.config import settings
 
 def check_column_exists(table_name, column_name):
     """Cek apakah kolom sudah ada di tabel"""
@@ -19,130 +27,399 @@ def check_column_exists(table_name, column_name):
     return column_name in columns
 
 def add_column_if_not_exists(table_name, column_name, column_definition):
-    """Tambahkan kolom jika belum ada"""
-    if not check_column_exists(table_name, column_name):
-        try:
-            with engine.connect() as conn:
-                # Untuk PostgreSQL (Neon.tech)
-                sql = f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_definition}"
-                conn.execute(text(sql))
-                conn.commit()
-                print(f"✅ Kolom {column_name} berhasil ditambahkan ke tabel {table_name}")
-                return True
-        except Exception as e:
-            print(f"❌ Error menambahkan kolom {column_name}: {e}")
-            return False
-    else:
+    """
+    Tambahkan kolom jika belum ada. False jika kolom sudah ada; error ALTER TABLE diteruskan
+    agar migrasi yang gagal tidak dicatat di schema_migrations.
+    """
+    if check_column_exists(table_name, column_name):
         print(f"⚠️  Kolom {column_name} sudah ada di tabel {table_name}")
         return False
+    with engine.connect() as conn:
+        # Untuk PostgreSQL (Neon.tech)
+        sql = f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_definition}"
+        conn.execute(text(sql))
+        conn.commit()
+    print(f"✅ Kolom {column_name} berhasil ditambahkan ke tabel {table_name}")
+    return True
 
-def main():
-    print("🚀 Memperbarui database Neon.tech dengan fitur baru...")
-    print("=" * 50)
-    
+def backfill_submission_counters():
+    """Isi submission_count dan last_submission_at dari data submission yang sudah ada"""
+    with engine.connect() as conn:
+        conn.execute(text("""
+            UPDATE experiments e SET
+                submission_count = s.total,
+                last_submission_at = s.last_at
+            FROM (
+                SELECT experiment_id, COUNT(*) AS total, MAX(timestamp) AS last_at
+                FROM submissions GROUP BY experiment_id
+            ) s
+            WHERE s.experiment_id = e.id
+        """))
+        conn.commit()
+    print("✅ Counter submission experiment berhasil diisi")
+    return True
+
+def migration_0001_columns():
+    """Kolom email verification, dynamic input fields, counter submission, dan idempotency key"""
     success_count = 0
     total_changes = 0
+
+    # Tambahkan kolom ke tabel users
+    print("\n👤 Memperbarui tabel users...")
+    user_columns = [
+        ("is_email_verified", "BOOLEAN DEFAULT FALSE"),
+        ("email_verification_token", "VARCHAR(255)"),
+        ("email_verification_token_expires", "TIMESTAMP")
+    ]
     
-    try:
-        # Tambahkan kolom ke tabel users
-        print("\n👤 Memperbarui tabel users...")
-        user_columns = [
-            ("is_email_verified", "BOOLEAN DEFAULT FALSE"),
-            ("email_verification_token", "VARCHAR(255)"),
-            ("email_verification_token_expires", "TIMESTAMP")
-        ]
+    for col_name, col_def in user_columns:
+        total_changes += 1
+        if add_column_if_not_exists("users", col_name, col_def):
+            success_count += 1
+    
+    # Tambahkan kolom ke tabel experiments
+    print("\n🧪 Memperbarui tabel experiments...")
+    experiment_columns = [
+        ("input_fields", "JSONB DEFAULT '[]'::jsonb"),
+        ("require_location", "BOOLEAN DEFAULT FALSE"),
+        ("input_fields_version", "INTEGER NOT NULL DEFAULT 1"),
+        ("submission_count", "INTEGER NOT NULL DEFAULT 0"),
+        ("last_submission_at", "TIMESTAMP WITH TIME ZONE")
+    ]
+    
+    counters_added = False
+    for col_name, col_def in experiment_columns:
+        total_changes += 1
+        if add_column_if_not_exists("experiments", col_name, col_def):
+            success_count += 1
+            counters_added = counters_added or col_name == "submission_count"
+    
+    # Isi counter submission untuk experiment yang sudah ada
+    if counters_added:
+        total_changes += 1
+        if backfill_submission_counters():
+            success_count += 1
+    
+    # Update tabel submissions - ubah geo_lat dan geo_lng menjadi nullable
+    print("\n📊 Memperbarui tabel submissions...")
+    with engine.connect() as conn:
+        # Cek apakah kolom geo_lat dan geo_lng sudah nullable
+        inspector = inspect(engine)
+        columns = inspector.get_columns("submissions")
+        
+        geo_lat_nullable = False
+        geo_lng_nullable = False
+        data_json_exists = False
         
-        for col_name, col_def in user_columns:
+        for col in columns:
+            if col['name'] == 'geo_lat':
+                geo_lat_nullable = col['nullable']
+            elif col['name'] == 'geo_lng':
+                geo_lng_nullable = col['nullable']
+            elif col['name'] == 'data_json':
+                data_json_exists = True
+        
+        # Tambahkan kolom data_json jika belum ada
+        if not data_json_exists:
             total_changes += 1
-            if add_column_if_not_exists("users", col_name, col_def):
+            if add_column_if_not_exists("submissions", "data_json", "JSONB DEFAULT '{}'::jsonb"):
                 success_count += 1
         
-        # Tambahkan kolom ke tabel experiments
-        print("\n🧪 Memperbarui tabel experiments...")
-        experiment_columns = [
-            ("input_fields", "JSONB DEFAULT '[]'::jsonb"),
-            ("require_location", "BOOLEAN DEFAULT FALSE")
-        ]
+        # Kolom idempotency_key untuk batch ingestion dari perangkat offline
+        total_changes += 1
+        if add_column_if_not_exists("submissions", "idempotency_key", "VARCHAR(64)"):
+            success_count += 1
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_submissions_user_idempotency_key "
+            "ON submissions (user_id, idempotency_key)"
+        ))
+        conn.commit()
         
-        for col_name, col_def in experiment_columns:
-            total_changes += 1
-            if add_column_if_not_exists("experiments", col_name, col_def):
+        # Ubah geo_lat dan geo_lng menjadi nullable jika belum
+        if not geo_lat_nullable:
+            try:
+                conn.execute(text("ALTER TABLE submissions ALTER COLUMN geo_lat DROP NOT NULL"))
+                conn.commit()
+                print("✅ Kolom geo_lat berhasil diubah menjadi nullable")
                 success_count += 1
+            except Exception as e:
+                print(f"⚠️  geo_lat mungkin sudah nullable: {e}")
+            total_changes += 1
         
-        # Update tabel submissions - ubah geo_lat dan geo_lng menjadi nullable
-        print("\n📊 Memperbarui tabel submissions...")
-        try:
-            with engine.connect() as conn:
-                # Cek apakah kolom geo_lat dan geo_lng sudah nullable
-                inspector = inspect(engine)
-                columns = inspector.get_columns("submissions")
-                
-                geo_lat_nullable = False
-                geo_lng_nullable = False
-                data_json_exists = False
-                
-                for col in columns:
-                    if col['name'] == 'geo_lat':
-                        geo_lat_nullable = col['nullable']
-                    elif col['name'] == 'geo_lng':
-                        geo_lng_nullable = col['nullable']
-                    elif col['name'] == 'data_json':
-                        data_json_exists = True
-                
-                # Tambahkan kolom data_json jika belum ada
-                if not data_json_exists:
-                    total_changes += 1
-                    if add_column_if_not_exists("submissions", "data_json", "JSONB DEFAULT '{}'::jsonb"):
-                        success_count += 1
-                
-                # Ubah geo_lat dan geo_lng menjadi nullable jika belum
-                if not geo_lat_nullable:
-                    try:
-                        conn.execute(text("ALTER TABLE submissions ALTER COLUMN geo_lat DROP NOT NULL"))
-                        conn.commit()
-                        print("✅ Kolom geo_lat berhasil diubah menjadi nullable")
-                        success_count += 1
-                    except Exception as e:
-                        print(f"⚠️  geo_lat mungkin sudah nullable: {e}")
-                    total_changes += 1
-                
-                if not geo_lng_nullable:
-                    try:
-                        conn.execute(text("ALTER TABLE submissions ALTER COLUMN geo_lng DROP NOT NULL"))
-                        conn.commit()
-                        print("✅ Kolom geo_lng berhasil diubah menjadi nullable")
-                        success_count += 1
-                    except Exception as e:
-                        print(f"⚠️  geo_lng mungkin sudah nullable: {e}")
-                    total_changes += 1
-                        
-        except Exception as e:
-            print(f"❌ Error memperbarui tabel submissions: {e}")
+        if not geo_lng_nullable:
+            try:
+                conn.execute(text("ALTER TABLE submissions ALTER COLUMN geo_lng DROP NOT NULL"))
+                conn.commit()
+                print("✅ Kolom geo_lng berhasil diubah menjadi nullable")
+                success_count += 1
+            except Exception as e:
+                print(f"⚠️  geo_lng mungkin sudah nullable: {e}")
+            total_changes += 1
+
+    print(f"📋 Kolom: {success_count}/{total_changes} perubahan diterapkan")
+
+def create_index_concurrently(name, definition):
+    """Buat index tanpa mengunci tabel dari INSERT (CONCURRENTLY harus di luar transaksi)"""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        # Index INVALID dari percobaan CONCURRENTLY yang gagal dibuang dulu agar bisa dibuat ulang
+        invalid = conn.execute(text("""
+            SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = :name AND NOT i.indisvalid
+        """), {"name": name}).first()
+        if invalid:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}"))
+    print(f"✅ Index {name} siap")
+
+def migration_0002_submission_indexes():
+    """Index komposit untuk listing keyset, count, dan agregasi per experiment / per user"""
+    create_index_concurrently(
+        "ix_submissions_experiment_id_timestamp",
+        "ON submissions (experiment_id, timestamp, id)",
+    )
+    create_index_concurrently(
+        "ix_submissions_user_id_timestamp",
+        "ON submissions (user_id, timestamp, id)",
+    )
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE submissions"))
+        conn.commit()
+
+def convert_column_to_jsonb(table_name, column_name):
+    """Ubah kolom JSON menjadi JSONB (menulis ulang tabel, jalankan di luar jam sibuk)"""
+    with engine.connect() as conn:
+        data_type = conn.execute(text("""
+            SELECT data_type FROM information_schema.columns
+            WHERE table_name = :table AND column_name = :column
+        """), {"table": table_name, "column": column_name}).scalar()
+        if data_type == "jsonb":
+            print(f"⚠️  Kolom {table_name}.{column_name} sudah JSONB")
+            return
+        conn.execute(text(
+            f"ALTER TABLE {table_name} ALTER COLUMN {column_name} TYPE JSONB USING {column_name}::jsonb"
+        ))
+        conn.commit()
+        print(f"✅ Kolom {table_name}.{column_name} diubah menjadi JSONB")
+
+def migration_0003_jsonb():
+    """Kolom JSON yang sering dibaca per key diubah menjadi JSONB"""
+    convert_column_to_jsonb("submissions", "data_json")
+    convert_column_to_jsonb("experiments", "input_fields")
+
+def migration_0004_data_json_gin():
+    """Index GIN (jsonb_path_ops) untuk filter containment data_json @> '{...}'"""
+    create_index_concurrently(
+        "ix_submissions_data_json_gin",
+        "ON submissions USING GIN (data_json jsonb_path_ops)",
+    )
+
+def backfill_geohash(batch_size=5000):
+    """Isi kolom geohash untuk submission lama secara bertahap"""
+    from app.core.geohash import encode
+    total = 0
+    while True:
+        with engine.connect() as conn:
+            rows = conn.execute(text("""
+                SELECT id, geo_lat, geo_lng FROM submissions
+                WHERE geohash IS NULL AND geo_lat IS NOT NULL AND geo_lng IS NOT NULL
+                LIMIT :limit
+            """), {"limit": batch_size}).all()
+            if not rows:
+                break
+            conn.execute(
+                text("UPDATE submissions SET geohash = :geohash WHERE id = :id"),
+                [{"id": row.id, "geohash": encode(row.geo_lat, row.geo_lng)} for row in rows],
+            )
+            conn.commit()
+        total += len(rows)
+        print(f"   ... {total} submission diberi geohash")
+    print(f"✅ Backfill geohash selesai ({total} baris)")
+
+def migration_0005_geohash():
+    """Kolom geohash + index (experiment_id, geohash) untuk query bbox/radius/nearest"""
+    add_column_if_not_exists("submissions", "geohash", "VARCHAR(12)")
+    backfill_geohash()
+    create_index_concurrently(
+        "ix_submissions_experiment_id_geohash",
+        "ON submissions (experiment_id, geohash)",
+    )
+
+def migration_0006_postgis():
+    """Ekstensi PostGIS + index GiST geography (aktifkan dengan SPATIAL_BACKEND=postgis)"""
+    with engine.connect() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
+        conn.commit()
+    # Ekspresi harus sama persis dengan app.crud.spatial._geography
+    create_index_concurrently(
+        "ix_submissions_geography",
+        "ON submissions USING GIST (geography(ST_SetSRID(ST_MakePoint(geo_lng, geo_lat), 4326)))",
+    )
+
+def migration_0007_audit_logs_user_nullable():
+    """audit_logs.user_id boleh NULL dan di-set NULL saat user dihapus, agar jejak audit tetap ada"""
+    with engine.connect() as conn:
+        conn.execute(text("ALTER TABLE audit_logs ALTER COLUMN user_id DROP NOT NULL"))
+        conn.execute(text("ALTER TABLE audit_logs DROP CONSTRAINT IF EXISTS audit_logs_user_id_fkey"))
+        conn.execute(text(
+            "ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_user_id_fkey "
+            "FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE SET NULL"
+        ))
+        conn.commit()
+    print("✅ audit_logs.user_id sekarang nullable dengan ON DELETE SET NULL")
+
+CASCADE_FOREIGN_KEYS = [
+    ("experiments", "created_by", "users"),
+    ("submissions", "experiment_id", "experiments"),
+    ("submissions", "user_id", "users"),
+    ("experiment_stats", "experiment_id", "experiments"),
+]
+
+def migration_0008_cascade_foreign_keys():
+    """Foreign key anak memakai ON DELETE CASCADE agar penghapusan induk tidak perlu memuat baris anak"""
+    inspector = inspect(engine)
+    with engine.connect() as conn:
+        for table_name, column_name, parent_table in CASCADE_FOREIGN_KEYS:
+            if not inspector.has_table(table_name):
+                # Tabel baru (mis. experiment_stats) dibuat aplikasi dari model yang sudah memakai ON DELETE CASCADE
+                print(f"⚠️  Tabel {table_name} belum ada, dilewati")
+                continue
+            constraint = f"{table_name}_{column_name}_fkey"
+            conn.execute(text(f"ALTER TABLE {table_name} DROP CONSTRAINT IF EXISTS {constraint}"))
+            conn.execute(text(
+                f"ALTER TABLE {table_name} ADD CONSTRAINT {constraint} "
+                f"FOREIGN KEY ({column_name}) REFERENCES {parent_table} (id) ON DELETE CASCADE"
+            ))
+            print(f"✅ {table_name}.{column_name} -> {parent_table}.id ON DELETE CASCADE")
+        conn.commit()
+
+def migration_0009_experiment_indexes():
+    """Index untuk filter daftar experiment per pemilik / rentang created_at dan status deadline"""
+    create_index_concurrently(
+        "ix_experiments_created_by_created_at",
+        "ON experiments (created_by, created_at)",
+    )
+    create_index_concurrently("ix_experiments_deadline", "ON experiments (deadline)")
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE experiments"))
+        conn.commit()
+
+def migration_0010_experiment_search():
+    """Index GIN tsvector untuk pencarian full-text experiment (judul, deskripsi, label field)"""
+    config = settings.SEARCH_TEXT_CONFIG
+    # Ekspresi harus sama persis dengan app.crud.experiment.search_document
+    create_index_concurrently(
+        "ix_experiments_search",
+        f"""ON experiments USING GIN ((
+            setweight(to_tsvector('{config}'::regconfig, coalesce(title, '')), 'A')
+            || setweight(to_tsvector('{config}'::regconfig, coalesce(description, '')), 'B')
+            || setweight(to_tsvector('{config}'::regconfig, CAST(jsonb_path_query_array(CAST(input_fields AS JSONB), '$[*].label') AS TEXT)), 'C')
+        ))""",
+    )
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE experiments"))
+        conn.commit()
+
+def migration_0011_experiment_stats_stale():
+    """Tanda rollup experiment_stats yang sedang dibangun ulang setelah input_fields diubah"""
+    add_column_if_not_exists("experiments", "stats_stale", "BOOLEAN NOT NULL DEFAULT FALSE")
+
+# Urutan migrasi; versi yang sudah tercatat di schema_migrations dilewati
+MIGRATIONS = [
+    ("0001", "Kolom email verification, dynamic fields, counter & idempotency key", migration_0001_columns),
+    ("0002", "Index (experiment_id, timestamp) dan (user_id, timestamp) pada submissions", migration_0002_submission_indexes),
+    ("0003", "Konversi data_json dan input_fields ke JSONB", migration_0003_jsonb),
+    ("0005", "Kolom dan index geohash pada submissions", migration_0005_geohash),
+    ("0007", "audit_logs.user_id nullable dengan ON DELETE SET NULL", migration_0007_audit_logs_user_nullable),
+    ("0008", "Foreign key submissions, experiments & experiment_stats dengan ON DELETE CASCADE", migration_0008_cascade_foreign_keys),
+    ("0009", "Index (created_by, created_at) dan (deadline) pada experiments", migration_0009_experiment_indexes),
+    ("0010", "Index GIN full-text search pada experiments", migration_0010_experiment_search),
+    ("0011", "Kolom stats_stale pada experiments", migration_0011_experiment_stats_stale),
+]
+
+# Migrasi opsional, hanya dijalankan jika diminta lewat flag
+OPTIONAL_MIGRATIONS = {
+    "gin": ("0004", "Index GIN pada submissions.data_json", migration_0004_data_json_gin),
+    "postgis": ("0006", "PostGIS dan index GiST lokasi submissions", migration_0006_postgis),
+}
+
+def ensure_migrations_table():
+    with engine.connect() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version VARCHAR(32) PRIMARY KEY,
+                description TEXT,
+                applied_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+            )
+        """))
+        conn.commit()
+
+def applied_versions():
+    with engine.connect() as conn:
+        return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+def record_migration(version, description):
+    with engine.connect() as conn:
+        conn.execute(
+            text("INSERT INTO schema_migrations (version, description) VALUES (:version, :description)"),
+            {"version": version, "description": description},
+        )
+        conn.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description="Jalankan migrasi database FlashField")
+    parser.add_argument("--with-gin", action="store_true", help="buat index GIN opsional pada submissions.data_json")
+    parser.add_argument("--with-postgis", action="store_true", help="pasang PostGIS dan index GiST lokasi (butuh ekstensi postgis)")
+    parser.add_argument("--status", action="store_true", help="tampilkan status migrasi tanpa menjalankan apa pun")
+    args = parser.parse_args()
+
+    migrations = list(MIGRATIONS)
+    if args.with_gin:
+        migrations.append(OPTIONAL_MIGRATIONS["gin"])
+    if args.with_postgis:
+        migrations.append(OPTIONAL_MIGRATIONS["postgis"])
+    migrations.sort(key=lambda migration: migration[0])
+
+    print("🚀 Memperbarui database Neon.tech...")
+    print("=" * 50)
+    
+    try:
+        ensure_migrations_table()
+        applied = applied_versions()
+
+        if args.status:
+            for version, description, _ in MIGRATIONS + list(OPTIONAL_MIGRATIONS.values()):
+                mark = "✅" if version in applied else "⏳"
+                print(f"{mark} {version}  {description}")
+            return 0
+
+        pending = [migration for migration in migrations if migration[0] not in applied]
+        for version, description, migrate in pending:
+            print(f"\n▶️  {version}: {description}")
+            migrate()
+            record_migration(version, description)
+            print(f"✅ Migrasi {version} tercatat")
         
         # Ringkasan
         print("\n" + "=" * 50)
         print(f"📋 RINGKASAN MIGRASI:")
-        print(f"✅ Berhasil: {success_count}/{total_changes} perubahan")
-        
-        if success_count > 0:
+        if pending:
+            print(f"✅ {len(pending)} migrasi diterapkan: {', '.join(version for version, _, _ in pending)}")
             print("\n🎯 Langkah selanjutnya:")
-            print("  1. Restart aplikasi FastAPI")
-            print("  2. Test endpoint baru untuk email verification") 
-            print("  3. Test dynamic input fields pada experiment")
-            print("  4. Cek database di Neon.tech console untuk memastikan")
+            print("  1. Jalankan verify_migration.py untuk memastikan index dipakai query utama")
+            print("  2. Restart aplikasi FastAPI")
         else:
-            print("\n✅ Semua kolom sudah up-to-date!")
+            print("\n✅ Database sudah up-to-date!")
         
         return 0
         
     except Exception as e:
-        print(f"\n❌ Error umum: {e}")
+        print(f"\n❌ Error: {e}")
         print("\n💡 Tips troubleshooting:")
         print("1. Pastikan koneksi ke Neon.tech stabil")
         print("2. Periksa DATABASE_URL di file .env")
-        print("3. Pastikan user database memiliki permission untuk ALTER TABLE")
-        print("4. Cek log error di atas untuk detail masalah")
+        print("3. Pastikan user database memiliki permission untuk ALTER TABLE dan CREATE INDEX")
+        print("4. Migrasi yang gagal tidak dicatat dan akan dicoba lagi pada run berikutnya")
         return 1
 
 if __name__ == "__main__":
-    exit(main())
\ No newline at end of file
+    exit(main())
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Script untuk membangun ulang tabel rollup experiment_stats dari data submission
+"""
+
+import argparse
+import sys
+import os
+
+# Tambahkan path aplikasi
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal, engine
+from app import models
+from app.crud import experiment_stat as experiment_stat_crud
+
+def main():
+    parser = argparse.ArgumentParser(description="Bangun ulang rollup statistik experiment")
+    parser.add_argument("--experiment", type=int, action="append", help="ID experiment (boleh diulang); default semua experiment")
+    args = parser.parse_args()
+
+    print("🚀 Membangun ulang rollup statistik experiment...")
+    print("=" * 50)
+
+    models.ExperimentStat.__table__.create(bind=engine, checkfirst=True)
+    db = SessionLocal()
+    try:
+        query = db.query(models.Experiment).order_by(models.Experiment.id)
+        if args.experiment:
+            query = query.filter(models.Experiment.id.in_(args.experiment))
+
+        rebuilt = 0
+        for experiment in query.all():
+            experiment_stat_crud.rebuild_experiment_stats(db, experiment)
+            experiment.stats_stale = False
+            # Commit per experiment agar transaksi tidak menahan lock terlalu lama
+            db.commit()
+            rebuilt += 1
+            print(f"✅ Experiment {experiment.id} ({experiment.title}): {experiment.submission_count} submission")
+
+        print("\n" + "=" * 50)
+        print(f"📋 Selesai: {rebuilt} experiment dibangun ulang")
+        return 0
+    except Exception as e:
+        db.rollback()
+        print(f"\n❌ Error membangun ulang rollup: {e}")
+        return 1
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    exit(main())
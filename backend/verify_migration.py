@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Verifikasi hasil migrate_db.py: versi migrasi, tipe kolom JSONB, keberadaan index,
+dan EXPLAIN untuk query utama aplikasi agar dipastikan memakai index tersebut.
+"""
+
+import json
+import sys
+import os
+from sqlalchemy import cast, func, select, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+# Tambahkan path aplikasi
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import engine
+from app.core.config import settings
+from app.models import Experiment, Submission
+from app.crud.submission import keyset_window
+from app.crud.spatial import bbox_filter
+from app.crud.experiment import search_document
+
+EXPECTED_INDEXES = [
+    "ix_submissions_experiment_id_timestamp",
+    "ix_submissions_user_id_timestamp",
+    "ix_submissions_experiment_id_geohash",
+    "ix_experiments_created_by_created_at",
+    "ix_experiments_deadline",
+    "ix_experiments_search",
+]
+JSONB_COLUMNS = [("submissions", "data_json"), ("experiments", "input_fields")]
+GIN_INDEX = "ix_submissions_data_json_gin"
+
+def plan_indexes(plan):
+    """Kumpulkan nama index dan node Seq Scan dari pohon EXPLAIN (FORMAT JSON)"""
+    indexes, seq_scans = set(), []
+    if plan.get("Index Name"):
+        indexes.add(plan["Index Name"])
+    if plan.get("Node Type") == "Seq Scan":
+        seq_scans.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        child_indexes, child_seq_scans = plan_indexes(child)
+        indexes |= child_indexes
+        seq_scans += child_seq_scans
+    return indexes, seq_scans
+
+def explain(conn, statement, force_index=False):
+    compiled = statement.compile(dialect=conn.dialect)
+    try:
+        if force_index:
+            conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        result = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params).scalar()
+    finally:
+        # SET LOCAL hanya berlaku sampai transaksi ini selesai
+        conn.rollback()
+    return plan_indexes(result[0]["Plan"])
+
+def check_query(conn, label, statement, expected_index):
+    """
+    Query lolos jika planner memilih index yang diharapkan. Pada tabel kecil planner wajar memilih
+    Seq Scan, jadi dicek ulang dengan enable_seqscan=off untuk memastikan index memang bisa dipakai.
+    """
+    indexes, seq_scans = explain(conn, statement)
+    if expected_index in indexes:
+        print(f"✅ {label}: memakai {expected_index}")
+        return True
+    forced_indexes, _ = explain(conn, statement, force_index=True)
+    if expected_index in forced_indexes:
+        print(f"⚠️  {label}: planner memilih {', '.join(seq_scans) or 'plan lain'} (tabel kecil?), index {expected_index} dapat dipakai")
+        return True
+    print(f"❌ {label}: index {expected_index} tidak dipakai (plan: {sorted(indexes) or seq_scans})")
+    return False
+
+def main():
+    print("🔍 Memverifikasi migrasi database...")
+    print("=" * 50)
+    ok = True
+
+    with engine.connect() as conn:
+        print("\n📜 Versi migrasi:")
+        versions = [row[0] for row in conn.execute(text("SELECT version FROM schema_migrations ORDER BY version"))]
+        print(f"   {', '.join(versions) or '(belum ada)'}")
+
+        print("\n🧬 Tipe kolom JSON:")
+        for table_name, column_name in JSONB_COLUMNS:
+            data_type = conn.execute(text("""
+                SELECT data_type FROM information_schema.columns
+                WHERE table_name = :table AND column_name = :column
+            """), {"table": table_name, "column": column_name}).scalar()
+            good = data_type == "jsonb"
+            ok = ok and good
+            print(f"{'✅' if good else '❌'} {table_name}.{column_name}: {data_type}")
+
+        print("\n🗂️  Index submissions & experiments:")
+        existing = {
+            row[0] for row in conn.execute(text("SELECT indexname FROM pg_indexes WHERE tablename IN ('submissions', 'experiments')"))
+        }
+        for name in EXPECTED_INDEXES:
+            ok = ok and name in existing
+            print(f"{'✅' if name in existing else '❌'} {name}")
+        has_gin = GIN_INDEX in existing
+        print(f"{'✅' if has_gin else '➖'} {GIN_INDEX} (opsional)")
+
+        print("\n⚡ EXPLAIN query utama:")
+        sample = conn.execute(select(Submission.experiment_id, Submission.user_id, Submission.data_json).limit(1)).first()
+        experiment_id, user_id, data_json = sample if sample else (1, 1, {})
+        probe = dict(list((data_json or {}).items())[:1]) or {"field": "value"}
+        hot_queries = [
+            (
+                "Listing submission per experiment",
+                keyset_window(select(Submission).where(Submission.experiment_id == experiment_id), None, 100),
+                "ix_submissions_experiment_id_timestamp",
+            ),
+            (
+                "Listing submission per user",
+                keyset_window(select(Submission).where(Submission.user_id == user_id), None, 100),
+                "ix_submissions_user_id_timestamp",
+            ),
+            (
+                "Jumlah submission per user",
+                select(func.count(Submission.id)).where(Submission.user_id == user_id),
+                "ix_submissions_user_id_timestamp",
+            ),
+            (
+                "Timeline submission per experiment",
+                select(func.date_trunc("day", Submission.timestamp), func.count(Submission.id))
+                .where(Submission.experiment_id == experiment_id)
+                .group_by(func.date_trunc("day", Submission.timestamp)),
+                "ix_submissions_experiment_id_timestamp",
+            ),
+            (
+                "Daftar experiment per pemilik",
+                select(Experiment.id).where(Experiment.created_by == user_id).order_by(Experiment.created_at.desc()).limit(100),
+                "ix_experiments_created_by_created_at",
+            ),
+            (
+                "Experiment yang sudah kedaluwarsa",
+                select(Experiment.id).where(Experiment.deadline <= func.now()),
+                "ix_experiments_deadline",
+            ),
+            (
+                "Pencarian full-text experiment",
+                select(Experiment.id).where(search_document().op("@@")(func.to_tsquery(settings.SEARCH_TEXT_CONFIG, "eksperimen:*"))),
+                "ix_experiments_search",
+            ),
+            (
+                "Submission dalam bounding box",
+                select(Submission.id).where(
+                    Submission.experiment_id == experiment_id,
+                    *bbox_filter("geohash", (-6.3, 106.7, -6.1, 106.9)),
+                ),
+                "ix_submissions_experiment_id_geohash",
+            ),
+        ]
+        if has_gin:
+            hot_queries.append((
+                "Filter containment data_json",
+                select(Submission.id).where(Submission.data_json.op("@>")(cast(json.dumps(probe), JSONB))),
+                GIN_INDEX,
+            ))
+        for label, statement, expected_index in hot_queries:
+            ok = check_query(conn, label, statement, expected_index) and ok
+
+    print("\n" + "=" * 50)
+    if ok:
+        print("✅ Migrasi terverifikasi")
+        return 0
+    print("❌ Ada pemeriksaan yang gagal, jalankan ulang migrate_db.py")
+    return 1
+
+if __name__ == "__main__":
+    exit(main())
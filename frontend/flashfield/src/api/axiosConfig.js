@@ -53,4 +53,12 @@ apiClient.interceptors.response.use(
     }
 );
 
+// URL live feed (SSE): EventSource tidak bisa mengirim header, jadi token dikirim lewat query string
+export const liveFeedUrl = (path) => {
+    const url = new URL(path, apiClient.defaults.baseURL);
+    const token = localStorage.getItem('accessToken');
+    if (token) url.searchParams.set('token', token);
+    return url.toString();
+};
+
 export default apiClient;
@@ -1,12 +1,24 @@
 import { Link } from 'react-router-dom';
 
+// Render teks hasil pencarian server: bagian di dalam <mark>…</mark> ditandai sebagai elemen React
+// (bukan innerHTML), sehingga judul/deskripsi buatan user tetap aman ditampilkan.
+const Highlighted = ({ text }) => text.split(/(<mark>.*?<\/mark>)/g).map((part, index) => (
+    part.startsWith('<mark>') && part.endsWith('</mark>')
+        ? <mark key={index} className="bg-cyan/20 text-cyan rounded px-0.5">{part.slice(6, -7)}</mark>
+        : part
+));
+
 const ExperimentCard = ({ experiment }) => {
     return (
         <div className="card-bg rounded-lg overflow-hidden flex flex-col h-full hover:shadow-cyan-500/20 shadow-lg">
             <div className="p-6 flex-grow">
                 <p className="text-sm text-cyan mb-2">Oleh: {experiment.owner?.full_name || 'Peneliti'}</p>
-                <h3 className="text-xl font-bold text-lightest-slate mb-3">{experiment.title}</h3>
-                <p className="text-slate text-sm line-clamp-3">{experiment.description}</p>
+                <h3 className="text-xl font-bold text-lightest-slate mb-3">
+                    {experiment.title_highlight ? <Highlighted text={experiment.title_highlight} /> : experiment.title}
+                </h3>
+                <p className="text-slate text-sm line-clamp-3">
+                    {experiment.description_highlight ? <Highlighted text={experiment.description_highlight} /> : experiment.description}
+                </p>
             </div>
             <div className="p-6 border-t border-navy/50 mt-auto">
                 <Link to={`/experiments/${experiment.id}`} className="text-sm font-bold text-cyan hover:underline">
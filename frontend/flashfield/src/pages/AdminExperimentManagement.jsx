@@ -63,7 +63,7 @@ const ExperimentRow = ({ experiment, onDelete }) => {
                 <p className="text-xs text-slate">oleh {experiment.owner?.full_name || 'Pengguna Dihapus'}</p>
             </td>
             <td className="px-6 py-4 whitespace-nowrap text-sm text-slate">{formatDate(experiment.created_at)}</td>
-            <td className="px-6 py-4 whitespace-nowrap text-sm text-cyan text-center">{experiment.submissions?.length || 0}</td>
+            <td className="px-6 py-4 whitespace-nowrap text-sm text-cyan text-center">{experiment.submission_count || 0}</td>
             <td className="px-6 py-4 whitespace-nowrap text-right text-sm font-medium">
                 <div className="flex items-center justify-end space-x-2">
                     <Link to={`/admin/experiments/${experiment.id}/manage`} className="p-2 rounded-md hover:bg-cyan/10 text-cyan transition-colors" title="Kelola Submisi">
@@ -78,15 +78,28 @@ const ExperimentRow = ({ experiment, onDelete }) => {
     );
 };
 
+// Ambil semua experiment yang cocok dengan filter, per halaman
+const fetchAllExperiments = async (params) => {
+    const pageSize = 100;
+    const experiments = [];
+    for (let skip = 0; ; skip += pageSize) {
+        const response = await apiClient.get('/experiments/', { params: { ...params, skip, limit: pageSize } });
+        experiments.push(...response.data);
+        if (response.data.length < pageSize) return experiments;
+    }
+};
+
 function AdminExperimentManagement() {
     const { user: currentUser, loading: authLoading } = useAuth();
-    const [allExperiments, setAllExperiments] = useState([]);
+    const [owners, setOwners] = useState([]);
+    const [recentExperiments, setRecentExperiments] = useState([]);
+    const [ownerExperiments, setOwnerExperiments] = useState({});
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState('');
     const [expandedResearcher, setExpandedResearcher] = useState(null);
     const [searchQuery, setSearchQuery] = useState('');
     const [isSearching, setIsSearching] = useState(false);
-    const [filteredResearchers, setFilteredResearchers] = useState({});
+    const [filteredResearchers, setFilteredResearchers] = useState([]);
 
     // Double-check: Pastikan user adalah admin
     useEffect(() => {
@@ -95,12 +108,18 @@ function AdminExperimentManagement() {
         }
     }, [currentUser, authLoading]);
 
-    const fetchAllExperiments = async () => {
+    // Ringkasan per peneliti dan 10 eksperimen terbaru dihitung di server
+    const fetchOverview = async () => {
         setLoading(true);
         setError('');
         try {
-            const response = await apiClient.get('/experiments/');
-            setAllExperiments(response.data);
+            const [ownersRes, recentRes] = await Promise.all([
+                apiClient.get('/experiments/by-owner'),
+                apiClient.get('/experiments/', { params: { limit: 10 } }),
+            ]);
+            setOwners(ownersRes.data);
+            setRecentExperiments(recentRes.data);
+            setOwnerExperiments({});
         } catch (err) {
             setError("Gagal memuat data eksperimen.");
         } finally {
@@ -109,55 +128,52 @@ function AdminExperimentManagement() {
     };
 
     useEffect(() => {
-        fetchAllExperiments();
+        fetchOverview();
     }, []);
 
+    const loadOwnerExperiments = async (ownerId) => {
+        try {
+            const experiments = await fetchAllExperiments({ created_by: ownerId });
+            setOwnerExperiments(prev => ({ ...prev, [ownerId]: experiments }));
+        } catch (err) {
+            setOwnerExperiments(prev => ({ ...prev, [ownerId]: [] }));
+        }
+    };
+
     const handleDeleteExperiment = async (experimentId, experimentTitle) => {
         if (window.confirm(`ADMIN: Apakah Anda yakin ingin menghapus eksperimen "${experimentTitle}"?`)) {
             try {
                 await apiClient.delete(`/experiments/${experimentId}`);
-                fetchAllExperiments();
+                await fetchOverview();
+                if (expandedResearcher !== null) loadOwnerExperiments(expandedResearcher);
             } catch (err) {
                 alert('Gagal menghapus eksperimen.');
             }
         }
     };
 
-    const { recentExperiments, groupedByResearcher, researcherCount } = useMemo(() => {
-        const recent = [...allExperiments].sort((a, b) => new Date(b.created_at) - new Date(a.created_at)).slice(0, 10);
-        const grouped = allExperiments.reduce((acc, exp) => {
-            const ownerName = exp.owner?.full_name || 'Pengguna Tidak Diketahui';
-            if (!acc[ownerName]) acc[ownerName] = [];
-            acc[ownerName].push(exp);
-            return acc;
-        }, {});
-        
-        return {
-            recentExperiments: recent,
-            groupedByResearcher: grouped,
-            researcherCount: Object.keys(grouped).filter(name => name !== 'Pengguna Tidak Diketahui').length,
-        };
-    }, [allExperiments]);
+    const totalExperiments = useMemo(() => owners.reduce((sum, owner) => sum + owner.experiment_count, 0), [owners]);
 
     useEffect(() => {
         setIsSearching(true);
         const debounce = setTimeout(() => {
-            const filtered = Object.entries(groupedByResearcher).filter(([researcherName]) =>
-                researcherName.toLowerCase().includes(searchQuery.toLowerCase())
-            );
-            setFilteredResearchers(Object.fromEntries(filtered));
+            setFilteredResearchers(owners.filter(owner =>
+                owner.full_name.toLowerCase().includes(searchQuery.toLowerCase())
+            ));
             setIsSearching(false);
         }, 300);
 
         return () => clearTimeout(debounce);
-    }, [searchQuery, groupedByResearcher]);
+    }, [searchQuery, owners]);
     
-    const toggleResearcher = (researcherName) => {
-        setExpandedResearcher(prev => (prev === researcherName ? null : researcherName));
+    const toggleResearcher = (ownerId) => {
+        const expanding = expandedResearcher !== ownerId;
+        setExpandedResearcher(expanding ? ownerId : null);
+        if (expanding && !ownerExperiments[ownerId]) loadOwnerExperiments(ownerId);
     };
 
     if (loading) return <LoadingSkeleton />;
-    if (error) return <ErrorMessage message={error} onRetry={fetchAllExperiments} />;
+    if (error) return <ErrorMessage message={error} onRetry={fetchOverview} />;
 
     return (
         <div className="max-w-7xl mx-auto py-12 px-4 sm:px-6 lg:px-8 space-y-12">
@@ -167,8 +183,8 @@ function AdminExperimentManagement() {
             </div>
 
             <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
-                <StatCard title="Total Peneliti Terdaftar" value={researcherCount} icon={<svg className="h-6 w-6 text-cyan" xmlns="http://www.w3.org/2000/svg" fill="none" viewBox="0 0 24 24" stroke="currentColor"><path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M21 13.255A23.931 23.931 0 0112 15c-3.183 0-6.22-.62-9-1.745M16 6V4a2 2 0 00-2-2h-4a2 2 0 00-2 2v2m4 6h.01M5 20h14a2 2 0 002-2V8a2 2 0 00-2-2H5a2 2 0 00-2 2v10a2 2 0 002 2z" /></svg>} />
-                <StatCard title="Total Eksperimen" value={allExperiments.length} icon={<svg className="h-6 w-6 text-cyan" xmlns="http://www.w3.org/2000/svg" fill="none" viewBox="0 0 24 24" stroke="currentColor"><path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M19.428 15.428a2 2 0 00-1.022-.547l-2.387-.477a6 6 0 00-3.86.517l-.318.158a6 6 0 01-3.86.517L6.05 15.21a2 2 0 00-1.806.547M8 4h8l-1 1v5.172a2 2 0 00.586 1.414l5 5c1.26 1.26.367 3.414-1.415 3.414H4.828c-1.782 0-2.674-2.154-1.414-3.414l5-5A2 2 0 009 10.172V5L8 4z" /></svg>} />
+                <StatCard title="Total Peneliti Terdaftar" value={owners.length} icon={<svg className="h-6 w-6 text-cyan" xmlns="http://www.w3.org/2000/svg" fill="none" viewBox="0 0 24 24" stroke="currentColor"><path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M21 13.255A23.931 23.931 0 0112 15c-3.183 0-6.22-.62-9-1.745M16 6V4a2 2 0 00-2-2h-4a2 2 0 00-2 2v2m4 6h.01M5 20h14a2 2 0 002-2V8a2 2 0 00-2-2H5a2 2 0 00-2 2v10a2 2 0 002 2z" /></svg>} />
+                <StatCard title="Total Eksperimen" value={totalExperiments} icon={<svg className="h-6 w-6 text-cyan" xmlns="http://www.w3.org/2000/svg" fill="none" viewBox="0 0 24 24" stroke="currentColor"><path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M19.428 15.428a2 2 0 00-1.022-.547l-2.387-.477a6 6 0 00-3.86.517l-.318.158a6 6 0 01-3.86.517L6.05 15.21a2 2 0 00-1.806.547M8 4h8l-1 1v5.172a2 2 0 00.586 1.414l5 5c1.26 1.26.367 3.414-1.415 3.414H4.828c-1.782 0-2.674-2.154-1.414-3.414l5-5A2 2 0 009 10.172V5L8 4z" /></svg>} />
             </div>
             
             <div className="bg-light-navy rounded-lg shadow-lg">
@@ -194,23 +210,25 @@ function AdminExperimentManagement() {
 
                 <div className="space-y-2">
                     {isSearching ? <div className="text-center py-10"><div className="animate-spin rounded-full h-8 w-8 border-b-2 border-cyan-500 mx-auto"></div></div> :
-                    Object.keys(filteredResearchers).length > 0 ? (
-                        Object.entries(filteredResearchers).map(([researcherName, experiments]) => (
-                            <div key={researcherName} className="bg-light-navy rounded-lg overflow-hidden">
-                                <button onClick={() => toggleResearcher(researcherName)} className="w-full flex justify-between items-center p-4 text-left hover:bg-navy/50 transition-colors">
-                                    <span className="font-bold text-lightest-slate">{researcherName} <span className="text-sm font-normal text-slate">({experiments.length} eksperimen)</span></span>
-                                    <svg className={`w-5 h-5 text-slate transform transition-transform ${expandedResearcher === researcherName ? 'rotate-180' : ''}`} xmlns="http://www.w3.org/2000/svg" fill="none" viewBox="0 0 24 24" stroke="currentColor"><path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M19 9l-7 7-7-7" /></svg>
+                    filteredResearchers.length > 0 ? (
+                        filteredResearchers.map(owner => (
+                            <div key={owner.owner_id} className="bg-light-navy rounded-lg overflow-hidden">
+                                <button onClick={() => toggleResearcher(owner.owner_id)} className="w-full flex justify-between items-center p-4 text-left hover:bg-navy/50 transition-colors">
+                                    <span className="font-bold text-lightest-slate">{owner.full_name} <span className="text-sm font-normal text-slate">({owner.experiment_count} eksperimen, {owner.active_count} aktif, {owner.submission_count} submisi)</span></span>
+                                    <svg className={`w-5 h-5 text-slate transform transition-transform ${expandedResearcher === owner.owner_id ? 'rotate-180' : ''}`} xmlns="http://www.w3.org/2000/svg" fill="none" viewBox="0 0 24 24" stroke="currentColor"><path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M19 9l-7 7-7-7" /></svg>
                                 </button>
-                                {expandedResearcher === researcherName && (
+                                {expandedResearcher === owner.owner_id && (!ownerExperiments[owner.owner_id] ? (
+                                    <div className="py-6 border-t border-navy"><div className="animate-spin rounded-full h-6 w-6 border-b-2 border-cyan-500 mx-auto"></div></div>
+                                ) : (
                                     <div className="overflow-x-auto border-t border-navy">
                                         <table className="min-w-full">
                                             <thead className="bg-navy/70"><tr className="border-b border-navy"><th className="px-6 py-2 text-left text-xs font-medium text-slate uppercase">Judul</th><th className="px-6 py-2 text-left text-xs font-medium text-slate uppercase">Dibuat</th><th className="px-6 py-2 text-center text-xs font-medium text-slate uppercase">Submisi</th><th className="px-6 py-2 text-right text-xs font-medium text-slate uppercase">Aksi</th></tr></thead>
                                             <tbody className="divide-y divide-navy">
-                                                {experiments.map(exp => <ExperimentRow key={`grouped-${exp.id}`} experiment={exp} onDelete={handleDeleteExperiment} />)}
+                                                {ownerExperiments[owner.owner_id].map(exp => <ExperimentRow key={`grouped-${exp.id}`} experiment={exp} onDelete={handleDeleteExperiment} />)}
                                             </tbody>
                                         </table>
                                     </div>
-                                )}
+                                ))}
                             </div>
                         ))
                     ) : (
@@ -135,102 +135,20 @@ function AdminStatsAndHeatmapPage() {
             setLoading(true);
             setError('');
             try {
-                const [usersRes, expRes] = await Promise.all([
-                    apiClient.get('/users/'),
-                    apiClient.get('/experiments/'),
+                // Semua agregat dihitung di server; halaman ini tidak lagi mengunduh data mentah
+                const [overviewRes, heatmapRes] = await Promise.all([
+                    apiClient.get('/stats/overview'),
+                    apiClient.get('/stats/heatmap?zoom=5'),
                 ]);
-
-                const manageableUsers = usersRes.data.filter(user => user.role !== 'admin');
-                const allExperiments = expRes.data;
-                const submissionPromises = allExperiments.map(exp => apiClient.get(`/experiments/${exp.id}/submissions`));
-                const submissionResponses = await Promise.all(submissionPromises);
-                const allSubmissions = submissionResponses.flatMap((res, index) => 
-                    res.data.map(sub => ({...sub, experiment_id: allExperiments[index].id, experiment_title: allExperiments[index].title}))
-                );
-
-                const submissionsByDate = allSubmissions.reduce((acc, sub) => {
-                    const date = new Date(sub.timestamp).toISOString().split('T')[0];
-                    acc[date] = (acc[date] || 0) + 1;
-                    return acc;
-                }, {});
-                const sortedDates = Object.keys(submissionsByDate).sort();
-            
-                const rolesCount = manageableUsers.reduce((acc, user) => {
-                    acc[user.role] = (acc[user.role] || 0) + 1;
-                    return acc;
-                }, {});
-
-                const researcherStats = manageableUsers
-                    .filter(user => user.role === 'researcher')
-                    .map(researcher => {
-                        const experiments = allExperiments.filter(exp => exp.owner?.id === researcher.id);
-                        const totalSubmissions = allSubmissions.filter(sub => 
-                            experiments.some(exp => exp.id === sub.experiment_id)
-                        ).length;
-                        return {
-                            name: researcher.full_name,
-                            detail: `${experiments.length} eksperimen`,
-                            value: experiments.length,
-                            submissions: totalSubmissions
-                        };
-                    })
-                    .sort((a, b) => b.value - a.value);
-
-                const experimentStats = allExperiments.map(exp => {
-                    const submissions = allSubmissions.filter(sub => sub.experiment_id === exp.id);
-                    return {
-                        name: exp.title,
-                        detail: `oleh ${exp.owner?.full_name || 'Unknown'}`,
-                        value: submissions.length,
-                        created: new Date(exp.created_at)
-                    };
-                }).sort((a, b) => b.value - a.value);
-
-                const volunteerStats = manageableUsers
-                    .filter(user => user.role === 'volunteer')
-                    .map(volunteer => {
-                        const contributions = allSubmissions.filter(sub => sub.user_id === volunteer.id);
-                        const uniqueExperiments = [...new Set(contributions.map(sub => sub.experiment_id))];
-                        return {
-                            name: volunteer.full_name,
-                            detail: `${uniqueExperiments.length} eksperimen berbeda`,
-                            value: contributions.length,
-                            experiments: uniqueExperiments.length
-                        };
-                    })
-                    .sort((a, b) => b.value - a.value);
-
-                const now = new Date();
-                const last30Days = new Date(now.getTime() - 30 * 24 * 60 * 60 * 1000);
-                const last7Days = new Date(now.getTime() - 7 * 24 * 60 * 60 * 1000);
-                
-                const recentSubmissions = allSubmissions.filter(sub => new Date(sub.timestamp) >= last30Days);
-                const veryRecentSubmissions = allSubmissions.filter(sub => new Date(sub.timestamp) >= last7Days);
-                
-                const activeExperiments = allExperiments.filter(exp => {
-                    const hasRecentSubmissions = allSubmissions.some(sub => 
-                        sub.experiment_id === exp.id && new Date(sub.timestamp) >= last7Days
-                    );
-                    const notExpired = !exp.deadline || new Date(exp.deadline) > now;
-                    return hasRecentSubmissions && notExpired;
-                });
-
-                const previous7Days = new Date(now.getTime() - 14 * 24 * 60 * 60 * 1000);
-                const previousWeekSubmissions = allSubmissions.filter(sub => {
-                    const date = new Date(sub.timestamp);
-                    return date >= previous7Days && date < last7Days;
-                });
-
-                const submissionTrend = previousWeekSubmissions.length > 0 
-                    ? Math.round(((veryRecentSubmissions.length - previousWeekSubmissions.length) / previousWeekSubmissions.length) * 100)
-                    : veryRecentSubmissions.length > 0 ? 100 : 0;
+                const overview = overviewRes.data;
+                const sortedDates = overview.submissions_by_date.map(item => item.bucket);
 
                 setChartData({
                     submissionsOverTime: {
                         labels: sortedDates,
                         datasets: [{
                             label: 'Jumlah Submisi per Hari',
-                            data: sortedDates.map(date => submissionsByDate[date]),
+                            data: overview.submissions_by_date.map(item => item.count),
                             fill: true,
                             borderColor: '#64ffda',
                             backgroundColor: 'rgba(100, 255, 218, 0.2)',
@@ -238,9 +156,9 @@ function AdminStatsAndHeatmapPage() {
                         }],
                     },
                     userRoles: {
-                        labels: Object.keys(rolesCount),
+                        labels: Object.keys(overview.roles),
                         datasets: [{
-                            data: Object.values(rolesCount),
+                            data: Object.values(overview.roles),
                             backgroundColor: ['#38bdf8', '#34d399'],
                             borderColor: '#112240',
                             borderWidth: 2,
@@ -249,24 +167,39 @@ function AdminStatsAndHeatmapPage() {
                 });
 
                 setInsights({
-                    topResearchers: researcherStats,
-                    topExperiments: experimentStats,
-                    topVolunteers: volunteerStats,
+                    topResearchers: overview.top_researchers.map(researcher => ({
+                        name: researcher.name,
+                        detail: `${researcher.experiments} eksperimen`,
+                        value: researcher.experiments,
+                        submissions: researcher.submissions
+                    })),
+                    topExperiments: overview.top_experiments.map(exp => ({
+                        name: exp.title,
+                        detail: `oleh ${exp.owner_name || 'Unknown'}`,
+                        value: exp.submissions
+                    })),
+                    topVolunteers: overview.top_volunteers.map(volunteer => ({
+                        name: volunteer.name,
+                        detail: `${volunteer.experiments} eksperimen berbeda`,
+                        value: volunteer.submissions,
+                        experiments: volunteer.experiments
+                    })),
                     generalStats: {
-                        totalSubmissions: allSubmissions.length,
-                        totalExperiments: allExperiments.length,
-                        totalUsers: manageableUsers.length,
-                        activeExperiments: activeExperiments.length,
-                        recentSubmissions: recentSubmissions.length,
-                        avgSubmissionsPerExperiment: Math.round(allSubmissions.length / Math.max(allExperiments.length, 1))
+                        totalSubmissions: overview.total_submissions,
+                        totalExperiments: overview.total_experiments,
+                        totalUsers: overview.total_users,
+                        activeExperiments: overview.active_experiments,
+                        recentSubmissions: overview.recent_submissions,
+                        avgSubmissionsPerExperiment: overview.avg_submissions_per_experiment
                     },
                     trends: {
-                        submissionTrend
+                        submissionTrend: overview.submission_trend
                     }
                 });
-                
-                const points = allSubmissions.filter(sub => sub.geo_lat && sub.geo_lng).map(sub => [sub.geo_lat, sub.geo_lng, 1]);
-                setSubmissionPoints(points);
+
+                // Titik heatmap sudah diagregasi per sel grid oleh server
+                const { points, max_weight } = heatmapRes.data;
+                setSubmissionPoints(points.map(([lat, lng, weight]) => [lat, lng, weight / Math.max(max_weight, 1)]));
 
             } catch (err) {
                 setError("Gagal memuat data. Periksa koneksi atau endpoint API.");
@@ -99,6 +99,10 @@ function Experiments() {
     const [currentPage, setCurrentPage] = useState(1);
     const [itemsPerPage] = useState(9);
     const [totalExperiments, setTotalExperiments] = useState(0);
+    const [searchInput, setSearchInput] = useState('');
+    const [searchQuery, setSearchQuery] = useState('');
+    const [searchResults, setSearchResults] = useState(null);
+    const [searching, setSearching] = useState(false);
 
     useEffect(() => {
         if (!authLoading && user) {
@@ -136,10 +140,37 @@ function Experiments() {
         fetchAllExperiments();
     }, []);
 
-    const totalPages = Math.ceil(totalExperiments / itemsPerPage);
+    // Query baru dikirim setelah user berhenti mengetik sebentar
+    useEffect(() => {
+        const timer = setTimeout(() => {
+            setSearchQuery(searchInput.trim());
+            setCurrentPage(1);
+        }, 300);
+        return () => clearTimeout(timer);
+    }, [searchInput]);
+
+    // Pencarian dan paginasinya dijalankan di server, hasil terurut relevansi
+    useEffect(() => {
+        if (!searchQuery) {
+            setSearchResults(null);
+            return;
+        }
+        let cancelled = false;
+        setSearching(true);
+        axios.get('http://127.0.0.1:8000/experiments/search', {
+            params: { q: searchQuery, skip: (currentPage - 1) * itemsPerPage, limit: itemsPerPage },
+        })
+            .then(response => { if (!cancelled) setSearchResults(response.data); })
+            .catch(() => { if (!cancelled) setSearchResults({ items: [], total: 0 }); })
+            .finally(() => { if (!cancelled) setSearching(false); });
+        return () => { cancelled = true; };
+    }, [searchQuery, currentPage, itemsPerPage]);
+
+    const totalItems = searchResults ? searchResults.total : totalExperiments;
+    const totalPages = Math.ceil(totalItems / itemsPerPage);
     const startIndex = (currentPage - 1) * itemsPerPage;
     const endIndex = startIndex + itemsPerPage;
-    const currentExperiments = experiments.slice(startIndex, endIndex);
+    const currentExperiments = searchResults ? searchResults.items : (searchQuery ? [] : experiments.slice(startIndex, endIndex));
     const handlePageChange = (page) => {
         setCurrentPage(page);
         window.scrollTo({ top: 0, behavior: 'smooth' });
@@ -152,6 +183,13 @@ function Experiments() {
                     <h1 className="text-4xl font-extrabold text-lightest-slate">Jelajahi Semua Eksperimen</h1>
                     <p className="mt-2 text-lg text-slate">Temukan riset yang menarik dan mulailah berkontribusi hari ini.</p>
                 </div>
+                <input
+                    type="search"
+                    value={searchInput}
+                    onChange={(e) => setSearchInput(e.target.value)}
+                    placeholder="Cari judul, deskripsi, atau field..."
+                    className="w-full md:w-80 px-4 py-2 rounded-md bg-light-navy text-lightest-slate placeholder-slate border border-navy/50 focus:outline-none focus:border-cyan"
+                />
             </div>
 
             {loading && <p className="text-center text-cyan text-lg">Memuat semua eksperimen...</p>}
@@ -168,12 +206,18 @@ function Experiments() {
                         currentPage={currentPage}
                         totalPages={totalPages}
                         onPageChange={handlePageChange}
-                        totalItems={totalExperiments}
+                        totalItems={totalItems}
                         itemsPerPage={itemsPerPage}
                     />
                 </>
             )}
-             {!loading && !error && experiments.length === 0 && (
+            {searching && !searchResults && <p className="text-center text-cyan text-lg">Mencari eksperimen...</p>}
+            {!loading && !error && searchResults && searchResults.total === 0 && (
+                <div className="text-center text-slate mt-16">
+                    <p className="text-2xl mb-2">Tidak ada eksperimen yang cocok dengan "{searchQuery}".</p>
+                </div>
+            )}
+             {!loading && !error && !searchQuery && experiments.length === 0 && (
                 <div className="text-center text-slate mt-16">
                     <p className="text-2xl mb-2">Belum ada eksperimen yang tersedia.</p>
                     {userRole !== 'volunteer' && <p>Jadilah yang pertama untuk membuatnya!</p>}
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Link } from 'react-router-dom';
 import apiClient from '../api/axiosConfig';
 import { useAuth } from '../context/AuthContext';
@@ -181,19 +181,28 @@ function Kontribusi() {
     const [totalPages, setTotalPages] = useState(1);
     const [totalSubmissions, setTotalSubmissions] = useState(0);
     const itemsPerPage = 10;
+    // Cursor awal setiap halaman yang sudah diketahui (pagination keyset dari server)
+    const pageCursors = useRef({ 1: null });
 
     const fetchDashboardData = async (page = 1) => {
         if (!user) { setLoading(false); return; }
         setLoading(true);
         setError('');
         try {
-            const skip = (page - 1) * itemsPerPage;
-            const submissionsResponse = await apiClient.get(`/users/me/submissions?skip=${skip}&limit=${itemsPerPage}`);
-            const subs = submissionsResponse.data;
+            // Lompat ke halaman yang cursornya belum diketahui: maju dari halaman terdekat yang sudah diketahui
+            let startPage = page;
+            while (!(startPage in pageCursors.current)) startPage -= 1;
+            let submissionsResponse;
+            for (let p = startPage; p <= page; p++) {
+                submissionsResponse = await apiClient.get('/users/me/submissions', {
+                    params: { limit: itemsPerPage, cursor: pageCursors.current[p] || undefined, include_total: p === page },
+                });
+                if (submissionsResponse.data.next_cursor) pageCursors.current[p + 1] = submissionsResponse.data.next_cursor;
+            }
+            const subs = submissionsResponse.data.items;
             setSubmissions(subs);
-        
-            const totalResponse = await apiClient.get('/users/me/submissions');
-            const totalCount = totalResponse.data.length;
+
+            const totalCount = submissionsResponse.data.total;
             setTotalSubmissions(totalCount);
             setTotalPages(Math.ceil(totalCount / itemsPerPage));
             
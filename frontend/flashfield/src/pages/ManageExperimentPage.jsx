@@ -1,6 +1,6 @@
-import React, { useState, useEffect, useCallback, useMemo } from 'react';
+import React, { useState, useEffect, useCallback, useMemo, useRef } from 'react';
 import { useParams, Link, useNavigate } from 'react-router-dom';
-import apiClient from '../api/axiosConfig';
+import apiClient, { liveFeedUrl } from '../api/axiosConfig';
 import { useAuth } from '../context/AuthContext';
 import { Bar } from 'react-chartjs-2';
 import {
@@ -105,48 +105,109 @@ const Pagination = ({ currentPage, totalPages, onPageChange, totalItems, itemsPe
     );
 };
 
-const StatsTab = ({ submissions, experiment }) => {
-    const analysis = useMemo(() => {
-        if (!submissions || submissions.length === 0 || !experiment?.input_fields) {
-            return [];
+// Terapkan delta rollup dari live feed ke hasil /stats/fields. Mengembalikan null jika delta
+// menyentuh field yang belum ada di statistik (perlu dimuat ulang dari server).
+const applyStatsDelta = (stats, rows) => {
+    const fields = stats.fields.map(field => ({
+        ...field,
+        number: field.number && { ...field.number },
+        categories: field.categories && { ...field.categories },
+    }));
+    let total = stats.total_submissions;
+    for (const row of rows) {
+        if (row.field_name === '') { total += row.count; continue; }
+        const field = fields.find(f => f.name === row.field_name);
+        if (!field) return null;
+        if (field.number && row.sum !== null) {
+            const number = field.number;
+            const count = number.count + row.count;
+            number.mean = ((number.mean || 0) * number.count + row.sum) / count;
+            number.min = number.count === 0 ? row.min : Math.min(number.min, row.min);
+            number.max = number.count === 0 ? row.max : Math.max(number.max, row.max);
+            number.count = count;
+        } else if (field.categories) {
+            field.categories[row.category] = (field.categories[row.category] || 0) + row.count;
+        } else {
+            return null;
         }
+    }
+    return { ...stats, total_submissions: total, fields };
+};
+
+// Berlangganan live feed submission satu experiment (Server-Sent Events)
+const useExperimentFeed = (experimentId, enabled, handlers) => {
+    const handlersRef = useRef(handlers);
+    handlersRef.current = handlers;
+
+    useEffect(() => {
+        if (!enabled || !experimentId || typeof EventSource === 'undefined') return;
+        const source = new EventSource(liveFeedUrl(`/experiments/${experimentId}/live`));
+        let reconnecting = false;
+        source.addEventListener('submissions', (event) => handlersRef.current.onSubmissions(JSON.parse(event.data).items));
+        source.addEventListener('stats', (event) => handlersRef.current.onStats(JSON.parse(event.data).rows));
+        source.addEventListener('lagged', () => handlersRef.current.onResync());
+        // Event selama koneksi terputus tidak dikirim ulang, jadi muat ulang data setelah tersambung kembali
+        source.onerror = () => { reconnecting = true; };
+        source.onopen = () => {
+            if (reconnecting) handlersRef.current.onResync();
+            reconnecting = false;
+        };
+        return () => source.close();
+    }, [experimentId, enabled]);
+};
 
-        return experiment.input_fields.map(field => {
-            if (field.type === 'number') {
-                const values = submissions.map(s => parseFloat(s.data_json[field.name])).filter(v => !isNaN(v));
-                if (values.length === 0) return null;
+const StatsTab = ({ experimentId, liveStats }) => {
+    const [stats, setStats] = useState(null);
+    const statsRef = useRef(null);
+    statsRef.current = stats;
+
+    // Statistik dihitung di server dari seluruh submisi, bukan hanya halaman yang sedang dimuat
+    const fetchStats = useCallback(() => {
+        apiClient.get('/stats/fields', { params: { exp_id: experimentId } })
+            .then(res => setStats(res.data))
+            .catch(() => setStats({ total_submissions: 0, fields: [] }));
+    }, [experimentId]);
+
+    useEffect(() => { fetchStats(); }, [fetchStats]);
+
+    // Delta dari live feed diterapkan di klien; muat ulang hanya jika ada data yang terlewat
+    useEffect(() => {
+        if (!liveStats) return;
+        if (liveStats.reload) { fetchStats(); return; }
+        if (!statsRef.current) return;
+        const next = applyStatsDelta(statsRef.current, liveStats.rows);
+        if (next) setStats(next); else fetchStats();
+    }, [liveStats, fetchStats]);
+
+    const analysis = useMemo(() => {
+        if (!stats) return [];
+        return stats.fields.map(field => {
+            if (field.number) {
+                if (field.number.count === 0) return null;
                 return {
                     type: 'numeric',
                     label: field.label, unit: field.unit || '',
-                    avg: (values.reduce((a, b) => a + b, 0) / values.length).toFixed(2),
-                    min: Math.min(...values), max: Math.max(...values),
+                    avg: field.number.mean.toFixed(2),
+                    min: field.number.min, max: field.number.max,
                 };
             }
-            if (['select', 'radio', 'checkbox'].includes(field.type)) {
-                const counts = submissions.reduce((acc, s) => {
-                    const value = s.data_json[field.name];
-                    if (Array.isArray(value)) {
-                        value.forEach(item => acc[item] = (acc[item] || 0) + 1);
-                    } else if (value) { 
-                        acc[value] = (acc[value] || 0) + 1;
-                    }
-                    return acc;
-                }, {});
-                if (Object.keys(counts).length === 0) return null;
-                return {
-                    type: 'categorical',
-                    label: `Distribusi Jawaban: "${field.label}"`,
-                    chartData: {
-                        labels: Object.keys(counts),
-                        datasets: [{ data: Object.values(counts), backgroundColor: 'rgba(100, 255, 218, 0.6)', borderColor: '#64ffda' }],
-                    }
-                };
-            }
-            return null;
-        }).filter(Boolean); 
-    }, [submissions, experiment]);
+            const counts = field.categories || {};
+            if (Object.keys(counts).length === 0) return null;
+            return {
+                type: 'categorical',
+                label: `Distribusi Jawaban: "${field.label}"`,
+                chartData: {
+                    labels: Object.keys(counts),
+                    datasets: [{ data: Object.values(counts), backgroundColor: 'rgba(100, 255, 218, 0.6)', borderColor: '#64ffda' }],
+                }
+            };
+        }).filter(Boolean);
+    }, [stats]);
 
-    if (submissions.length === 0) {
+    if (!stats) {
+        return <div className="p-6 bg-light-navy rounded-lg text-center text-slate">Memuat statistik...</div>;
+    }
+    if (stats.total_submissions === 0) {
         return <div className="p-6 bg-light-navy rounded-lg text-center text-slate">Belum ada data untuk dianalisis.</div>;
     }
     if (analysis.length === 0) {
@@ -193,6 +254,9 @@ function ManageExperimentPage() {
     const [currentPage, setCurrentPage] = useState(1);
     const [itemsPerPage] = useState(10);
     const [totalSubmissions, setTotalSubmissions] = useState(0);
+    const [liveStats, setLiveStats] = useState(null);
+    // Cursor awal setiap halaman yang sudah diketahui (pagination keyset dari server)
+    const pageCursors = useRef({ 1: null });
     const showNotification = (message, type = 'success') => {
         setNotification({ message, type });
         setTimeout(() => setNotification(null), 3000);
@@ -202,26 +266,25 @@ function ManageExperimentPage() {
         if (!user || !experimentId) return;
         setLoading(true); setError('');
         try {
-            const [expRes, subRes] = await Promise.all([
-                apiClient.get(`/experiments/${experimentId}`),
-                apiClient.get(`/experiments/${experimentId}/submissions?skip=${(page - 1) * itemsPerPage}&limit=${itemsPerPage}`),
-            ]);
+            const expRes = await apiClient.get(`/experiments/${experimentId}`);
             if (expRes.data.owner?.id !== user.id && user.role !== 'admin') {
                 setError("Anda tidak memiliki izin untuk mengelola eksperimen ini."); return;
             }
-            setExperiment(expRes.data);
-            setSubmissions(subRes.data);
-            
-            if (subRes.data.length < itemsPerPage && page === 1) {
-                setTotalSubmissions(subRes.data.length);
-            } else {
-                try {
-                    const countRes = await apiClient.get(`/experiments/${experimentId}/submissions`);
-                    setTotalSubmissions(countRes.data.length);
-                } catch {
-                    setTotalSubmissions(page * itemsPerPage + (subRes.data.length === itemsPerPage ? itemsPerPage : 0));
-                }
+
+            // Lompat ke halaman yang cursornya belum diketahui: maju dari halaman terdekat yang sudah diketahui
+            let startPage = page;
+            while (!(startPage in pageCursors.current)) startPage -= 1;
+            let subRes;
+            for (let p = startPage; p <= page; p++) {
+                subRes = await apiClient.get(`/experiments/${experimentId}/submissions`, {
+                    params: { limit: itemsPerPage, cursor: pageCursors.current[p] || undefined, include_total: p === page },
+                });
+                if (subRes.data.next_cursor) pageCursors.current[p + 1] = subRes.data.next_cursor;
             }
+
+            setExperiment(expRes.data);
+            setSubmissions(subRes.data.items);
+            setTotalSubmissions(subRes.data.total);
         } catch (err) {
             setError("Gagal memuat data. Pastikan ID eksperimen benar.");
         } finally {
@@ -233,6 +296,25 @@ function ManageExperimentPage() {
         if (!authLoading && experimentId) { fetchData(currentPage); }
     }, [authLoading, experimentId, fetchData, currentPage]);
 
+    // Submisi baru masuk lewat live feed, tanpa memuat ulang seluruh daftar
+    useExperimentFeed(experimentId, Boolean(experiment), {
+        onSubmissions: (items) => {
+            setTotalSubmissions(total => (total || 0) + items.length);
+            if (currentPage !== 1) return;
+            setSubmissions(prev => [...items.slice().reverse(), ...prev].slice(0, itemsPerPage));
+            // Batas halaman bergeser; cursor halaman berikutnya dihitung ulang saat dibuka
+            pageCursors.current = { 1: null };
+        },
+        onStats: (rows) => setLiveStats({ rows }),
+        onResync: () => {
+            setLiveStats({ reload: true });
+            if (currentPage === 1) {
+                pageCursors.current = { 1: null };
+                fetchData(1);
+            }
+        },
+    });
+
     const handlePageChange = (page) => {
         setCurrentPage(page);
         setLoading(true);
@@ -321,30 +403,22 @@ Tindakan ini tidak dapat dibatalkan.`;
         }
     };
 
-    const handleExportCSV = () => {
-        if (submissions.length === 0) { alert("Tidak ada data untuk diekspor."); return; }
-        const headers = ['submission_id', 'user_id', 'timestamp', 'latitude', 'longitude', ...experiment.input_fields.map(f => f.name)];
-        let csvContent = headers.join(',') + '\n';
-        submissions.forEach(sub => {
-            const row = [sub.id, sub.user_id, `"${formatDate(sub.timestamp)}"`, sub.geo_lat || '', sub.geo_lng || ''];
-            experiment.input_fields.forEach(field => {
-                let value = sub.data_json[field.name];
-                if (value === undefined || value === null) value = '';
-                else if (Array.isArray(value)) value = `"${value.join('; ')}"`;
-                else if (typeof value === 'string' && value.includes(',')) value = `"${value}"`;
-                row.push(value);
-            });
-            csvContent += row.join(',') + '\n';
-        });
-        const blob = new Blob([csvContent], { type: 'text/csv;charset=utf-8;' });
-        const link = document.createElement("a");
-        const url = URL.createObjectURL(blob);
-        link.setAttribute("href", url);
-        link.setAttribute("download", `${experiment.title.replace(/\s+/g, '_')}_submissions.csv`);
-        link.style.visibility = 'hidden';
-        document.body.appendChild(link);
-        link.click();
-        document.body.removeChild(link);
+    const handleExportCSV = async () => {
+        // File dibentuk dan di-stream oleh server dari seluruh submisi, bukan hanya halaman yang dimuat
+        try {
+            const response = await apiClient.get(`/experiments/${experimentId}/export`, { params: { format: 'csv' }, responseType: 'blob' });
+            const link = document.createElement("a");
+            const url = URL.createObjectURL(response.data);
+            link.setAttribute("href", url);
+            link.setAttribute("download", `${experiment.title.replace(/\s+/g, '_')}_submissions.csv`);
+            link.style.visibility = 'hidden';
+            document.body.appendChild(link);
+            link.click();
+            document.body.removeChild(link);
+            URL.revokeObjectURL(url);
+        } catch (err) {
+            alert("Gagal mengekspor data.");
+        }
     };
 
     if (authLoading || loading) return <div className="max-w-7xl mx-auto py-12 px-4"><LoadingSkeleton /></div>;
@@ -387,7 +461,7 @@ Tindakan ini tidak dapat dibatalkan.`;
             </div>
             <div className="border-b border-navy/50 mb-8">
                 <nav className="-mb-px flex space-x-8" aria-label="Tabs">
-                    <button onClick={() => setActiveTab('submissions')} className={`${activeTab === 'submissions' ? 'border-cyan text-cyan' : 'border-transparent text-slate hover:text-light-slate'} whitespace-nowrap py-4 px-1 border-b-2 font-medium text-sm`}>Submisi ({submissions.length})</button>
+                    <button onClick={() => setActiveTab('submissions')} className={`${activeTab === 'submissions' ? 'border-cyan text-cyan' : 'border-transparent text-slate hover:text-light-slate'} whitespace-nowrap py-4 px-1 border-b-2 font-medium text-sm`}>Submisi ({totalSubmissions})</button>
                     <button onClick={() => setActiveTab('stats')} className={`${activeTab === 'stats' ? 'border-cyan text-cyan' : 'border-transparent text-slate hover:text-light-slate'} whitespace-nowrap py-4 px-1 border-b-2 font-medium text-sm`}>Statistik</button>
                     <button onClick={() => setActiveTab('settings')} className={`${activeTab === 'settings' ? 'border-cyan text-cyan' : 'border-transparent text-slate hover:text-light-slate'} whitespace-nowrap py-4 px-1 border-b-2 font-medium text-sm`}>Pengaturan</button>
                 </nav>
@@ -472,7 +546,7 @@ Tindakan ini tidak dapat dibatalkan.`;
                         />
                     </div>
                 )}
-                {activeTab === 'stats' && <StatsTab submissions={submissions} experiment={experiment} />}
+                {activeTab === 'stats' && <StatsTab experimentId={experimentId} liveStats={liveStats} />}
                 {activeTab === 'settings' && (
                     <div className="max-w-2xl">
                         <h3 className="text-xl font-bold text-lightest-slate">Pengaturan Eksperimen</h3>
@@ -104,6 +104,7 @@ function ManageExperimentPage() {
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState('');
     const [activeTab, setActiveTab] = useState('submissions');
+    const [nextCursor, setNextCursor] = useState(null);
 
     const fetchData = useCallback(async () => {
         if (!user || !experimentId) return;
@@ -112,7 +113,7 @@ function ManageExperimentPage() {
         try {
             const [expRes, subRes] = await Promise.all([
                 apiClient.get(`/experiments/${experimentId}`),
-                apiClient.get(`/experiments/${experimentId}/submissions`),
+                apiClient.get(`/experiments/${experimentId}/submissions`, { params: { limit: 500 } }),
             ]);
             
             if (expRes.data.owner?.id !== user.id && user.role !== 'admin') {
@@ -120,7 +121,8 @@ function ManageExperimentPage() {
                 return;
             }
             setExperiment(expRes.data);
-            setSubmissions(subRes.data);
+            setSubmissions(subRes.data.items);
+            setNextCursor(subRes.data.next_cursor);
         } catch (err) {
             setError("Gagal memuat data. Pastikan ID eksperimen benar.");
         } finally {
@@ -128,53 +130,33 @@ function ManageExperimentPage() {
         }
     }, [experimentId, user]);
 
+    const loadMore = async () => {
+        const subRes = await apiClient.get(`/experiments/${experimentId}/submissions`, { params: { limit: 500, cursor: nextCursor } });
+        setSubmissions(prev => [...prev, ...subRes.data.items]);
+        setNextCursor(subRes.data.next_cursor);
+    };
+
     useEffect(() => {
         if (!authLoading && experimentId) { fetchData(); }
     }, [authLoading, experimentId, fetchData]);
 
     const formatDate = (dateString) => new Date(dateString).toLocaleString('id-ID', { dateStyle: 'long', timeStyle: 'short' });
-    const handleExportCSV = () => {
-        if (submissions.length === 0) {
-            alert("Tidak ada data untuk diekspor.");
-            return;
+    const handleExportCSV = async () => {
+        // File dibentuk dan di-stream oleh server dari seluruh submisi, bukan hanya halaman yang dimuat
+        try {
+            const response = await apiClient.get(`/experiments/${experimentId}/export`, { params: { format: 'csv' }, responseType: 'blob' });
+            const link = document.createElement("a");
+            const url = URL.createObjectURL(response.data);
+            link.setAttribute("href", url);
+            link.setAttribute("download", `${experiment.title.replace(/\s+/g, '_')}_submissions.csv`);
+            link.style.visibility = 'hidden';
+            document.body.appendChild(link);
+            link.click();
+            document.body.removeChild(link);
+            URL.revokeObjectURL(url);
+        } catch (err) {
+            alert("Gagal mengekspor data.");
         }
-
-        const headers = ['submission_id', 'user_id', 'timestamp', 'latitude', 'longitude'];
-        experiment.input_fields.forEach(field => headers.push(field.name));
-
-        let csvContent = headers.join(',') + '\n';
-        submissions.forEach(sub => {
-            const row = [
-                sub.id,
-                sub.user_id,
-                `"${formatDate(sub.timestamp)}"`,
-                sub.geo_lat || '',
-                sub.geo_lng || ''
-            ];
-
-            experiment.input_fields.forEach(field => {
-                let value = sub.data_json[field.name];
-                if (value === undefined || value === null) {
-                    value = '';
-                } else if (Array.isArray(value)) {
-                    value = `"${value.join('; ')}"`; 
-                } else if (typeof value === 'string' && value.includes(',')) {
-                    value = `"${value}"`; 
-                }
-                row.push(value);
-            });
-            csvContent += row.join(',') + '\n';
-        });
-
-        const blob = new Blob([csvContent], { type: 'text/csv;charset=utf-8;' });
-        const link = document.createElement("a");
-        const url = URL.createObjectURL(blob);
-        link.setAttribute("href", url);
-        link.setAttribute("download", `${experiment.title.replace(/\s+/g, '_')}_submissions.csv`);
-        link.style.visibility = 'hidden';
-        document.body.appendChild(link);
-        link.click();
-        document.body.removeChild(link);
     };
 
 
@@ -206,6 +188,11 @@ function ManageExperimentPage() {
                                 </tbody>
                             </table>
                         </div>
+                        {nextCursor && (
+                            <div className="p-4 text-center">
+                                <button onClick={loadMore} className="text-cyan text-sm font-bold hover:underline">Muat lebih banyak</button>
+                            </div>
+                        )}
                     </div>
                 )}
             </div>
@@ -77,9 +77,15 @@ function ResearcherDashboard() {
         setLoading(true);
         setError('');
         try {
-            const response = await apiClient.get('/experiments/');
-            const filteredExperiments = response.data.filter(exp => exp.owner?.id === user.id);
-            setExperiments(filteredExperiments);
+            // Filter pemilik dilakukan di server; ambil per halaman sampai habis
+            const pageSize = 100;
+            const myExperiments = [];
+            for (let skip = 0; ; skip += pageSize) {
+                const response = await apiClient.get('/experiments/', { params: { created_by: user.id, skip, limit: pageSize } });
+                myExperiments.push(...response.data);
+                if (response.data.length < pageSize) break;
+            }
+            setExperiments(myExperiments);
         } catch (err) {
             setError('Gagal memuat daftar eksperimen Anda.');
         } finally {
@@ -93,7 +99,7 @@ function ResearcherDashboard() {
     }, [authLoading, fetchMyExperiments]);
 
     const totalSubmissions = useMemo(() => {
-        return experiments.reduce((sum, exp) => sum + (exp.submissions?.length || 0), 0);
+        return experiments.reduce((sum, exp) => sum + (exp.submission_count || 0), 0);
     }, [experiments]);
 
     const formatDate = (dateString) => new Date(dateString).toLocaleDateString('id-ID', { dateStyle: 'long' });
@@ -150,7 +156,7 @@ function ResearcherDashboard() {
                                     <tr key={exp.id} className="hover:bg-navy/30">
                                         <td className="px-6 py-4 whitespace-nowrap text-sm font-medium text-lightest-slate">{exp.title}</td>
                                         <td className="px-6 py-4 whitespace-nowrap text-sm text-slate">{formatDate(exp.created_at)}</td>
-                                        <td className="px-6 py-4 whitespace-nowrap text-sm text-cyan">{exp.submissions?.length || 0}</td>
+                                        <td className="px-6 py-4 whitespace-nowrap text-sm text-cyan">{exp.submission_count || 0}</td>
                                         <td className="px-6 py-4 whitespace-nowrap text-right text-sm font-medium">
                                             <Link to={`/experiments/create/${exp.id}`} className="btn-cyan text-xs font-bold py-1 px-3 rounded-md">Kelola</Link>
                                         </td>